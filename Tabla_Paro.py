@@ -1,8 +1,9 @@
 import streamlit as st
 import pandas as pd
-import sqlite3
-import base64
-from io import BytesIO
+from datetime import datetime
+from base_datos import conexion, firma_dataframe, upsert_filas_fijas
+from exportacion import boton_exportar, hoja_desde_dataframe
+from recursos import ALTO_LOGO, imagen_data_uri
 
 # =========================
 # CONFIGURACIÓN DEL ENCABEZADO
@@ -13,14 +14,9 @@ TITULO = "CONTROL CONTINUIDAD OPERACIONAL - MOVILIZACIONES"
 SUBTITULO = "Sección de Coordinación Territorial"
 
 # =========================
-# FUNCIÓN PARA CONVERTIR IMAGEN A BASE64
+# LOGO (codificado una vez por proceso, ver recursos.py)
 # =========================
-def image_to_base64(path):
-    with open(path, "rb") as img_file:
-        return base64.b64encode(img_file.read()).decode()
-
-img_base64 = image_to_base64(IMAGEN_LOCAL)
-img_src = f"data:image/png;base64,{img_base64}"
+img_src = imagen_data_uri(IMAGEN_LOCAL, ALTO_LOGO)
 
 # =========================
 # CSS Y HTML DEL ENCABEZADO
@@ -129,40 +125,157 @@ def crear_df_base():
 # =========================
 # CONEXIÓN A BASE DE DATOS
 # =========================
-conn = sqlite3.connect("sucursales.db", check_same_thread=False)
-c = conn.cursor()
-# Crear tabla si no existe
-c.execute("""
+DB_FILE = "sucursales.db"
+# La tabla se crea una sola vez por proceso, al crear el pool de conexiones.
+# sucursales guarda el estado actual; sucursales_historial es de solo inserción
+# y guarda una fila por región cada vez que esa región cambia.
+ESQUEMA = """
 CREATE TABLE IF NOT EXISTS sucursales (
     Region TEXT PRIMARY KEY,
     Porc_Adhesion REAL,
     TE_Suc1 TEXT, TE_Suc2 TEXT, TE_Suc3 TEXT, TE_Suc4 TEXT, TE_Suc5 TEXT, TE_Suc6 TEXT,
     Observaciones TEXT,
     Suc_Cerr1 TEXT, Suc_Cerr2 TEXT, Suc_Cerr3 TEXT, Suc_Cerr4 TEXT, Suc_Cerr5 TEXT, Suc_Cerr6 TEXT
-)
-""")
-conn.commit()
+);
+CREATE TABLE IF NOT EXISTS sucursales_historial (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ts TEXT NOT NULL,
+    Region TEXT NOT NULL,
+    Porc_Adhesion REAL,
+    TE_Suc1 TEXT, TE_Suc2 TEXT, TE_Suc3 TEXT, TE_Suc4 TEXT, TE_Suc5 TEXT, TE_Suc6 TEXT,
+    Observaciones TEXT,
+    Suc_Cerr1 TEXT, Suc_Cerr2 TEXT, Suc_Cerr3 TEXT, Suc_Cerr4 TEXT, Suc_Cerr5 TEXT, Suc_Cerr6 TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_historial_region_ts ON sucursales_historial (Region, ts);
+-- Punto de partida del historial: el estado que ya estaba guardado
+INSERT INTO sucursales_historial (
+    ts, Region, Porc_Adhesion, TE_Suc1, TE_Suc2, TE_Suc3, TE_Suc4, TE_Suc5, TE_Suc6,
+    Observaciones, Suc_Cerr1, Suc_Cerr2, Suc_Cerr3, Suc_Cerr4, Suc_Cerr5, Suc_Cerr6)
+SELECT strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime'), Region, Porc_Adhesion,
+       TE_Suc1, TE_Suc2, TE_Suc3, TE_Suc4, TE_Suc5, TE_Suc6,
+       Observaciones, Suc_Cerr1, Suc_Cerr2, Suc_Cerr3, Suc_Cerr4, Suc_Cerr5, Suc_Cerr6
+FROM sucursales
+WHERE NOT EXISTS (SELECT 1 FROM sucursales_historial);
+"""
+
+MAPEO_UI_BD = {
+    'Región': 'Region', '% Adhesión': 'Porc_Adhesion',
+    'T.E. Suc1': 'TE_Suc1', 'T.E. Suc2': 'TE_Suc2', 'T.E. Suc3': 'TE_Suc3',
+    'T.E. Suc4': 'TE_Suc4', 'T.E. Suc5': 'TE_Suc5', 'T.E. Suc6': 'TE_Suc6',
+    'Observaciones': 'Observaciones',
+    'Suc. Cerr.1': 'Suc_Cerr1', 'Suc. Cerr.2': 'Suc_Cerr2', 'Suc. Cerr.3': 'Suc_Cerr3',
+    'Suc. Cerr.4': 'Suc_Cerr4', 'Suc. Cerr.5': 'Suc_Cerr5', 'Suc. Cerr.6': 'Suc_Cerr6',
+}
+MAPEO_BD_UI = {bd: ui for ui, bd in MAPEO_UI_BD.items()}
+COLUMNAS_BD = list(MAPEO_UI_BD.values())
+
+def conectar():
+    return conexion(DB_FILE, ESQUEMA)
 
 # =========================
 # CARGAR DATOS DE LA DB O CREAR BASE
 # =========================
 def cargar_datos():
-    df_db = pd.read_sql("SELECT * FROM sucursales", conn)
+    with conectar() as conn:
+        df_db = pd.read_sql("SELECT * FROM sucursales", conn)
     if df_db.empty:
         return crear_df_base()
     else:
         # Ajustar nombres de columnas para coincidir con DataFrame editable
-        df_db = df_db.rename(columns={
-            'Region': 'Región',
-            'Porc_Adhesion': '% Adhesión',
-            'TE_Suc1':'T.E. Suc1','TE_Suc2':'T.E. Suc2','TE_Suc3':'T.E. Suc3','TE_Suc4':'T.E. Suc4','TE_Suc5':'T.E. Suc5','TE_Suc6':'T.E. Suc6',
-            'Suc_Cerr1':'Suc. Cerr.1','Suc_Cerr2':'Suc. Cerr.2','Suc_Cerr3':'Suc. Cerr.3','Suc_Cerr4':'Suc. Cerr.4','Suc_Cerr5':'Suc. Cerr.5','Suc_Cerr6':'Suc. Cerr.6'
-        })
-        return df_db
+        return df_db.rename(columns=MAPEO_BD_UI)
+
+# =========================
+# GUARDADO E HISTORIAL
+# =========================
+def guardar_sucursales(df_ui, df_base=None):
+    # df_base: la tabla tal como la cargó el cliente; solo se escriben las
+    # celdas que cambiaron desde entonces (ver upsert_filas_fijas). Sin ella,
+    # la tabla se guarda tal cual (último en guardar gana).
+    # Escribe solo las regiones que cambiaron (columnas asociadas por nombre y
+    # tipadas según la tabla) y agrega una fila al historial por cada una, con
+    # la misma marca de tiempo. Devuelve la cantidad de regiones escritas.
+    ts = datetime.now().isoformat(sep=" ", timespec="milliseconds")
+    lista_columnas = ", ".join(COLUMNAS_BD)
+    marcadores = ", ".join("?" for _ in COLUMNAS_BD)
+    with conectar() as conn:
+        cursor = conn.cursor()
+        cursor.execute("BEGIN IMMEDIATE")
+        try:
+            escritas, _ = upsert_filas_fijas(
+                cursor, "sucursales", "Region", COLUMNAS_BD, df_ui.rename(columns=MAPEO_UI_BD),
+                None if df_base is None else df_base.rename(columns=MAPEO_UI_BD),
+            )
+            if len(escritas):
+                cursor.executemany(
+                    f"INSERT INTO sucursales_historial (ts, {lista_columnas}) VALUES (?, {marcadores})",
+                    [(ts,) + fila for fila in escritas.reset_index()[COLUMNAS_BD].itertuples(index=False, name=None)],
+                )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    return len(escritas)
+
+def estado_en(momento):
+    # Estado de cada región en un instante: última fila del historial con ts <= momento.
+    # Cada región es una búsqueda por el índice (Region, ts), sin recorrer el historial.
+    ts = momento.isoformat(sep=" ", timespec="milliseconds")
+    lista_columnas = ", ".join(COLUMNAS_BD)
+    filas = []
+    with conectar() as conn:
+        for region in regiones:
+            fila = conn.execute(
+                f"""SELECT ts, {lista_columnas} FROM sucursales_historial
+                    WHERE Region = ? AND ts <= ?
+                    ORDER BY ts DESC, id DESC LIMIT 1""",
+                (region, ts),
+            ).fetchone()
+            if fila is not None:
+                filas.append(fila)
+    estado = pd.DataFrame(filas, columns=["ts"] + COLUMNAS_BD)
+    return estado.rename(columns={"ts": "Actualizado", **MAPEO_BD_UI})
+
+def serie_adhesion(regiones_serie, desde, hasta):
+    # Evolución de % Adhesión por región (rango sobre el índice (Region, ts))
+    ts_desde = desde.isoformat(sep=" ", timespec="milliseconds")
+    ts_hasta = hasta.isoformat(sep=" ", timespec="milliseconds")
+    series = []
+    with conectar() as conn:
+        for region in regiones_serie:
+            # El valor vigente al inicio del rango, más los cambios dentro de él
+            serie = pd.read_sql_query(
+                """SELECT * FROM (
+                       SELECT ? AS ts, Porc_Adhesion FROM sucursales_historial
+                       WHERE Region = ? AND ts <= ?
+                       ORDER BY ts DESC, id DESC LIMIT 1)
+                   UNION ALL
+                   SELECT * FROM (
+                       SELECT ts, Porc_Adhesion FROM sucursales_historial
+                       WHERE Region = ? AND ts > ? AND ts <= ?
+                       ORDER BY ts, id)""",
+                conn,
+                params=(ts_desde, region, ts_desde, region, ts_desde, ts_hasta),
+            )
+            # Si hubo varios guardados en el mismo instante, queda el último
+            serie = serie.drop_duplicates(subset="ts", keep="last")
+            series.append(serie.set_index("ts")["Porc_Adhesion"].rename(region))
+    if not series:
+        return pd.DataFrame()
+    datos = pd.concat(series, axis=1).sort_index()
+    datos.index = pd.to_datetime(datos.index)
+    # Entre dos guardados el valor se mantiene
+    return datos.ffill()
 
 # Inicializar session_state
-if "df_sucursales" not in st.session_state:
+# - df_sucursales: lo que muestra la tabla editable.
+# - base_sucursales: la tabla tal como se cargó; al guardar se envía para
+#   escribir solo lo que este usuario cambió.
+def recargar_sucursales():
     st.session_state.df_sucursales = cargar_datos()
+    st.session_state.base_sucursales = st.session_state.df_sucursales.copy()
+
+if "df_sucursales" not in st.session_state:
+    recargar_sucursales()
 
 # =========================
 # CONFIGURACIÓN DE COLUMNAS
@@ -204,50 +317,56 @@ st.markdown('<div class="table-legend">(*T.E= Turno ético , Suc. Cerr.= Sucursa
 # =========================
 # BOTONES DE ACCIÓN
 # =========================
+escritas = st.session_state.pop("resultado_guardado_sucursales", None)
+if escritas is not None:
+    st.toast(f"{escritas} regiones actualizadas" if escritas else "Sin cambios que guardar")
+
 col1, col2, col3 = st.columns(3)
 with col1:
     if st.button("💾 Guardar Datos", use_container_width=True):
-        df_guardar = edited_df.copy()
-        # Convertir % Adhesión vacío a None
-        df_guardar["% Adhesión"] = df_guardar["% Adhesión"].replace('', None)
-        # Renombrar columnas a nombres DB
-        df_guardar_db = df_guardar.rename(columns={
-            'Región':'Region','% Adhesión':'Porc_Adhesion',
-            'T.E. Suc1':'TE_Suc1','T.E. Suc2':'TE_Suc2','T.E. Suc3':'TE_Suc3','T.E. Suc4':'TE_Suc4','T.E. Suc5':'TE_Suc5','T.E. Suc6':'TE_Suc6',
-            'Suc. Cerr.1':'Suc_Cerr1','Suc. Cerr.2':'Suc_Cerr2','Suc. Cerr.3':'Suc_Cerr3','Suc. Cerr.4':'Suc_Cerr4','Suc. Cerr.5':'Suc_Cerr5','Suc. Cerr.6':'Suc_Cerr6'
-        })
-        for _, row in df_guardar_db.iterrows():
-            c.execute("""
-            INSERT OR REPLACE INTO sucursales 
-            (Region, Porc_Adhesion, TE_Suc1, TE_Suc2, TE_Suc3, TE_Suc4, TE_Suc5, TE_Suc6,
-            Observaciones, Suc_Cerr1, Suc_Cerr2, Suc_Cerr3, Suc_Cerr4, Suc_Cerr5, Suc_Cerr6)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, tuple(row))
-        conn.commit()
-        # Actualizar session_state
-        st.session_state.df_sucursales = df_guardar.copy()
+        st.session_state.resultado_guardado_sucursales = guardar_sucursales(
+            edited_df.copy(), st.session_state.base_sucursales
+        )
+        # Lo guardado por este y otros usuarios se vuelve a leer de la BD
+        recargar_sucursales()
+        st.rerun()
 
 with col2:
     if st.button("🔄 Limpiar Tabla", use_container_width=True):
         st.session_state.df_sucursales = crear_df_base()
 
 with col3:
-    def to_excel(df):
-        output = BytesIO()
-        with pd.ExcelWriter(output, engine="openpyxl") as writer:
-            df.to_excel(writer, index=False)
-        processed_data = output.getvalue()
-        return processed_data
-
-    excel_data = to_excel(edited_df)
-    st.download_button(
-        label="📥 Exportar a Excel",
-        data=excel_data,
-        file_name="registro_sucursales.xlsx",
-        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        use_container_width=True
+    # El archivo se genera solo al exportar y queda en caché mientras la tabla no cambie
+    boton_exportar(
+        "📥 Exportar a Excel",
+        "sucursales",
+        firma_dataframe(edited_df),
+        lambda: [hoja_desde_dataframe("Sheet1", edited_df)],
+        "registro_sucursales.xlsx",
+        use_container_width=True,
     )
 
+# =========================
+# HISTORIAL
+# =========================
+with st.expander("🕒 Historial de la movilización", expanded=False):
+    h1, h2 = st.columns(2)
+    with h1:
+        fecha_estado = st.date_input("Fecha", value=datetime.now().date(), key="historial_fecha")
+    with h2:
+        hora_estado = st.time_input("Hora", value=datetime.now().time().replace(second=0, microsecond=0),
+                                    key="historial_hora")
+    st.markdown('<div class="subtitulo-tabla">Estado de las sucursales en ese momento</div>',
+                unsafe_allow_html=True)
+    momento = datetime.combine(fecha_estado, hora_estado).replace(second=59, microsecond=999000)
+    st.dataframe(estado_en(momento), use_container_width=True, hide_index=True,
+                 column_config={"% Adhesión": st.column_config.NumberColumn("% Adhesión", format="%.2f%%")})
+
+    regiones_serie = st.multiselect("Evolución de % Adhesión por región", regiones, key="historial_regiones")
+    if regiones_serie:
+        desde = datetime.combine(fecha_estado, datetime.min.time())
+        st.line_chart(serie_adhesion(regiones_serie, desde, momento))
+
 # =========================
 # NOTA EXPLICATIVA
 # =========================
@@ -1,8 +1,9 @@
 import streamlit as st
 import pandas as pd
-import sqlite3
-import base64
-from io import BytesIO
+from base_datos import firma_dataframe
+from emergencias_bd import cambios_desde, cargar_emergencias, guardar_emergencias, version_actual
+from exportacion import boton_exportar, hoja_desde_dataframe
+from recursos import ALTO_LOGO, imagen_data_uri
 
 # =========================
 # CONFIGURACIÓN DEL ENCABEZADO
@@ -11,16 +12,13 @@ COLOR_FONDO = "#0F69B4"
 IMAGEN_LOCAL = "LOGO-PROPIO-ISL-2023-CMYK-01.png"
 TITULO = "CONTROL CONTINUIDAD OPERACIONAL - EMERGENCIAS"
 SUBTITULO = "Sección de Coordinación Territorial"
+# Cada cuántos segundos se consulta si otros usuarios guardaron cambios
+SINCRONIZACION_SEGUNDOS = 15
 
 # =========================
-# FUNCIÓN PARA CONVERTIR IMAGEN A BASE64
+# LOGO (codificado una vez por proceso, ver recursos.py)
 # =========================
-def image_to_base64(path):
-    with open(path, "rb") as img_file:
-        return base64.b64encode(img_file.read()).decode()
-
-img_base64 = image_to_base64(IMAGEN_LOCAL)
-img_src = f"data:image/png;base64,{img_base64}"
+img_src = imagen_data_uri(IMAGEN_LOCAL, ALTO_LOGO)
 
 # =========================
 # CONFIGURACIÓN DE LA PÁGINA
@@ -133,58 +131,47 @@ def crear_df_base():
     })
 
 # =========================
-# CONEXIÓN A BASE DE DATOS
-# =========================
-conn = sqlite3.connect("emergencias.db", check_same_thread=False)
-c = conn.cursor()
-# Crear tabla si no existe
-c.execute("""
-CREATE TABLE IF NOT EXISTS emergencias (
-    Region TEXT PRIMARY KEY,
-    Selecc INTEGER,
-    Agua TEXT,
-    Electricidad TEXT,
-    Internet TEXT,
-    AccesoSistemas TEXT,
-    InfoTI TEXT,
-    SistemasNoOperativos TEXT,
-    SucursalesNoOperativas TEXT,
-    VPN TEXT,
-    Atenciones TEXT,
-    FuncionariosAfectados TEXT,
-    InstruccionesSEREMI TEXT,
-    CualInstruccionSEREMI TEXT,
-    Observaciones TEXT
-)
-""")
-conn.commit()
-
-# =========================
-# CARGAR DATOS DE LA DB O CREAR BASE
+# CARGAR DATOS DE LA DB O CREAR BASE (ver emergencias_bd.py)
 # =========================
+# Estado de la sesión:
+# - df_emergencias: lo que muestra la tabla editable
+# - base_emergencias y versiones_emergencias: la tabla y las versiones por
+#   región tal como se cargaron; al guardar se envían para fusionar los cambios
+#   con los de otros usuarios campo por campo
+# - version_emergencias: última versión vista (cursor del registro de cambios)
+# - generacion_emergencias: parte de la key del editor; al cambiar los datos
+#   desde fuera se incrementa para que el editor parta de cero
 def cargar_datos():
-    df_db = pd.read_sql("SELECT * FROM emergencias", conn)
+    df_db, versiones = cargar_emergencias()
     if df_db.empty:
-        return crear_df_base()
-    else:
-        df_db = df_db.rename(columns={
-            'Region': 'Región',
-            'Selecc': 'Selecc',
-            'AccesoSistemas': 'Acceso a Sistemas (Si/No)',
-            'InfoTI': 'Reporte de TI (Si/No)',
-            'SistemasNoOperativos': 'Sistemas NO operativos (Cuáles?))',
-            'SucursalesNoOperativas': 'Sucursales NO operativas',
-            'VPN': 'Cuenta con VPN',
-            'Atenciones': 'Atención recibida (Si/No)',
-            'FuncionariosAfectados': 'Funcionarios afectados',
-            'InstruccionesSEREMI': 'Instrucciones SEREMI (Si/No)',
-            'CualInstruccionSEREMI': 'Instrucciones SEREMI(Cuáles?)',
-            'Observaciones': 'Observ/Propuesta DR'
-        })
-        return df_db
+        df_db = crear_df_base()
+    st.session_state.df_emergencias = df_db
+    st.session_state.base_emergencias = df_db.copy()
+    st.session_state.versiones_emergencias = versiones
+    st.session_state.version_emergencias = max(versiones.values(), default=0)
+    st.session_state.generacion_emergencias = 0
+
+def _reemplazar_filas(df, cambios):
+    # Reemplaza (o agrega) las filas de las regiones recibidas, sin tocar las demás
+    df = df.set_index("Región")
+    cambios = cambios.set_index("Región").reindex(columns=df.columns)
+    orden = list(df.index) + [r for r in cambios.index if r not in df.index]
+    return pd.concat([df.drop(index=cambios.index, errors="ignore"), cambios]).reindex(orden).reset_index()
+
+def aplicar_cambios_remotos():
+    # Trae solo las filas guardadas después de la versión vista por esta sesión
+    cambios, versiones = cambios_desde(st.session_state.version_emergencias)
+    if cambios.empty:
+        return 0
+    st.session_state.df_emergencias = _reemplazar_filas(st.session_state.df_emergencias, cambios)
+    st.session_state.base_emergencias = _reemplazar_filas(st.session_state.base_emergencias, cambios)
+    st.session_state.versiones_emergencias.update(versiones)
+    st.session_state.version_emergencias = max(versiones.values())
+    st.session_state.generacion_emergencias += 1
+    return len(cambios)
 
 if "df_emergencias" not in st.session_state:
-    st.session_state.df_emergencias = cargar_datos()
+    cargar_datos()
 
 # =========================
 # CONFIGURACIÓN DE COLUMNAS
@@ -210,14 +197,40 @@ column_config = {
 # =========================
 # TABLA EDITABLE
 # =========================
+clave_editor = f"editor_emergencias_{st.session_state.generacion_emergencias}"
 edited_df = st.data_editor(
     st.session_state.df_emergencias,
     use_container_width=True,
     hide_index=True,
     num_rows="fixed",
-    column_config=column_config
+    column_config=column_config,
+    key=clave_editor,
 )
 
+# =========================
+# CAMBIOS DE OTROS USUARIOS
+# =========================
+@st.fragment(run_every=SINCRONIZACION_SEGUNDOS)
+def sincronizacion():
+    # Consulta barata de la versión; si hay guardados nuevos y esta sesión no
+    # tiene ediciones pendientes, trae solo las filas que cambiaron
+    if version_actual() <= st.session_state.version_emergencias:
+        return
+    if st.session_state.get(clave_editor, {}).get("edited_rows"):
+        st.caption("🔄 Otros usuarios guardaron cambios; se fusionarán con los suyos al guardar.")
+        return
+    if aplicar_cambios_remotos():
+        st.rerun()
+
+sincronizacion()
+
+resultado = st.session_state.pop("resultado_guardado_emergencias", None)
+if resultado:
+    st.toast(f"{resultado['regiones']} regiones actualizadas, {resultado['eventos']} cambios registrados")
+    if not resultado["conflictos"].empty:
+        st.warning("Otro usuario modificó estos campos antes que usted; se mantuvo el valor guardado primero:")
+        st.dataframe(resultado["conflictos"], use_container_width=True, hide_index=True)
+
 # =========================
 # BOTONES DE ACCIÓN
 # =========================
@@ -225,49 +238,31 @@ col1, col2, col3 = st.columns(3)
 
 with col1:
     if st.button("💾 Guardar Datos", use_container_width=True):
-        df_guardar = edited_df.copy()
-        df_guardar_db = df_guardar.rename(columns={
-            'Región':'Region',
-            'Selecc':'Selecc',
-            'Acceso a Sistemas (Si/No)':'AccesoSistemas',
-            'Reporte de TI (Si/No)':'InfoTI',
-            'Sistemas NO operativos (Cuáles?))':'SistemasNoOperativos',
-            'Sucursales NO operativas':'SucursalesNoOperativas',
-            'Cuenta con VPN':'VPN',
-            'Atención recibida (Si/No)':'Atenciones',
-            'Funcionarios afectados':'FuncionariosAfectados',
-            'Instrucciones SEREMI (Si/No)':'InstruccionesSEREMI',
-            'Instrucciones SEREMI(Cuáles?)':'CualInstruccionSEREMI',
-            'Observ/Propuesta DR':'Observaciones'
-        })
-        for _, row in df_guardar_db.iterrows():
-            c.execute("""
-            INSERT OR REPLACE INTO emergencias
-            (Region, Selecc, Agua, Electricidad, Internet, AccesoSistemas, InfoTI, SistemasNoOperativos,
-            SucursalesNoOperativas, VPN, Atenciones, FuncionariosAfectados, InstruccionesSEREMI, CualInstruccionSEREMI, Observaciones)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, tuple(row))
-        conn.commit()
-        st.session_state.df_emergencias = df_guardar.copy()
+        st.session_state.resultado_guardado_emergencias = guardar_emergencias(
+            edited_df,
+            st.session_state.base_emergencias,
+            st.session_state.versiones_emergencias,
+        )
+        # Lo guardado (fusionado) y lo que guardaron otros vuelve por el registro de cambios
+        st.session_state.df_emergencias = edited_df.copy()
+        aplicar_cambios_remotos()
+        st.session_state.generacion_emergencias += 1
+        st.rerun()
 
 with col2:
     if st.button("🔄 Limpiar Tabla", use_container_width=True):
         st.session_state.df_emergencias = crear_df_base()
+        st.session_state.generacion_emergencias += 1
 
 with col3:
-    def to_excel(df):
-        output = BytesIO()
-        with pd.ExcelWriter(output, engine="openpyxl") as writer:
-            df.to_excel(writer, index=False)
-        return output.getvalue()
-
-    excel_data = to_excel(edited_df)
-    st.download_button(
-        label="📥 Exportar a Excel",
-        data=excel_data,
-        file_name="registro_emergencias.xlsx",
-        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        use_container_width=True
+    # El archivo se genera solo al exportar y queda en caché mientras la tabla no cambie
+    boton_exportar(
+        "📥 Exportar a Excel",
+        "emergencias",
+        firma_dataframe(edited_df),
+        lambda: [hoja_desde_dataframe("Sheet1", edited_df)],
+        "registro_emergencias.xlsx",
+        use_container_width=True,
     )
 
 # =========================
@@ -0,0 +1,186 @@
+import streamlit as st
+import pandas as pd
+from ingesta import LIBROS, asegurar_libro, consultar
+from recursos import ALTO_LOGO, imagen_data_uri
+
+st.set_page_config(page_title="Estadísticas de Accidentes", layout="wide", page_icon="📊")
+
+# =========================
+# CONFIGURACIÓN DEL ENCABEZADO
+# =========================
+COLOR_FONDO = "#0F69B4"
+IMAGEN_LOCAL = "LOGO-PROPIO-ISL-2023-CMYK-01.png"
+TITULO = "ESTADÍSTICAS DE ACCIDENTES GRAVES Y FATALES"
+SUBTITULO = "Sección de Coordinación Territorial"
+
+MESES = {
+    1: "Enero", 2: "Febrero", 3: "Marzo", 4: "Abril", 5: "Mayo", 6: "Junio",
+    7: "Julio", 8: "Agosto", 9: "Septiembre", 10: "Octubre", 11: "Noviembre", 12: "Diciembre",
+}
+
+COLUMNAS_DETALLE = {
+    "numero": "N°", "cun": "CUN", "fecha": "Fecha Accidente", "region": "Dirección Regional",
+    "tipo": "Tipo", "criterio": "Criterio Gravedad", "comuna": "Comuna",
+    "empresa": "Razón Social", "categoria": "Categoría Ocupacional",
+    "estado": "Estado", "descripcion": "Descripción",
+}
+
+img_src = imagen_data_uri(IMAGEN_LOCAL, ALTO_LOGO)
+
+st.markdown(f"""
+<style>
+.header-container {{
+    display: flex;
+    align-items: center;
+    justify-content: center;
+    background-color: {COLOR_FONDO};
+    height: 85px;
+    width: 100%;
+    color: white;
+    position: relative;
+}}
+.header-logo {{
+    position: absolute;
+    left: 20px;
+    top: 5px;
+}}
+.header-logo img {{
+    height: 60px;
+}}
+.header-subtitle {{
+    position: absolute;
+    bottom: 5px;
+    left: 20px;
+    font-size: 10px;
+}}
+.header-title {{
+    font-size: 20px;
+    font-weight: bold;
+}}
+.subtitulo-tabla {{
+    margin-top: 20px;
+    font-size: 16px;
+    color: #000000;
+}}
+</style>
+
+<div class="header-container">
+    <div class="header-logo">
+        <img src="{img_src}" alt="Logo">
+    </div>
+    <div class="header-subtitle">{SUBTITULO}</div>
+    <div class="header-title">{TITULO}</div>
+</div>
+""", unsafe_allow_html=True)
+
+# =========================
+# DATOS (caché SQLite, ver ingesta.py)
+# =========================
+# El cubo ya viene agregado desde la ingesta (unas pocas centenas de filas);
+# los filtros trabajan sobre él en memoria y solo el detalle consulta registros.
+@st.cache_data(show_spinner=False)
+def cargar_cubo(version):
+    return consultar("SELECT region, mes, tipo, criterio, accidentes FROM cubo_accidentes")
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def cargar_detalle(version, regiones, meses, tipos):
+    # Usa el índice (region, mes, tipo) de la tabla accidentes
+    condiciones, params = [], []
+    for columna, valores in (("region", regiones), ("mes", meses), ("tipo", tipos)):
+        if valores:
+            condiciones.append(f"{columna} IN ({', '.join('?' for _ in valores)})")
+            params += list(valores)
+    where = f"WHERE {' AND '.join(condiciones)}" if condiciones else ""
+    return consultar(
+        f"SELECT {', '.join(COLUMNAS_DETALLE)} FROM accidentes {where} ORDER BY fecha, numero",
+        params,
+    )
+
+try:
+    version = asegurar_libro("accidentes")
+except FileNotFoundError:
+    st.error(f"❌ No se encontró el archivo '{LIBROS['accidentes']}'")
+    st.stop()
+except ValueError as e:
+    # El libro no tiene la tabla dinámica de registros de accidentes
+    st.error(f"❌ {e}")
+    st.stop()
+
+cubo = cargar_cubo(version)
+if cubo.empty:
+    st.info("El libro no contiene registros de accidentes.")
+    st.stop()
+
+# =========================
+# FILTROS
+# =========================
+st.markdown('<div class="subtitulo-tabla">Filtros</div>', unsafe_allow_html=True)
+f1, f2, f3 = st.columns(3)
+with f1:
+    regiones = st.multiselect("Dirección Regional", sorted(cubo["region"].dropna().unique()))
+with f2:
+    meses = st.multiselect(
+        "Mes", sorted(cubo["mes"].dropna().unique()),
+        format_func=lambda m: MESES.get(m, str(m)),
+    )
+with f3:
+    tipos = st.multiselect("Tipo de calificación", sorted(cubo["tipo"].dropna().unique()))
+
+filtro = pd.Series(True, index=cubo.index)
+if regiones:
+    filtro &= cubo["region"].isin(regiones)
+if meses:
+    filtro &= cubo["mes"].isin(meses)
+if tipos:
+    filtro &= cubo["tipo"].isin(tipos)
+seleccion = cubo[filtro]
+
+# =========================
+# INDICADORES
+# =========================
+por_tipo = seleccion.groupby("tipo")["accidentes"].sum()
+m1, m2, m3, m4 = st.columns(4)
+m1.metric("Total accidentes", int(seleccion["accidentes"].sum()))
+m2.metric("Fatales", int(por_tipo.get("Fatal", 0)))
+m3.metric("Graves", int(por_tipo.get("Grave", 0)))
+m4.metric("Otros", int(por_tipo.get("Otro", 0)))
+
+# =========================
+# AGREGADOS
+# =========================
+c1, c2 = st.columns(2)
+with c1:
+    st.markdown('<div class="subtitulo-tabla">Accidentes por Dirección Regional</div>', unsafe_allow_html=True)
+    tabla_region = seleccion.pivot_table(
+        index="region", columns="tipo", values="accidentes", aggfunc="sum", fill_value=0,
+    )
+    if not tabla_region.empty:
+        tabla_region["Total"] = tabla_region.sum(axis=1)
+        tabla_region = tabla_region.sort_values("Total", ascending=False)
+        tabla_region.index.name = "Dirección Regional"
+    st.dataframe(tabla_region, use_container_width=True)
+
+with c2:
+    st.markdown('<div class="subtitulo-tabla">Accidentes por mes</div>', unsafe_allow_html=True)
+    tabla_mes = seleccion.pivot_table(
+        index="mes", columns="tipo", values="accidentes", aggfunc="sum", fill_value=0,
+    )
+    tabla_mes.index = [MESES.get(m, str(m)) for m in tabla_mes.index]
+    st.bar_chart(tabla_mes)
+
+    st.markdown('<div class="subtitulo-tabla">Criterio de gravedad</div>', unsafe_allow_html=True)
+    tabla_criterio = (
+        seleccion.groupby("criterio")["accidentes"].sum()
+        .sort_values(ascending=False)
+        .rename("Accidentes")
+    )
+    tabla_criterio.index.name = "Criterio Gravedad"
+    st.dataframe(tabla_criterio, use_container_width=True)
+
+# =========================
+# DETALLE DE REGISTROS
+# =========================
+with st.expander("🔎 Ver registros de la selección", expanded=False):
+    detalle = cargar_detalle(version, tuple(regiones), tuple(int(m) for m in meses), tuple(tipos))
+    st.caption(f"{len(detalle)} registros")
+    st.dataframe(detalle.rename(columns=COLUMNAS_DETALLE), use_container_width=True, hide_index=True)
@@ -0,0 +1,159 @@
+# arranque.py
+import importlib
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+# =========================
+# TIEMPOS DE ARRANQUE
+# =========================
+# Registro por proceso (el módulo se importa una sola vez) de:
+# - cada import de primer nivel hecho después de instalar_medidor(), con su
+#   tiempo propio y acumulado (como python -X importtime) y la página que lo pidió;
+# - cada carga de página: la primera del proceso (en frío) y la última.
+# La página "Tiempos de arranque" (tiempos_arranque.py) muestra el desglose.
+INICIO_PROCESO = time.time()
+
+_lock = threading.Lock()
+_local = threading.local()
+_imports = []
+_paginas = {}
+
+def _pila():
+    if not hasattr(_local, "pila"):
+        _local.pila = []
+    return _local.pila
+
+# =========================
+# MEDIDOR DE IMPORTS
+# =========================
+class _CargadorMedido:
+    # Envuelve al cargador real solo mientras se ejecuta el módulo
+    def __init__(self, cargador):
+        self._cargador = cargador
+
+    def __getattr__(self, atributo):
+        return getattr(self._cargador, atributo)
+
+    def create_module(self, spec):
+        return self._cargador.create_module(spec)
+
+    def exec_module(self, modulo):
+        pila = _pila()
+        nivel = len(pila)
+        pila.append(0.0)  # tiempo de los imports anidados
+        inicio = time.perf_counter()
+        try:
+            self._cargador.exec_module(modulo)
+        finally:
+            acumulado = time.perf_counter() - inicio
+            hijos = pila.pop()
+            if pila:
+                pila[-1] += acumulado
+            modulo.__loader__ = self._cargador
+            if getattr(modulo, "__spec__", None) is not None:
+                modulo.__spec__.loader = self._cargador
+            with _lock:
+                _imports.append({
+                    "modulo": modulo.__name__,
+                    "propio": acumulado - hijos,
+                    "acumulado": acumulado,
+                    "nivel": nivel,
+                    "pagina": getattr(_local, "pagina", None),
+                    "momento": time.time(),
+                })
+
+class _MedidorImports:
+    # Buscador de sys.meta_path que no encuentra nada por sí mismo: pide el
+    # módulo a los demás buscadores y envuelve su cargador para medirlo
+    def find_spec(self, nombre, path=None, target=None):
+        if path is not None or "." in nombre:
+            return None
+        for buscador in sys.meta_path:
+            if buscador is self or not hasattr(buscador, "find_spec"):
+                continue
+            spec = buscador.find_spec(nombre, path, target)
+            if spec is not None:
+                if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                    spec.loader = _CargadorMedido(spec.loader)
+                return spec
+        return None
+
+def instalar_medidor():
+    # Idempotente: el script de entrada se vuelve a ejecutar en cada visita
+    with _lock:
+        if not any(isinstance(b, _MedidorImports) for b in sys.meta_path):
+            sys.meta_path.insert(0, _MedidorImports())
+
+# =========================
+# IMPORTS DIFERIDOS
+# =========================
+class _ModuloDiferido:
+    # Se importa el módulo real la primera vez que se usa uno de sus atributos
+    def __init__(self, nombre):
+        self._nombre = nombre
+        self._modulo = None
+
+    def __getattr__(self, atributo):
+        if self._modulo is None:
+            self._modulo = importlib.import_module(self._nombre)
+        return getattr(self._modulo, atributo)
+
+def diferido(nombre):
+    # Uso: pd = diferido("pandas") en lugar de import pandas as pd
+    return sys.modules.get(nombre) or _ModuloDiferido(nombre)
+
+# =========================
+# CARGA DE PÁGINAS
+# =========================
+@contextmanager
+def medir_pagina(pagina):
+    _local.pagina = pagina
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        duracion = time.perf_counter() - inicio
+        _local.pagina = None
+        with _lock:
+            datos = _paginas.get(pagina)
+            if datos is None:
+                _paginas[pagina] = {
+                    "primera": duracion,
+                    "primera_desde_inicio": time.time() - INICIO_PROCESO,
+                    "fin_primera": time.time(),
+                    "ultima": duracion,
+                    "cargas": 1,
+                }
+            else:
+                datos["ultima"] = duracion
+                datos["cargas"] += 1
+
+def pagina_actual():
+    # Título de la página que se está ejecutando en este hilo (o None)
+    return getattr(_local, "pagina", None)
+
+def resumen():
+    # (imports, páginas) como listas de diccionarios, listas para un DataFrame
+    with _lock:
+        imports = [dict(i) for i in _imports]
+        paginas = {p: dict(d) for p, d in _paginas.items()}
+    filas_paginas = []
+    for pagina, datos in paginas.items():
+        # Imports de primer nivel hechos durante la primera carga; los anidados
+        # ya están dentro del acumulado de quien los pidió
+        en_imports = sum(
+            i["acumulado"] for i in imports
+            if i["pagina"] == pagina and i["nivel"] == 0 and i["momento"] <= datos["fin_primera"]
+        )
+        filas_paginas.append({
+            "pagina": pagina,
+            "primera": datos["primera"],
+            "imports": en_imports,
+            "inicializacion": max(datos["primera"] - en_imports, 0.0),
+            "primera_desde_inicio": datos["primera_desde_inicio"],
+            "ultima": datos["ultima"],
+            "cargas": datos["cargas"],
+        })
+    return imports, filas_paginas
@@ -0,0 +1,266 @@
+# base_datos.py
+import hashlib
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+import streamlit as st
+
+from arranque import diferido
+from perfil_sql import ConexionMedida
+
+# pandas se importa recién cuando una función lo necesita (ver arranque.py)
+pd = diferido("pandas")
+
+# =========================
+# POOL DE CONEXIONES (SQLite)
+# =========================
+# Un pool por archivo de base de datos y por proceso, compartido por todas las
+# sesiones. El esquema se crea una sola vez, al crear el pool.
+TAMANO_POOL = 4
+TIMEOUT_CONEXION = 10
+
+PRAGMAS = {
+    "journal_mode": "WAL",          # lectores no se bloquean mientras alguien guarda
+    "synchronous": "NORMAL",
+    "mmap_size": 64 * 1024 * 1024,
+    "cache_size": -8000,            # ~8 MB por conexión
+    "temp_store": "MEMORY",
+    "foreign_keys": "ON",
+}
+
+class PoolConexiones:
+    def __init__(self, db_file, esquema=None, tamano=TAMANO_POOL):
+        self.db_file = db_file
+        self.tamano = tamano
+        self._libres = queue.LifoQueue()
+        self._creadas = 0
+        self._lock = threading.Lock()
+        if esquema:
+            with self.conexion() as conn:
+                conn.executescript(esquema)
+                conn.commit()
+
+    def _nueva_conexion(self):
+        # ConexionMedida registra cada sentencia cuando el registro SQL está activo (perfil_sql.py)
+        conn = sqlite3.connect(
+            self.db_file, timeout=TIMEOUT_CONEXION, check_same_thread=False, factory=ConexionMedida
+        )
+        for pragma, valor in PRAGMAS.items():
+            conn.execute(f"PRAGMA {pragma} = {valor}")
+        return conn
+
+    def _tomar(self):
+        try:
+            return self._libres.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._creadas < self.tamano:
+                self._creadas += 1
+                return self._nueva_conexion()
+        return self._libres.get(timeout=TIMEOUT_CONEXION)
+
+    @contextmanager
+    def conexion(self):
+        conn = self._tomar()
+        try:
+            yield conn
+        finally:
+            # Nunca devolver al pool una conexión con una transacción abierta
+            if conn.in_transaction:
+                conn.rollback()
+            self._libres.put(conn)
+
+@st.cache_resource(show_spinner=False)
+def obtener_pool(db_file, esquema=None):
+    return PoolConexiones(db_file, esquema)
+
+def conexion(db_file, esquema=None):
+    # Uso: with conexion(DB_FILE, ESQUEMA) as conn: ...
+    return obtener_pool(db_file, esquema).conexion()
+
+# =========================
+# PERSISTENCIA INCREMENTAL (SQLite)
+# =========================
+# En vez de borrar la tabla completa y volver a insertar todo, se compara el
+# DataFrame editado con la última versión guardada (por la clave 'id') y solo
+# se escriben las filas insertadas, modificadas o eliminadas.
+
+def valores_bd(df, columnas):
+    # Deja los valores listos para sqlite: NaN/NaT/None pasan a None
+    datos = df.reindex(columns=columnas).astype(object)
+    return datos.where(datos.notna(), None)
+
+def firma_dataframe(df):
+    # Huella del contenido; sirve para saber si hay algo que guardar sin tocar la BD
+    if df is None or df.empty:
+        return ""
+    datos = valores_bd(df, list(df.columns)).astype(str)
+    valores = pd.util.hash_pandas_object(datos, index=False)
+    return hashlib.sha1(valores.values.tobytes()).hexdigest()
+
+def _ids(serie):
+    return pd.to_numeric(serie, errors='coerce')
+
+def _siguiente_id(cursor, tabla):
+    # Considera tanto el máximo actual como la secuencia de AUTOINCREMENT
+    maximo = cursor.execute(f"SELECT COALESCE(MAX(id), 0) FROM {tabla}").fetchone()[0]
+    try:
+        fila = cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = ?", (tabla,)).fetchone()
+    except Exception:
+        fila = None
+    secuencia = fila[0] if fila else 0
+    return max(maximo, secuencia) + 1
+
+def calcular_cambios(df_nuevo, df_anterior, columnas):
+    # Devuelve (filas_nuevas, filas_modificadas, ids_eliminados)
+    nuevo = valores_bd(df_nuevo, ['id'] + columnas)
+    nuevo['id'] = _ids(nuevo['id'])
+
+    if df_anterior is None or df_anterior.empty:
+        anterior = pd.DataFrame(columns=columnas)
+    else:
+        anterior = valores_bd(df_anterior, ['id'] + columnas)
+        anterior['id'] = _ids(anterior['id'])
+        anterior = anterior.dropna(subset=['id']).set_index('id')
+
+    sin_id = nuevo['id'].isna()
+    filas_nuevas = nuevo[sin_id]
+    con_id = nuevo[~sin_id].drop_duplicates(subset='id', keep='last').set_index('id')
+
+    comunes = con_id.index.intersection(anterior.index)
+    a = con_id.loc[comunes, columnas]
+    b = anterior.loc[comunes, columnas]
+    distintos = ~((a == b) | (a.isna() & b.isna()))
+    ids_modificados = comunes[distintos.any(axis=1).to_numpy()]
+    # Filas con id que no estaban en la versión anterior se tratan como modificadas
+    ids_desconocidos = con_id.index.difference(anterior.index)
+    filas_modificadas = con_id.loc[ids_modificados.append(ids_desconocidos)].reset_index()
+
+    ids_eliminados = anterior.index.difference(con_id.index)
+    return filas_nuevas, filas_modificadas, list(ids_eliminados)
+
+def sincronizar_tabla(conn, tabla, columnas, df_nuevo, df_anterior):
+    # df_nuevo / df_anterior: DataFrames con nombres de columnas de la BD y una
+    # columna 'id' (vacía para las filas nuevas). Devuelve la nueva versión
+    # guardada (con los ids asignados) y un resumen de filas escritas.
+    filas_nuevas, filas_modificadas, ids_eliminados = calcular_cambios(df_nuevo, df_anterior, columnas)
+    resumen = {
+        'insertados': len(filas_nuevas),
+        'actualizados': len(filas_modificadas),
+        'eliminados': len(ids_eliminados),
+    }
+
+    guardado = valores_bd(df_nuevo, ['id'] + columnas)
+    guardado['id'] = _ids(guardado['id'])
+    if not any(resumen.values()):
+        guardado['id'] = guardado['id'].astype('Int64')
+        return guardado, resumen
+
+    lista_columnas = ", ".join(columnas)
+    marcadores = ", ".join("?" for _ in range(len(columnas) + 1))
+    asignaciones = ", ".join(f"{c} = excluded.{c}" for c in columnas)
+
+    cursor = conn.cursor()
+    cursor.execute("BEGIN IMMEDIATE")
+    try:
+        if ids_eliminados:
+            cursor.executemany(
+                f"DELETE FROM {tabla} WHERE id = ?",
+                [(int(i),) for i in ids_eliminados],
+            )
+        if len(filas_modificadas):
+            cursor.executemany(
+                f"""INSERT INTO {tabla} (id, {lista_columnas}) VALUES ({marcadores})
+                    ON CONFLICT(id) DO UPDATE SET {asignaciones}""",
+                [(int(fila[0]),) + tuple(fila[1:]) for fila in filas_modificadas[['id'] + columnas].itertuples(index=False)],
+            )
+        if len(filas_nuevas):
+            primero = _siguiente_id(cursor, tabla)
+            nuevos_ids = range(primero, primero + len(filas_nuevas))
+            guardado.loc[filas_nuevas.index, 'id'] = list(nuevos_ids)
+            cursor.executemany(
+                f"INSERT INTO {tabla} (id, {lista_columnas}) VALUES ({marcadores})",
+                [(i,) + tuple(fila) for i, fila in zip(nuevos_ids, filas_nuevas[columnas].itertuples(index=False))],
+            )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    guardado['id'] = guardado['id'].astype('Int64')
+    return guardado, resumen
+
+# =========================
+# TABLAS DE FILAS FIJAS (una fila por clave, p. ej. por región)
+# =========================
+# Las columnas se asocian por nombre y se convierten según el tipo declarado en
+# la tabla (REAL/INTEGER/TEXT), de forma vectorizada. Solo las filas que
+# cambiaron se escriben, en un único executemany.
+# Con la tabla tal como la cargó el cliente (base), se escriben solo las celdas
+# que el cliente modificó desde la carga; las demás conservan lo guardado, así
+# un cliente desactualizado no pisa lo que otros guardaron después. Sin base,
+# se compara con lo guardado y la fila completa gana (último en guardar).
+
+def tipos_tabla(cursor, tabla):
+    # {columna: tipo declarado} según PRAGMA table_info
+    return {fila[1]: (fila[2] or "").upper() for fila in cursor.execute(f"PRAGMA table_info({tabla})")}
+
+def tipar_columnas(df, tipos):
+    # '' y NaN pasan a None. Las columnas numéricas se convierten a número; un
+    # texto que no es número se conserva tal cual (igual que la afinidad de SQLite).
+    datos = df.reindex(columns=list(tipos)).astype(object)
+    datos = datos.where(datos.notna() & (datos != ''), None)
+    for columna, tipo in tipos.items():
+        serie = datos[columna]
+        if "INT" in tipo or "REAL" in tipo or "FLOA" in tipo or "DOUB" in tipo:
+            numeros = pd.to_numeric(serie, errors='coerce')
+            convertidos = numeros.astype(object)
+            if "INT" in tipo:
+                enteros = numeros.notna() & (numeros % 1 == 0)
+                convertidos[enteros] = numeros[enteros].astype('int64').astype(object)
+            datos[columna] = convertidos.where(numeros.notna(), serie)
+        elif "TEXT" in tipo or "CHAR" in tipo:
+            datos[columna] = serie.map(lambda v: v if v is None or isinstance(v, str) else str(v))
+    return datos.where(datos.notna(), None)
+
+def celdas_distintas(a, b):
+    # Matriz booleana de celdas distintas entre dos DataFrames alineados (None == None)
+    return ~((a == b) | (a.isna() & b.isna()))
+
+def upsert_filas_fijas(cursor, tabla, clave, columnas, df_bd, base=None):
+    # Debe llamarse con una transacción abierta (el llamador hace commit, así
+    # puede escribir historial o eventos en la misma transacción).
+    # df_bd y base usan los nombres de columnas de la BD e incluyen la clave.
+    # Devuelve (filas escritas, versión anterior de esas filas), ambas indexadas
+    # por la clave; en la anterior, las filas que no existían quedan vacías.
+    tipos = tipos_tabla(cursor, tabla)
+    tipos = {c: tipos.get(c, "") for c in columnas}
+    nuevas = tipar_columnas(df_bd, tipos).drop_duplicates(subset=clave, keep='last').set_index(clave)
+
+    lista_columnas = ", ".join(columnas)
+    cursor.execute(f"SELECT {lista_columnas} FROM {tabla}")
+    guardadas = pd.DataFrame(cursor.fetchall(), columns=columnas)
+    anteriores = tipar_columnas(guardadas, tipos).set_index(clave).reindex(nuevas.index)
+    existentes = nuevas.index.isin(guardadas[clave])
+
+    if base is not None:
+        # Celdas que el cliente modificó desde la carga, aplicadas sobre lo guardado
+        base = tipar_columnas(base, tipos).drop_duplicates(subset=clave, keep='last').set_index(clave)
+        mias = celdas_distintas(nuevas, base.reindex(nuevas.index))
+        fusionadas = anteriores.where(~mias, nuevas)
+        fusionadas.loc[~existentes] = nuevas.loc[~existentes]
+        nuevas = fusionadas
+    cambiadas = celdas_distintas(nuevas, anteriores).any(axis=1).to_numpy() | ~existentes
+    escritas = nuevas[cambiadas]
+    if len(escritas):
+        marcadores = ", ".join("?" for _ in columnas)
+        asignaciones = ", ".join(f"{c} = excluded.{c}" for c in columnas if c != clave)
+        cursor.executemany(
+            f"""INSERT INTO {tabla} ({lista_columnas}) VALUES ({marcadores})
+                ON CONFLICT({clave}) DO UPDATE SET {asignaciones}""",
+            escritas.reset_index()[columnas].itertuples(index=False, name=None),
+        )
+    return escritas, anteriores[cambiadas]
@@ -0,0 +1,393 @@
+# benchmarks/ejecutar.py
+import argparse
+import json
+import logging
+import os
+import platform
+import runpy
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from importlib.metadata import PackageNotFoundError, version
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+import streamlit as st
+
+import generadores
+
+# =========================
+# BENCHMARKS DE LAS RUTAS CRÍTICAS
+# =========================
+# Uso (desde la raíz del repositorio):
+#   python benchmarks/ejecutar.py                       # todo, con los tamaños completos
+#   python benchmarks/ejecutar.py --escala 0.1          # datos 10 veces más chicos
+#   python benchmarks/ejecutar.py --solo vacaciones preguntas
+#   python benchmarks/ejecutar.py --comparar benchmarks/resultados/anterior.json
+#
+# Todo corre en una carpeta temporal: las bases (.db) se crean vacías ahí y se
+# llenan con los generadores (generadores.py), así que no se toca ningún dato
+# real. Las páginas se cargan con streamlit en modo "bare" (sin servidor): se
+# ejecuta el script completo y se miden sus propias funciones (guardar_en_db,
+# actualizar_calendario, guardar_sucursales...), no una copia de ellas.
+#
+# El resultado es un JSON con, por benchmark, la cantidad de muestras y los
+# tiempos mínimo, mediana, p95, máximo y total en segundos, más los datos del
+# entorno (commit, Python, versiones de paquetes, escala y semilla).
+CARPETA_RESULTADOS = os.path.join(RAIZ, "benchmarks", "resultados")
+ARCHIVOS_APOYO = ["LOGO-PROPIO-ISL-2023-CMYK-01.png", "iconos"]
+PAQUETES = ["streamlit", "pandas", "numpy", "openpyxl"]
+
+REPETICIONES = 5
+UMBRAL_REGRESION = 0.10
+
+# Tablas por región: 10.000 ediciones por región, enviadas en guardados de
+# EDICIONES_POR_GUARDADO ediciones por región (un guardado por ronda)
+EDICIONES_POR_REGION = 10_000
+EDICIONES_POR_GUARDADO = 20
+
+GRUPOS = {}
+
+def grupo(nombre):
+    def registrar(funcion):
+        GRUPOS[nombre] = funcion
+        return funcion
+    return registrar
+
+# =========================
+# MEDICIÓN
+# =========================
+class Medidor:
+    def __init__(self, repeticiones, escala, semilla):
+        self.repeticiones = repeticiones
+        self.escala = escala
+        self.semilla = semilla
+        self.resultados = {}
+
+    def n(self, tamano):
+        # Tamaño de un conjunto de datos según la escala pedida
+        return max(1, int(tamano * self.escala))
+
+    def rondas(self):
+        return max(1, self.n(EDICIONES_POR_REGION) // EDICIONES_POR_GUARDADO)
+
+    def _guardar(self, nombre, muestras, tamano):
+        ordenadas = sorted(muestras)
+        self.resultados[nombre] = {
+            "muestras": len(ordenadas),
+            "min_s": ordenadas[0],
+            "mediana_s": statistics.median(ordenadas),
+            "p95_s": ordenadas[min(len(ordenadas) - 1, int(len(ordenadas) * 0.95))],
+            "max_s": ordenadas[-1],
+            "total_s": sum(ordenadas),
+            "tamano": tamano,
+        }
+        print(f"  {nombre:<40} {statistics.median(ordenadas) * 1000:>10.2f} ms  (n={len(ordenadas)})", flush=True)
+
+    def medir(self, nombre, funcion, preparar=None, repeticiones=None, **tamano):
+        # Llama a funcion() varias veces; preparar() (sin medir) entrega su argumento
+        muestras = []
+        for _ in range(repeticiones or self.repeticiones):
+            argumentos = (preparar(),) if preparar else ()
+            inicio = time.perf_counter()
+            funcion(*argumentos)
+            muestras.append(time.perf_counter() - inicio)
+        self._guardar(nombre, muestras, tamano)
+
+    def cronometrar(self, nombre, elementos, paso, **tamano):
+        # Una muestra por elemento (cada consulta, cada ronda de edición...)
+        muestras = []
+        for elemento in elementos:
+            inicio = time.perf_counter()
+            paso(elemento)
+            muestras.append(time.perf_counter() - inicio)
+        self._guardar(nombre, muestras, tamano)
+
+def cargar_pagina(script):
+    # Ejecuta la página en modo bare y devuelve sus variables globales
+    return runpy.run_path(os.path.join(RAIZ, script), run_name="__benchmark__")
+
+def vaciar_tabla(conectar, tabla):
+    with conectar() as conn:
+        conn.execute(f"DELETE FROM {tabla}")
+        conn.commit()
+
+# =========================
+# CONTACTOS
+# =========================
+@grupo("contactos")
+def benchmarks_contactos(m):
+    import pandas as pd
+
+    from contactos_bd import COLUMNAS_BD, MAPEO_BD_UI, TAMANO_LOTE_IMPORTACION
+    from exportacion import escribir_libro
+
+    pagina = cargar_pagina("contactos_app.py")
+    datos = generadores.contactos(m.n(100_000), m.semilla)
+    lotes = [datos.iloc[i:i + TAMANO_LOTE_IMPORTACION] for i in range(0, len(datos), TAMANO_LOTE_IMPORTACION)]
+    filas = len(datos)
+
+    m.medir("contactos.importar_nuevos", pagina["importar_contactos"],
+            preparar=lambda: (vaciar_tabla(pagina["conectar"], "contactos"), lotes)[1],
+            repeticiones=1, filas=filas)
+    m.medir("contactos.importar_existentes", lambda: pagina["importar_contactos"](lotes), filas=filas)
+    m.medir("contactos.pagina", lambda: pagina["pagina"](None, None), filas=filas)
+    m.medir("contactos.pagina_filtrada", lambda: pagina["pagina"](generadores.CARGOS[0], None), filas=filas)
+    m.cronometrar("contactos.buscar_difuso", generadores.consultas_contactos(50, m.semilla),
+                  pagina["buscar_difuso"], filas=filas)
+
+    # Flujo de la página: se carga la primera página, se editan 3 filas y se guarda
+    def pagina_editada():
+        st.session_state.contactos_pila = [None]
+        pagina["cargar_pagina"]()
+        df = st.session_state.contactos.copy()
+        df.iloc[:3, df.columns.get_loc("Cargo")] = df["Cargo"].iloc[:3].str[::-1]
+        return df
+    m.medir("contactos.guardar_en_bd", pagina["guardar_en_bd"], preparar=pagina_editada, filas=filas)
+
+    # El mismo guardado con el directorio completo en la tabla y el 1 % editado
+    def directorio_editado():
+        with pagina["conectar"]() as conn:
+            df = pd.read_sql_query(f"SELECT {', '.join(COLUMNAS_BD)}, id FROM contactos ORDER BY id", conn)
+        df = df.rename(columns=MAPEO_BD_UI)
+        st.session_state.contactos_guardado = pagina["contactos_a_bd"](df)
+        editadas = df.sample(frac=0.01, random_state=m.semilla).index
+        df.loc[editadas, "Cargo"] = df.loc[editadas, "Cargo"].str[::-1]
+        return df
+    m.medir("contactos.guardar_en_bd_completo", pagina["guardar_en_bd"], preparar=directorio_editado,
+            repeticiones=min(m.repeticiones, 3), filas=filas)
+
+    m.medir("contactos.exportar", lambda: escribir_libro(pagina["hojas_contactos"]()),
+            repeticiones=min(m.repeticiones, 3), filas=filas)
+
+# =========================
+# VACACIONES
+# =========================
+@grupo("vacaciones")
+def benchmarks_vacaciones(m):
+    from calendario import ventana_meses
+    from exportacion import escribir_libro
+
+    pagina = cargar_pagina("vacaciones_feriados.py")
+    registros = generadores.vacaciones(pagina["PERSONAS"], m.n(50_000), semilla=m.semilla)
+    filas = len(registros)
+    actual = {}
+
+    def registros_nuevos():
+        vaciar_tabla(pagina["conectar"], "vacaciones")
+        st.session_state.vacaciones_guardado = None
+        actual["df"] = registros.copy()
+        return actual["df"]
+    m.medir("vacaciones.guardar_en_db_inicial", pagina["guardar_en_db"], preparar=registros_nuevos,
+            repeticiones=min(m.repeticiones, 3), filas=filas)
+
+    # Guardados sucesivos con el 1 % de los registros movidos de fecha
+    semillas = iter(range(m.semilla, m.semilla + m.repeticiones))
+    def registros_editados():
+        actual["df"] = generadores.editar_fechas(actual["df"], 0.01, next(semillas))
+        return actual["df"]
+    m.medir("vacaciones.guardar_en_db", pagina["guardar_en_db"], preparar=registros_editados, filas=filas)
+
+    m.medir("vacaciones.cargar_desde_db", pagina["cargar_desde_db"], filas=filas)
+
+    def registros_sin_calendario():
+        st.session_state.vacaciones_data = actual["df"]
+        st.session_state.pop("calendario_firma", None)
+    m.medir("vacaciones.actualizar_calendario", lambda _: pagina["actualizar_calendario"](),
+            preparar=registros_sin_calendario, filas=filas)
+
+    desde, hasta = ventana_meses(date(2023, 1, 1), 3)
+    def ventana_nueva():
+        st.session_state.pop("calendario_ventana_clave", None)
+    m.medir("vacaciones.calendario_ventana", lambda _: pagina["calendario_ventana"](desde, hasta),
+            preparar=ventana_nueva, filas=filas, dias=(hasta - desde).days + 1)
+
+    m.medir("vacaciones.exportar",
+            lambda: escribir_libro(pagina["hojas_exportacion"](actual["df"], st.session_state.calendario_intervalos, 2023)),
+            repeticiones=min(m.repeticiones, 3), filas=filas)
+
+# =========================
+# PREGUNTAS FRECUENTES
+# =========================
+@grupo("preguntas")
+def benchmarks_preguntas(m):
+    from buscador_preguntas import ARCHIVO_PREGUNTAS, asegurar_indice, buscar
+
+    preguntas = generadores.preguntas(m.n(5_000), m.semilla)
+    generadores.escribir_preguntas(preguntas, ARCHIVO_PREGUNTAS)
+    filas = len(preguntas)
+
+    # Cambiar la fecha del archivo obliga a reconstruir el índice
+    def archivo_modificado():
+        os.utime(ARCHIVO_PREGUNTAS)
+    m.medir("preguntas.indexar", lambda _: asegurar_indice(), preparar=archivo_modificado,
+            repeticiones=min(m.repeticiones, 3), filas=filas)
+
+    m.cronometrar("preguntas.buscar", generadores.consultas_preguntas(50, m.semilla), buscar, filas=filas)
+    m.medir("preguntas.buscar_todo", lambda: buscar(""), filas=filas)
+
+# =========================
+# TABLAS POR REGIÓN
+# =========================
+@grupo("emergencias")
+def benchmarks_emergencias(m):
+    from emergencias_bd import COLUMNAS_EVENTO, MAPEO_BD_UI, estado_actual, eventos, periodos
+    from exportacion import escribir_libro, hoja_desde_dataframe
+
+    pagina = cargar_pagina("Tabla_emergencias.py")
+    columnas = [MAPEO_BD_UI[c] for c in COLUMNAS_EVENTO]
+    rondas = m.rondas()
+    regiones = len(pagina["regiones"])
+    tamano = {"regiones": regiones, "ediciones": regiones * rondas * EDICIONES_POR_GUARDADO}
+    inicio = datetime.now()
+
+    # El guardado de la página: se envían la tabla, la base y las versiones
+    # cargadas, y luego se traen los cambios (propios y ajenos) desde la BD
+    def guardar(ronda):
+        pagina["guardar_emergencias"](ronda, st.session_state.base_emergencias,
+                                      st.session_state.versiones_emergencias)
+        st.session_state.df_emergencias = ronda.copy()
+        pagina["aplicar_cambios_remotos"]()
+    m.cronometrar("emergencias.guardar",
+                  generadores.ediciones_tabla(pagina["crear_df_base"](), columnas, generadores.valor_emergencia,
+                                              rondas, EDICIONES_POR_GUARDADO, m.semilla),
+                  guardar, **tamano)
+
+    fin = datetime.now() + timedelta(seconds=1)
+    m.medir("emergencias.cargar", pagina["cargar_emergencias"], **tamano)
+    m.medir("emergencias.estado_actual", estado_actual, **tamano)
+    m.medir("emergencias.eventos", lambda: eventos(inicio, fin), **tamano)
+    m.medir("emergencias.eventos_region", lambda: eventos(inicio, fin, regiones=pagina["regiones"][:1]), **tamano)
+    m.medir("emergencias.periodos", lambda: periodos(pagina["regiones"][0], "Agua", inicio, fin), **tamano)
+    m.medir("emergencias.exportar",
+            lambda: escribir_libro([hoja_desde_dataframe("Sheet1", st.session_state.df_emergencias)]), **tamano)
+
+@grupo("movilizacion")
+def benchmarks_movilizacion(m):
+    from exportacion import escribir_libro, hoja_desde_dataframe
+
+    pagina = cargar_pagina("Tabla_Paro.py")
+    base = pagina["crear_df_base"]()
+    columnas = [c for c in base.columns if c != "Región"]
+    rondas = m.rondas()
+    regiones = len(pagina["regiones"])
+    tamano = {"regiones": regiones, "ediciones": regiones * rondas * EDICIONES_POR_GUARDADO}
+    ultima = {"df": base}
+
+    # Como en la página: cada guardado se compara con la tabla cargada (la ronda anterior)
+    def guardar(ronda):
+        pagina["guardar_sucursales"](ronda, ultima["df"])
+        ultima["df"] = ronda
+    m.cronometrar("movilizacion.guardar_sucursales",
+                  generadores.ediciones_tabla(base, columnas, generadores.valor_movilizacion,
+                                              rondas, EDICIONES_POR_GUARDADO, m.semilla),
+                  guardar, **tamano)
+    m.medir("movilizacion.cargar_datos", pagina["cargar_datos"], **tamano)
+    m.medir("movilizacion.exportar", lambda: escribir_libro([hoja_desde_dataframe("Sheet1", ultima["df"])]),
+            **tamano)
+
+# =========================
+# RESULTADOS
+# =========================
+def _git(*argumentos):
+    try:
+        return subprocess.run(["git", *argumentos], cwd=RAIZ, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def entorno(argumentos):
+    paquetes = {}
+    for paquete in PAQUETES:
+        try:
+            paquetes[paquete] = version(paquete)
+        except PackageNotFoundError:
+            paquetes[paquete] = None
+    estado = _git("status", "--porcelain", "--untracked-files=no")
+    return {
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "commit": _git("rev-parse", "--short", "HEAD"),
+        "cambios_sin_confirmar": bool(estado) if estado is not None else None,
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "paquetes": paquetes,
+        "escala": argumentos.escala,
+        "semilla": argumentos.semilla,
+        "repeticiones": argumentos.repeticiones,
+    }
+
+def comparar(actual, base, umbral):
+    # Imprime la razón entre medianas y devuelve los benchmarks más lentos que el umbral
+    if (actual["entorno"]["escala"], actual["entorno"]["semilla"]) != (base["entorno"]["escala"], base["entorno"]["semilla"]):
+        print("Aviso: la escala o la semilla no coinciden; la comparación no es directa.")
+    print(f"\nComparación con {base['entorno'].get('commit')} ({base['entorno'].get('fecha')}):")
+    regresiones = []
+    for nombre, resultado in actual["resultados"].items():
+        anterior = base["resultados"].get(nombre)
+        if anterior is None or not anterior["mediana_s"]:
+            continue
+        razon = resultado["mediana_s"] / anterior["mediana_s"]
+        marca = ""
+        if razon > 1 + umbral:
+            marca = "  <-- más lento"
+            regresiones.append(nombre)
+        elif razon < 1 - umbral:
+            marca = "  más rápido"
+        print(f"  {nombre:<40} {anterior['mediana_s'] * 1000:>10.2f} -> {resultado['mediana_s'] * 1000:>10.2f} ms  x{razon:.2f}{marca}")
+    return regresiones
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks de las rutas críticas de SCT")
+    parser.add_argument("--escala", type=float, default=1.0, help="factor sobre los tamaños de los datos sintéticos")
+    parser.add_argument("--semilla", type=int, default=generadores.SEMILLA)
+    parser.add_argument("--repeticiones", type=int, default=REPETICIONES)
+    parser.add_argument("--solo", nargs="+", choices=list(GRUPOS), help="grupos a ejecutar (por defecto todos)")
+    parser.add_argument("--salida", help="archivo JSON de resultados (por defecto en benchmarks/resultados/)")
+    parser.add_argument("--comparar", help="JSON de una ejecución anterior para comparar")
+    parser.add_argument("--umbral", type=float, default=UMBRAL_REGRESION,
+                        help="fracción de aumento de la mediana que cuenta como regresión")
+    argumentos = parser.parse_args()
+
+    # Sin servidor streamlit avisa en cada llamada que no hay sesión; no es un error
+    logging.disable(logging.WARNING)
+    datos = {"entorno": entorno(argumentos), "resultados": {}}
+    m = Medidor(argumentos.repeticiones, argumentos.escala, argumentos.semilla)
+
+    directorio_original = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="sct_benchmarks_") as carpeta:
+        for archivo in ARCHIVOS_APOYO:
+            origen = os.path.join(RAIZ, archivo)
+            if os.path.isdir(origen):
+                shutil.copytree(origen, os.path.join(carpeta, archivo))
+            elif os.path.exists(origen):
+                shutil.copy2(origen, carpeta)
+        os.chdir(carpeta)
+        try:
+            for nombre in argumentos.solo or list(GRUPOS):
+                print(f"{nombre}:", flush=True)
+                GRUPOS[nombre](m)
+        finally:
+            os.chdir(directorio_original)
+    datos["resultados"] = m.resultados
+
+    salida = argumentos.salida
+    if salida is None:
+        os.makedirs(CARPETA_RESULTADOS, exist_ok=True)
+        marca = datetime.now().strftime("%Y%m%d-%H%M%S")
+        salida = os.path.join(CARPETA_RESULTADOS, f"{marca}_{datos['entorno']['commit'] or 'sin-git'}.json")
+    with open(salida, "w", encoding="utf-8") as f:
+        json.dump(datos, f, ensure_ascii=False, indent=2)
+    print(f"\nResultados en {salida}")
+
+    if argumentos.comparar:
+        with open(argumentos.comparar, encoding="utf-8") as f:
+            regresiones = comparar(datos, json.load(f), argumentos.umbral)
+        if regresiones:
+            print(f"\n{len(regresiones)} benchmark(s) más lentos que el umbral ({argumentos.umbral:.0%}).")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
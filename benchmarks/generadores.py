@@ -0,0 +1,175 @@
+# benchmarks/generadores.py
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+# =========================
+# DATOS SINTÉTICOS
+# =========================
+# Cada generador recibe una semilla: con la misma semilla y el mismo tamaño
+# produce exactamente los mismos datos, así los resultados de dos versiones
+# del código se comparan sobre la misma carga.
+SEMILLA = 2025
+
+NOMBRES = [
+    "María", "José", "Camila", "Andrés", "Valentina", "Sebastián", "Javiera", "Matías",
+    "Francisca", "Felipe", "Constanza", "Ignacio", "Daniela", "Tomás", "Catalina", "Nicolás",
+    "Fernanda", "Cristóbal", "Antonia", "Benjamín", "Paula", "Diego", "Carolina", "Joaquín",
+]
+APELLIDOS = [
+    "González", "Muñoz", "Rojas", "Díaz", "Pérez", "Soto", "Contreras", "Silva",
+    "Martínez", "Sepúlveda", "Morales", "Rodríguez", "López", "Fuentes", "Hernández", "Torres",
+    "Araya", "Flores", "Espinoza", "Valenzuela", "Castillo", "Tapia", "Reyes", "Gutiérrez",
+]
+CARGOS = [
+    "DIRECTOR/A REGIONAL", "DIRECTOR/A REGIONAL(S)", "JEFA/E DPTO. ATENCIÓN DE USUARIOS",
+    "JEFA/E DIVISIÓN OPERACIONES", "JEFA/E DEPARTAMENTO JURÍDICO", "PROFESIONAL", "ADMINISTRATIVO/A",
+    "TÉCNICO/A", "ANALISTA", "ENCARGADO/A DE SUCURSAL",
+]
+DEPARTAMENTOS = [
+    "DIRECCIÓN NACIONAL", "COORDINACIÓN TERRITORIAL", "DAU", "DAF", "DIVOP", "DTI", "DEGE",
+    "ANTOFAGASTA", "TARAPACÁ", "ATACAMA", "COQUIMBO", "VALPARAÍSO", "MAULE", "BIOBIO",
+    "LOS LAGOS", "MAGALLANES", "E.METROPOLITANA", "ÑUBLE",
+]
+PALABRAS_FAQ = [
+    "accidente", "trabajo", "trayecto", "denuncia", "prevención", "riesgo", "empresa", "trabajador",
+    "licencia", "médica", "subsidio", "pensión", "invalidez", "indemnización", "cotización",
+    "afiliación", "sucursal", "atención", "plazo", "días", "certificado", "reclamo", "evaluación",
+    "incapacidad", "enfermedad", "profesional", "capacitación", "asesoría", "comité", "paritario",
+    "mutualidad", "seguro", "ley", "beneficio", "solicitud", "documento", "formulario", "región",
+]
+
+def _rng(semilla):
+    return np.random.default_rng(semilla)
+
+# =========================
+# CONTACTOS
+# =========================
+def contactos(n=100_000, semilla=SEMILLA):
+    # DataFrame con las columnas de la interfaz (contactos_bd.COLUMNAS_UI).
+    # Los correos llevan el número de fila, así que no se repiten.
+    rng = _rng(semilla)
+    nombres = rng.choice(NOMBRES, n)
+    apellidos = rng.choice(APELLIDOS, n)
+    celulares = rng.integers(10_000_000, 99_999_999, n)
+    return pd.DataFrame({
+        "Nombre": [f"{a} {b}" for a, b in zip(nombres, apellidos)],
+        "Cargo": rng.choice(CARGOS, n),
+        "Dpto./Región": rng.choice(DEPARTAMENTOS, n),
+        "Teléfono Directo/Anexo": [f"22{x:07d}" for x in rng.integers(0, 9_999_999, n)],
+        "Celular Institucional": [f"+56 9 {x}" for x in celulares],
+        "Celular Particular": np.where(rng.random(n) < 0.3, [f"9{x}" for x in rng.integers(10_000_000, 99_999_999, n)], ""),
+        "Correo": [f"{i}.{b.lower()}@isl.gob.cl" for i, b in enumerate(apellidos)],
+    })
+
+# =========================
+# VACACIONES
+# =========================
+def vacaciones(personas, n=50_000, anios=5, desde=date(2021, 1, 1), semilla=SEMILLA):
+    # Registros como los muestra la página (sin id: todos son nuevos), repartidos
+    # en `anios` años desde `desde`, de 1 a 15 días cada uno.
+    # personas: DataFrame con id, nombre y rol (tabla personas).
+    rng = _rng(semilla)
+    elegidas = personas.iloc[rng.integers(0, len(personas), n)]
+    dias = (date(desde.year + anios, 1, 1) - desde).days
+    inicios = [desde + timedelta(days=int(d)) for d in rng.integers(0, dias, n)]
+    duraciones = rng.integers(0, 15, n)
+    return pd.DataFrame({
+        "Seleccionar": False,
+        "Jefatura Regional": elegidas["nombre"].to_numpy(),
+        "Director Regional/Subrogante": elegidas["rol"].to_numpy(),
+        "Fecha Inicio": inicios,
+        "Fecha Término": [i + timedelta(days=int(d)) for i, d in zip(inicios, duraciones)],
+        "persona_id": elegidas["id"].to_numpy(),
+    })
+
+def editar_fechas(registros, fraccion=0.01, semilla=SEMILLA):
+    # Copia de los registros con una fracción de ellos desplazada 1 a 7 días
+    rng = _rng(semilla)
+    editados = registros.copy()
+    filas = rng.choice(len(editados), max(1, int(len(editados) * fraccion)), replace=False)
+    desplazamiento = [timedelta(days=int(d)) for d in rng.integers(1, 8, len(filas))]
+    for columna in ["Fecha Inicio", "Fecha Término"]:
+        posicion = editados.columns.get_loc(columna)
+        editados.iloc[filas, posicion] = [f + d for f, d in zip(editados.iloc[filas, posicion], desplazamiento)]
+    return editados
+
+# =========================
+# PREGUNTAS FRECUENTES
+# =========================
+def _frase(rng, minimo, maximo):
+    return " ".join(rng.choice(PALABRAS_FAQ, int(rng.integers(minimo, maximo))))
+
+def preguntas(n=5_000, semilla=SEMILLA):
+    # DataFrame con las columnas Pregunta y Respuesta que espera buscador_preguntas
+    rng = _rng(semilla)
+    return pd.DataFrame({
+        "Pregunta": [f"¿{_frase(rng, 5, 12).capitalize()}?" for _ in range(n)],
+        "Respuesta": [_frase(rng, 30, 80).capitalize() + "." for _ in range(n)],
+    })
+
+def escribir_preguntas(df, archivo):
+    from openpyxl import Workbook
+
+    libro = Workbook(write_only=True)
+    hoja = libro.create_sheet()
+    hoja.append(list(df.columns))
+    for fila in df.itertuples(index=False, name=None):
+        hoja.append(list(fila))
+    libro.save(archivo)
+
+def consultas_preguntas(n=50, semilla=SEMILLA):
+    # Textos de búsqueda: una o dos palabras, a veces sin tildes o cortadas (prefijos)
+    rng = _rng(semilla)
+    consultas = []
+    for _ in range(n):
+        palabras = list(rng.choice(PALABRAS_FAQ, int(rng.integers(1, 3))))
+        if rng.random() < 0.3:
+            palabras[-1] = palabras[-1][:4]
+        if rng.random() < 0.3:
+            palabras = [p.replace("ó", "o").replace("í", "i").replace("é", "e") for p in palabras]
+        consultas.append(" ".join(palabras))
+    return consultas
+
+def consultas_contactos(n=50, semilla=SEMILLA):
+    # Búsquedas aproximadas del directorio, con errores de tipeo ocasionales
+    rng = _rng(semilla)
+    consultas = []
+    for _ in range(n):
+        texto = f"{rng.choice(NOMBRES)} {rng.choice(APELLIDOS)}".lower()
+        if rng.random() < 0.5:
+            i = int(rng.integers(1, len(texto) - 1))
+            texto = texto[:i] + texto[i + 1:]
+        consultas.append(texto)
+    return consultas
+
+# =========================
+# TABLAS POR REGIÓN (Tabla_emergencias / Tabla_Paro)
+# =========================
+VALORES_SI_NO = ["Si", "No", "Parcial", ""]
+
+def valor_emergencia(rng, columna):
+    if "Si/No" in columna or columna in ("Agua", "Electricidad", "Internet", "Cuenta con VPN"):
+        return VALORES_SI_NO[int(rng.integers(0, len(VALORES_SI_NO)))]
+    return _frase(rng, 1, 8)
+
+def valor_movilizacion(rng, columna):
+    if columna == "% Adhesión":
+        return round(float(rng.uniform(0, 100)), 2)
+    return _frase(rng, 1, 4)
+
+def ediciones_tabla(df_base, columnas, valor, rondas=500, ediciones_por_ronda=20, semilla=SEMILLA):
+    # Generador de rondas de edición sobre una tabla de una fila por región
+    # (cada ronda es lo que se envía en un guardado). En cada ronda cada región
+    # cambia `ediciones_por_ronda` campos al azar de `columnas` por
+    # valor(rng, columna): con 16 regiones, 500 rondas y 20 ediciones por ronda
+    # son 10.000 ediciones por región.
+    rng = _rng(semilla)
+    actual = df_base.astype(object)
+    for _ in range(rondas):
+        actual = actual.copy()
+        for fila in range(len(actual)):
+            for columna in rng.choice(columnas, ediciones_por_ronda):
+                actual.iat[fila, actual.columns.get_loc(columna)] = valor(rng, columna)
+        yield actual
@@ -0,0 +1,121 @@
+# buscador_preguntas.py
+import os
+import re
+from collections import namedtuple
+
+import streamlit as st
+
+from arranque import diferido
+from base_datos import conexion
+
+# pandas solo se usa para leer el Excel al reconstruir el índice (ver arranque.py)
+pd = diferido("pandas")
+
+# =========================
+# ÍNDICE DE TEXTO COMPLETO (SQLite FTS5)
+# =========================
+# Las preguntas se cargan una vez en un índice FTS5. El tokenizador
+# unicode61 con remove_diacritics hace que "prevencion" encuentre "Prevención".
+# El índice solo se reconstruye cuando cambia la fecha de modificación del Excel.
+ARCHIVO_PREGUNTAS = "preguntas.xlsx"
+DB_INDICE = "preguntas_indice.db"
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS indice_meta (
+    clave TEXT PRIMARY KEY,
+    valor TEXT
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS preguntas_fts USING fts5(
+    Pregunta, Respuesta,
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+"""
+
+# Peso de cada columna en el ranking BM25 (la pregunta pesa más que la respuesta)
+PESO_PREGUNTA = 2.0
+PESO_RESPUESTA = 1.0
+
+MARCA_INICIO = "<mark>"
+MARCA_FIN = "</mark>"
+
+Resultado = namedtuple("Resultado", ["Pregunta", "Respuesta", "PreguntaResaltada", "RespuestaResaltada", "Fragmento"])
+
+def _reconstruir_indice(conn, archivo, mtime):
+    df = pd.read_excel(archivo)
+    if "Pregunta" not in df.columns or "Respuesta" not in df.columns:
+        return False
+
+    df = df[["Pregunta", "Respuesta"]].fillna("").astype(str)
+    cursor = conn.cursor()
+    cursor.execute("BEGIN IMMEDIATE")
+    try:
+        # Otro proceso pudo reconstruirlo mientras esperábamos el bloqueo
+        fila = cursor.execute("SELECT valor FROM indice_meta WHERE clave = 'mtime'").fetchone()
+        if fila is None or fila[0] != mtime:
+            cursor.execute("DELETE FROM preguntas_fts")
+            cursor.executemany(
+                "INSERT INTO preguntas_fts (rowid, Pregunta, Respuesta) VALUES (?, ?, ?)",
+                [(i + 1, p, r) for i, (p, r) in enumerate(df.itertuples(index=False))],
+            )
+            cursor.execute(
+                "INSERT OR REPLACE INTO indice_meta (clave, valor) VALUES ('mtime', ?)", (mtime,)
+            )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return True
+
+@st.cache_resource(show_spinner=False)
+def _indexar(archivo, mtime):
+    # Se ejecuta una vez por proceso y versión del archivo
+    with conexion(DB_INDICE, ESQUEMA) as conn:
+        fila = conn.execute("SELECT valor FROM indice_meta WHERE clave = 'mtime'").fetchone()
+        if fila is not None and fila[0] == mtime:
+            return True
+        return _reconstruir_indice(conn, archivo, mtime)
+
+def asegurar_indice(archivo=ARCHIVO_PREGUNTAS):
+    # Devuelve False si el Excel no tiene las columnas 'Pregunta' y 'Respuesta'.
+    # Lanza FileNotFoundError si el archivo no existe.
+    mtime = str(os.path.getmtime(archivo))
+    return _indexar(archivo, mtime)
+
+def construir_consulta(texto):
+    # Cada palabra se busca como prefijo y entre comillas, para que la
+    # sintaxis de FTS5 (AND, OR, *, comillas...) escrita por el usuario no falle.
+    palabras = re.findall(r"\w+", texto or "")
+    return " ".join(f'"{p}"*' for p in palabras)
+
+# =========================
+# BÚSQUEDA
+# =========================
+def buscar(texto, limite=200):
+    # Lista de Resultado ordenada por BM25, con los términos encontrados resaltados.
+    # Se lee directo del cursor: mostrar resultados no necesita pandas.
+    consulta = construir_consulta(texto)
+    with conexion(DB_INDICE, ESQUEMA) as conn:
+        if not consulta:
+            filas = conn.execute(
+                """SELECT Pregunta, Respuesta,
+                          Pregunta AS PreguntaResaltada,
+                          Respuesta AS RespuestaResaltada,
+                          '' AS Fragmento
+                   FROM preguntas_fts ORDER BY rowid"""
+            ).fetchall()
+        else:
+            filas = conn.execute(
+                f"""SELECT Pregunta, Respuesta,
+                       highlight(preguntas_fts, 0, ?, ?) AS PreguntaResaltada,
+                       highlight(preguntas_fts, 1, ?, ?) AS RespuestaResaltada,
+                       snippet(preguntas_fts, 1, ?, ?, '…', 24) AS Fragmento
+                FROM preguntas_fts
+                WHERE preguntas_fts MATCH ?
+                ORDER BY bm25(preguntas_fts, {PESO_PREGUNTA}, {PESO_RESPUESTA})
+                LIMIT ?""",
+                (
+                    MARCA_INICIO, MARCA_FIN, MARCA_INICIO, MARCA_FIN,
+                    MARCA_INICIO, MARCA_FIN, consulta, limite,
+                ),
+            ).fetchall()
+    return [Resultado._make(f) for f in filas]
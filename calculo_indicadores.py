@@ -0,0 +1,255 @@
+# calculo_indicadores.py
+import re
+
+import streamlit as st
+
+from ingesta import asegurar_libro, conectar, consultar
+
+# =========================
+# INDICADORES DE PREVENCIÓN
+# =========================
+# Los indicadores se calculan por hoja a partir de las celdas ya ingestadas y
+# se guardan en cache_libros.db. Cada hoja recuerda la huella con la que se
+# calculó: al agregar o modificar una hoja (p. ej. la de un mes nuevo) solo se
+# recalcula esa hoja; las demás se leen tal cual desde la caché.
+# Lo calculado también depende de este código: ind_version guarda la versión
+# del cálculo, y si no es VERSION_CALCULO se descartan ind_hojas y las tablas
+# ind_* y se recalculan todas las hojas.
+LIBRO = "indicadores"
+
+# Subir este número cuando cambien los cálculos (fórmulas, columnas de ind_*)
+VERSION_CALCULO = 1
+
+MESES = [
+    "Enero", "Febrero", "Marzo", "Abril", "Mayo", "Junio",
+    "Julio", "Agosto", "Septiembre", "Octubre", "Noviembre", "Diciembre",
+]
+
+ESQUEMA_INDICADORES = [
+    """CREATE TABLE IF NOT EXISTS ind_hojas (
+        hoja TEXT PRIMARY KEY,
+        huella TEXT,
+        actualizacion TEXT
+    )""",
+    """CREATE TABLE IF NOT EXISTS ind_procesos (
+        hoja TEXT, proceso TEXT,
+        meta REAL, iniciados REAL, finalizados REAL,
+        pct_finalizados REAL
+    )""",
+    """CREATE TABLE IF NOT EXISTS ind_regiones (
+        hoja TEXT, proceso TEXT, region TEXT,
+        iniciados REAL, finalizados REAL, meta REAL, avance REAL, diferencia REAL
+    )""",
+    """CREATE TABLE IF NOT EXISTS ind_mensual (
+        hoja TEXT, region TEXT, proceso TEXT, mes TEXT, num_mes INTEGER,
+        acum_iniciados REAL, acum_finalizados REAL, meta_acumulada REAL,
+        iniciados_mes REAL, finalizados_mes REAL, cumplimiento REAL
+    )""",
+    "CREATE INDEX IF NOT EXISTS idx_ind_procesos ON ind_procesos (hoja)",
+    "CREATE INDEX IF NOT EXISTS idx_ind_regiones ON ind_regiones (hoja, proceso)",
+    "CREATE INDEX IF NOT EXISTS idx_ind_mensual ON ind_mensual (hoja, region, proceso)",
+]
+
+TABLAS_CALCULADAS = ["ind_procesos", "ind_regiones", "ind_mensual"]
+
+# =========================
+# LECTURA DE BLOQUES DE LA HOJA
+# =========================
+def limpiar_texto(valor):
+    if valor is None:
+        return ""
+    return re.sub(r"\s+", " ", str(valor)).strip()
+
+def _numero(valor):
+    try:
+        return float(valor)
+    except (TypeError, ValueError):
+        return None
+
+def _division(a, b):
+    if a is None or not b:
+        return None
+    return a / b
+
+def _posiciones(celdas, encabezado):
+    return sorted(pos for pos, valor in celdas.items() if limpiar_texto(valor) == encabezado)
+
+def _es_region(etiqueta):
+    return etiqueta.startswith("DR.") or etiqueta == "Total general"
+
+def fecha_actualizacion(celdas):
+    for fila, columna in _posiciones(celdas, "Actualización"):
+        valor = celdas.get((fila + 1, columna))
+        if valor is not None:
+            return str(valor)[:10]
+    return None
+
+def calcular_procesos(celdas):
+    # Bloque META / Proc.Iniciados / Proc.Finalizados por proceso
+    filas = []
+    for fila, columna in _posiciones(celdas, "Proc.Iniciados"):
+        if not limpiar_texto(celdas.get((fila, columna - 1))).startswith("META"):
+            continue
+        f = fila + 1
+        while (f, columna - 2) in celdas:
+            proceso = limpiar_texto(celdas[(f, columna - 2)])
+            if proceso == "Total general":
+                break
+            iniciados = _numero(celdas.get((f, columna)))
+            finalizados = _numero(celdas.get((f, columna + 1)))
+            filas.append({
+                "proceso": proceso,
+                "meta": _numero(celdas.get((f, columna - 1))),
+                "iniciados": iniciados,
+                "finalizados": finalizados,
+                "pct_finalizados": _division(finalizados, iniciados),
+            })
+            f += 1
+    return filas
+
+def calcular_regiones(celdas):
+    # Bloques Proc.Inic. / Proc.Final. / Meta / AVANCE / Dif% por dirección regional
+    filas = []
+    for fila, columna in _posiciones(celdas, "Proc.Inic."):
+        proceso = ""
+        f = fila + 1
+        while (f, columna - 1) in celdas:
+            etiqueta = limpiar_texto(celdas[(f, columna - 1)])
+            if not _es_region(etiqueta):
+                proceso = etiqueta
+            elif etiqueta != "Total general":
+                filas.append({
+                    "proceso": proceso,
+                    "region": etiqueta,
+                    "iniciados": _numero(celdas.get((f, columna))),
+                    "finalizados": _numero(celdas.get((f, columna + 1))),
+                    "meta": _numero(celdas.get((f, columna + 2))),
+                    "avance": _numero(celdas.get((f, columna + 3))),
+                    "diferencia": _numero(celdas.get((f, columna + 4))),
+                })
+            f += 1
+    return filas
+
+def calcular_mensual(celdas):
+    # Bloque acumulado por región, proceso y mes (ACUM. INI / ACUM. FIN / META ACUM.)
+    filas = []
+    for fila, columna in _posiciones(celdas, "ACUM. INI"):
+        region = proceso = ""
+        anterior = {}
+        f = fila + 1
+        while any((f, c) in celdas for c in range(columna - 3, columna + 3)):
+            etiqueta_region = limpiar_texto(celdas.get((f, columna - 3)))
+            if etiqueta_region == "Total general":
+                break
+            # Tabla dinámica en formato esquema: región y proceso solo en su primera fila
+            region = etiqueta_region or region
+            proceso = limpiar_texto(celdas.get((f, columna - 2))) or proceso
+            mes = limpiar_texto(celdas.get((f, columna - 1)))
+            if mes in MESES:
+                acum_ini = _numero(celdas.get((f, columna)))
+                acum_fin = _numero(celdas.get((f, columna + 1)))
+                meta = _numero(celdas.get((f, columna + 2)))
+                clave = (region, proceso)
+                previo_ini, previo_fin = anterior.get(clave, (0.0, 0.0))
+                filas.append({
+                    "region": region,
+                    "proceso": proceso,
+                    "mes": mes,
+                    "num_mes": MESES.index(mes) + 1,
+                    "acum_iniciados": acum_ini,
+                    "acum_finalizados": acum_fin,
+                    "meta_acumulada": meta,
+                    "iniciados_mes": None if acum_ini is None else acum_ini - previo_ini,
+                    "finalizados_mes": None if acum_fin is None else acum_fin - previo_fin,
+                    "cumplimiento": _division(acum_fin, meta),
+                })
+                if acum_ini is not None and acum_fin is not None:
+                    anterior[clave] = (acum_ini, acum_fin)
+            f += 1
+    return filas
+
+CALCULOS = {
+    "ind_procesos": calcular_procesos,
+    "ind_regiones": calcular_regiones,
+    "ind_mensual": calcular_mensual,
+}
+
+# =========================
+# RECÁLCULO INCREMENTAL
+# =========================
+def _celdas_hoja(cursor, hoja):
+    return {
+        (fila, columna): valor
+        for fila, columna, valor in cursor.execute(
+            "SELECT fila, columna, valor FROM celdas WHERE libro = ? AND hoja = ?", (LIBRO, hoja)
+        )
+    }
+
+def _insertar(cursor, tabla, hoja, filas):
+    if not filas:
+        return
+    columnas = ["hoja"] + list(filas[0])
+    cursor.executemany(
+        f"INSERT INTO {tabla} ({', '.join(columnas)}) VALUES ({', '.join('?' for _ in columnas)})",
+        [(hoja,) + tuple(f.values()) for f in filas],
+    )
+
+def recalcular(conn):
+    # Devuelve las hojas que se recalcularon
+    cursor = conn.cursor()
+    cursor.execute("BEGIN IMMEDIATE")
+    try:
+        cursor.execute(
+            "CREATE TABLE IF NOT EXISTS ind_version (id INTEGER PRIMARY KEY CHECK (id = 1), version INTEGER NOT NULL)"
+        )
+        fila = cursor.execute("SELECT version FROM ind_version WHERE id = 1").fetchone()
+        if fila is None or fila[0] != VERSION_CALCULO:
+            for tabla in ["ind_hojas"] + TABLAS_CALCULADAS:
+                cursor.execute(f"DROP TABLE IF EXISTS {tabla}")
+            cursor.execute("INSERT OR REPLACE INTO ind_version (id, version) VALUES (1, ?)", (VERSION_CALCULO,))
+        for sql in ESQUEMA_INDICADORES:
+            cursor.execute(sql)
+        actuales = dict(cursor.execute(
+            "SELECT hoja, huella FROM hojas WHERE libro = ?", (LIBRO,)
+        ).fetchall())
+        calculadas = dict(cursor.execute("SELECT hoja, huella FROM ind_hojas").fetchall())
+
+        cambiadas = [h for h, huella in actuales.items() if calculadas.get(h) != huella]
+        for hoja in cambiadas + [h for h in calculadas if h not in actuales]:
+            for tabla in TABLAS_CALCULADAS:
+                cursor.execute(f"DELETE FROM {tabla} WHERE hoja = ?", (hoja,))
+            cursor.execute("DELETE FROM ind_hojas WHERE hoja = ?", (hoja,))
+
+        for hoja in cambiadas:
+            celdas = _celdas_hoja(cursor, hoja)
+            for tabla, calculo in CALCULOS.items():
+                _insertar(cursor, tabla, hoja, calculo(celdas))
+            cursor.execute(
+                "INSERT INTO ind_hojas (hoja, huella, actualizacion) VALUES (?, ?, ?)",
+                (hoja, actuales[hoja], fecha_actualizacion(celdas)),
+            )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return cambiadas
+
+@st.cache_resource(show_spinner=False)
+def _asegurar(version):
+    with conectar() as conn:
+        return recalcular(conn)
+
+def asegurar_indicadores():
+    # Devuelve la versión del libro (clave de caché para las consultas de la página)
+    version = asegurar_libro(LIBRO)
+    _asegurar(version)
+    return version
+
+# =========================
+# CONSULTAS
+# =========================
+@st.cache_data(show_spinner=False)
+def leer_indicadores(version, tabla):
+    if tabla not in TABLAS_CALCULADAS + ["ind_hojas"]:
+        raise ValueError(f"Tabla desconocida: {tabla}")
+    return consultar(f"SELECT * FROM {tabla}")
@@ -0,0 +1,155 @@
+# calendario.py
+import hashlib
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+# =========================
+# CÓDIGOS DEL CALENDARIO
+# =========================
+# La grilla se guarda como matriz int8 (personas x días); el texto solo se
+# genera al final para que estilo_calendario siga funcionando igual.
+SIN_REGISTRO = 0
+VACACIONES = 1
+SUBROGANTE = 2
+
+ETIQUETAS = np.array(['', 'Vacaciones', 'Subrogante'], dtype=object)
+
+CODIGOS_TIPO = {
+    "Director Regional": VACACIONES,
+    "Subrogante": SUBROGANTE,
+}
+
+COLUMNAS_REGISTRO = ['Jefatura Regional', 'Director Regional/Subrogante', 'Fecha Inicio', 'Fecha Término', 'persona_id']
+
+# =========================
+# FUNCIONES AUXILIARES
+# =========================
+def dias_entre(desde, hasta):
+    return pd.date_range(start=desde, end=hasta, freq='D')
+
+def dias_del_anio(year):
+    return dias_entre(date(year, 1, 1), date(year, 12, 31))
+
+def ventana_meses(inicio, meses):
+    # (primer día, último día) de los `meses` meses que parten en el mes de `inicio`
+    mes = pd.Period(inicio, freq='M')
+    return mes.start_time.date(), (mes + meses - 1).end_time.date()
+
+def mover_meses(inicio, meses):
+    return (pd.Period(inicio, freq='M') + meses).start_time.date()
+
+def firma_registros(registros):
+    # Huella de las columnas que afectan al calendario (no incluye 'Seleccionar')
+    if registros is None or registros.empty:
+        return ""
+    columnas = [c for c in COLUMNAS_REGISTRO if c in registros.columns]
+    valores = pd.util.hash_pandas_object(registros[columnas].astype(str), index=False)
+    return hashlib.sha1(valores.values.tobytes()).hexdigest()
+
+def buscar_fila(jefatura, nombres):
+    # Regla de coincidencia del calendario original: el primer nombre que contiene
+    # a la jefatura (o está contenido en ella), sin distinguir mayúsculas. Solo se
+    # usa para enlazar nombres escritos a mano con la tabla personas.
+    if not isinstance(jefatura, str):
+        return -1
+    jefatura_upper = jefatura.upper()
+    for i, nombre_cal in enumerate(nombres):
+        nombre_upper = nombre_cal.upper()
+        if jefatura_upper in nombre_upper or nombre_upper in jefatura_upper:
+            return i
+    return -1
+
+# =========================
+# INTERVALOS
+# =========================
+def construir_intervalos(registros, fila_por_persona):
+    # Convierte los registros en intervalos (fila, inicio, fin, codigo), en el
+    # mismo orden de los registros para que el último en guardarse prevalezca.
+    # fila_por_persona (Series id de persona -> fila del calendario) se cruza con
+    # persona_id por hash; los registros sin persona quedan fuera.
+    vacio = pd.DataFrame({
+        'fila': np.array([], dtype=np.int64),
+        'inicio': np.array([], dtype='datetime64[ns]'),
+        'fin': np.array([], dtype='datetime64[ns]'),
+        'codigo': np.array([], dtype=np.int8),
+    })
+    if registros is None or registros.empty:
+        return vacio
+
+    inicio = pd.to_datetime(registros['Fecha Inicio'], errors='coerce')
+    fin = pd.to_datetime(registros['Fecha Término'], errors='coerce')
+    codigo = registros['Director Regional/Subrogante'].map(CODIGOS_TIPO).fillna(SIN_REGISTRO)
+
+    if 'persona_id' in registros.columns:
+        persona = pd.to_numeric(registros['persona_id'], errors='coerce')
+        fila = persona.map(fila_por_persona).fillna(-1)
+    else:
+        fila = pd.Series(-1, index=registros.index)
+
+    intervalos = pd.DataFrame({
+        'fila': fila.to_numpy(dtype=np.int64),
+        'inicio': inicio.to_numpy(),
+        'fin': fin.to_numpy(),
+        'codigo': codigo.to_numpy(dtype=np.int8),
+    })
+    validos = (
+        (intervalos['fila'] >= 0)
+        & (intervalos['codigo'] != SIN_REGISTRO)
+        & intervalos['inicio'].notna()
+        & intervalos['fin'].notna()
+        & (intervalos['inicio'] <= intervalos['fin'])
+    )
+    return intervalos[validos].reset_index(drop=True)
+
+# =========================
+# MATRIZ DEL CALENDARIO
+# =========================
+# La matriz cubre solo la ventana [desde, hasta]: los intervalos se recortan a
+# ella, así que el costo depende del tamaño de la ventana y no del año completo.
+# Los registros que cruzan el cambio de año se ven en ambas ventanas.
+def construir_matriz(intervalos, n_filas, desde, hasta):
+    n_dias = len(dias_entre(desde, hasta))
+    matriz = np.zeros((n_filas, n_dias), dtype=np.int8)
+    if intervalos.empty:
+        return matriz
+
+    # Días relativos al inicio de la ventana, recortados a ella
+    base = np.datetime64(pd.Timestamp(desde).date(), 'D')
+    ini = (intervalos['inicio'].to_numpy().astype('datetime64[D]') - base).astype(np.int64)
+    fin = (intervalos['fin'].to_numpy().astype('datetime64[D]') - base).astype(np.int64)
+    ini = np.clip(ini, 0, None)
+    fin = np.clip(fin, None, n_dias - 1)
+    dentro = ini <= fin
+    if not dentro.any():
+        return matriz
+
+    ini = ini[dentro]
+    fin = fin[dentro]
+    filas = intervalos['fila'].to_numpy()[dentro]
+    codigos = intervalos['codigo'].to_numpy()[dentro]
+
+    # Expandir cada intervalo a sus celdas sin recorrer día por día
+    largos = fin - ini + 1
+    desplazamiento = np.arange(largos.sum()) - np.repeat(np.cumsum(largos) - largos, largos)
+    celdas = np.repeat(filas * n_dias + ini, largos) + desplazamiento
+    valores = np.repeat(codigos, largos)
+
+    # Si dos registros cubren la misma celda gana el último (como antes)
+    celdas_inv = celdas[::-1]
+    _, posiciones = np.unique(celdas_inv, return_index=True)
+    matriz.ravel()[celdas_inv[posiciones]] = valores[::-1][posiciones]
+    return matriz
+
+def matriz_a_dataframe(matriz, nombres, desde, hasta, regiones=None):
+    # Con regiones, las filas quedan indexadas por (Región, Nombre)
+    if regiones is None:
+        indice = pd.Index(list(nombres), name='Nombre')
+    else:
+        indice = pd.MultiIndex.from_arrays([list(regiones), list(nombres)], names=['Región', 'Nombre'])
+    return pd.DataFrame(
+        ETIQUETAS[matriz],
+        index=indice,
+        columns=dias_entre(desde, hasta).strftime('%Y-%m-%d'),
+    )
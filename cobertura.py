@@ -0,0 +1,90 @@
+# cobertura.py
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+# =========================
+# ÍNDICE DE OCUPACIÓN
+# =========================
+# Se construye a partir de los intervalos del calendario (fila, inicio, fin, codigo).
+# - Los extremos de todos los intervalos parten la línea de tiempo en tramos
+#   donde el conjunto de ausentes no cambia; cada consulta por día es una
+#   búsqueda binaria sobre esos extremos.
+# - Cada fila del calendario tiene su región (tabla personas). Una región queda
+#   sin cobertura cuando todas sus jefaturas (Director Regional y subrogantes)
+#   están ausentes a la vez; esos vacíos se guardan ya fusionados y ordenados.
+IndiceOcupacion = namedtuple("IndiceOcupacion", [
+    "nombres",    # nombres del calendario, en el orden de las filas
+    "bordes",     # inicio de cada tramo (días desde 1970-01-01), ordenado
+    "ausentes",   # matriz bool (tramos x personas)
+    "vacios",     # región -> (inicios, fines) de los días sin cobertura
+])
+
+def _dia(valor):
+    return np.datetime64(pd.Timestamp(valor).date(), 'D').astype(np.int64)
+
+def _fecha(dia):
+    return np.datetime64(int(dia), 'D').astype(object)
+
+def construir_indice(intervalos, nombres, regiones):
+    n_personas = len(nombres)
+    codigos, unicas = pd.factorize(pd.Series(list(regiones)))
+    if intervalos.empty:
+        vacio = np.array([], dtype=np.int64)
+        return IndiceOcupacion(list(nombres), vacio, np.zeros((0, n_personas), dtype=bool),
+                               {region: (vacio, vacio) for region in unicas})
+
+    ini = intervalos['inicio'].to_numpy().astype('datetime64[D]').astype(np.int64)
+    fin = intervalos['fin'].to_numpy().astype('datetime64[D]').astype(np.int64) + 1
+    filas = intervalos['fila'].to_numpy()
+
+    # Cada intervalo suma 1 al entrar y resta 1 al salir; la suma acumulada por
+    # tramo indica cuántos registros mantienen ausente a cada persona
+    bordes = np.unique(np.concatenate([ini, fin]))
+    cambios = np.zeros((len(bordes), n_personas), dtype=np.int32)
+    np.add.at(cambios, (np.searchsorted(bordes, ini), filas), 1)
+    np.add.at(cambios, (np.searchsorted(bordes, fin), filas), -1)
+    ausentes = np.cumsum(cambios, axis=0) > 0
+
+    # El último borde solo cierra tramos: desde ahí no hay ausencias
+    siguiente = np.append(bordes[1:], bordes[-1])
+    vacios = {}
+    for k, region in enumerate(unicas):
+        sin_cobertura = ausentes[:, codigos == k].all(axis=1)
+        marca = np.concatenate([[False], sin_cobertura, [False]]).astype(np.int8)
+        entradas = np.flatnonzero(np.diff(marca) == 1)
+        salidas = np.flatnonzero(np.diff(marca) == -1) - 1
+        vacios[region] = (bordes[entradas], siguiente[salidas] - 1)
+    return IndiceOcupacion(list(nombres), bordes, ausentes, vacios)
+
+# =========================
+# CONSULTAS
+# =========================
+def ausentes_en(indice, dia):
+    # Jefaturas ausentes en el día indicado
+    tramo = np.searchsorted(indice.bordes, _dia(dia), side='right') - 1
+    if tramo < 0 or tramo >= len(indice.ausentes):
+        return []
+    return [indice.nombres[i] for i in np.flatnonzero(indice.ausentes[tramo])]
+
+def vacios_region(indice, region, desde, hasta):
+    # Tramos sin cobertura de una región que tocan [desde, hasta], recortados al rango
+    inicios, fines = indice.vacios[region]
+    d, h = _dia(desde), _dia(hasta)
+    # Los vacíos no se superponen: inicios y fines quedan ordenados por igual
+    primero = np.searchsorted(fines, d, side='left')
+    ultimo = np.searchsorted(inicios, h, side='right')
+    return [
+        (_fecha(max(inicios[i], d)), _fecha(min(fines[i], h)))
+        for i in range(primero, ultimo)
+    ]
+
+def regiones_sin_cobertura(indice, desde, hasta):
+    # DataFrame con un tramo por fila: región, desde y hasta
+    filas = [
+        {"Región": region, "Desde": a, "Hasta": b}
+        for region in indice.vacios
+        for a, b in vacios_region(indice, region, desde, hasta)
+    ]
+    return pd.DataFrame(filas, columns=["Región", "Desde", "Hasta"])
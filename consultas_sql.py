@@ -0,0 +1,147 @@
+import time
+
+import pandas as pd
+import streamlit as st
+
+from perfil_sql import TAMANO_REGISTRO, UMBRAL_LENTA_MS, activar, activo, registro, resumen_sentencias, vaciar
+from recursos import ALTO_LOGO, imagen_data_uri
+
+st.set_page_config(page_title="Consultas SQL", layout="wide", page_icon="🗄️")
+
+# =========================
+# CONFIGURACIÓN DEL ENCABEZADO
+# =========================
+COLOR_FONDO = "#0F69B4"
+IMAGEN_LOCAL = "LOGO-PROPIO-ISL-2023-CMYK-01.png"
+TITULO = "CONSULTAS SQL"
+SUBTITULO = "Sección de Coordinación Territorial"
+
+img_src = imagen_data_uri(IMAGEN_LOCAL, ALTO_LOGO)
+
+st.markdown(f"""
+<style>
+.header-container {{
+    display: flex;
+    align-items: center;
+    justify-content: center;
+    background-color: {COLOR_FONDO};
+    height: 85px;
+    width: 100%;
+    color: white;
+    position: relative;
+}}
+.header-logo {{
+    position: absolute;
+    left: 20px;
+    top: 5px;
+}}
+.header-logo img {{
+    height: 60px;
+}}
+.header-subtitle {{
+    position: absolute;
+    bottom: 5px;
+    left: 20px;
+    font-size: 10px;
+}}
+.header-title {{
+    font-size: 20px;
+    font-weight: bold;
+}}
+.subtitulo-tabla {{
+    margin-top: 20px;
+    font-size: 16px;
+    color: #000000;
+}}
+</style>
+
+<div class="header-container">
+    <div class="header-logo">
+        <img src="{img_src}" alt="Logo">
+    </div>
+    <div class="header-subtitle">{SUBTITULO}</div>
+    <div class="header-title">{TITULO}</div>
+</div>
+""", unsafe_allow_html=True)
+
+# =========================
+# CONTROL DEL REGISTRO
+# =========================
+# El registro es del proceso: lo comparten todas las sesiones y se pierde al
+# reiniciar el contenedor. Solo guarda las últimas TAMANO_REGISTRO sentencias.
+c1, c2 = st.columns([3, 1])
+with c1:
+    registrar = st.toggle("Registrar las sentencias SQL de todas las páginas", value=activo(), key="perfil_sql_activo")
+    if registrar != activo():
+        activar(registrar)
+    st.caption(f"Se guardan las últimas {TAMANO_REGISTRO} sentencias; las que tardan más de "
+               f"{UMBRAL_LENTA_MS:g} ms guardan su plan (EXPLAIN QUERY PLAN).")
+with c2:
+    if st.button("Vaciar registro", use_container_width=True, key="perfil_sql_vaciar"):
+        vaciar()
+
+entradas = registro()
+sentencias = resumen_sentencias()
+
+m1, m2, m3, m4 = st.columns(4)
+m1.metric("Sentencias registradas", len(entradas))
+m2.metric("Tiempo total", f"{sum(e['ms'] for e in entradas) / 1000:.2f} s")
+m3.metric("Sentencias lentas", sum(e["plan"] is not None for e in entradas))
+m4.metric("Desde", time.strftime("%H:%M:%S", time.localtime(entradas[0]["momento"])) if entradas else "-")
+
+if not entradas:
+    st.info("Aún no hay sentencias registradas. Active el registro y use las demás páginas.")
+    st.stop()
+
+# =========================
+# SENTENCIAS POR TIEMPO TOTAL
+# =========================
+st.markdown('<div class="subtitulo-tabla">Sentencias ordenadas por tiempo total</div>', unsafe_allow_html=True)
+bases = sorted({s["base"] for s in sentencias})
+filtro_bases = st.multiselect("Bases de datos", bases, default=bases, key="perfil_sql_bases")
+df_sentencias = pd.DataFrame(sentencias)
+df_sentencias = df_sentencias[df_sentencias["base"].isin(filtro_bases)]
+st.dataframe(
+    df_sentencias[["sentencia", "base", "llamadas", "total_ms", "media_ms", "max_ms", "filas", "parametros", "lentas", "paginas"]]
+    .rename(columns={
+        "sentencia": "Sentencia",
+        "base": "Base",
+        "llamadas": "Llamadas",
+        "total_ms": "Total (ms)",
+        "media_ms": "Media (ms)",
+        "max_ms": "Máximo (ms)",
+        "filas": "Filas",
+        "parametros": "Parámetros",
+        "lentas": "Lentas",
+        "paginas": "Páginas",
+    }).round(2),
+    use_container_width=True,
+    hide_index=True,
+)
+
+# =========================
+# PLANES DE LAS SENTENCIAS LENTAS
+# =========================
+lentas = df_sentencias[df_sentencias["plan"].notna()]
+st.markdown('<div class="subtitulo-tabla">Planes de las sentencias lentas</div>', unsafe_allow_html=True)
+if lentas.empty:
+    st.caption(f"Ninguna sentencia superó {UMBRAL_LENTA_MS:g} ms.")
+for fila in lentas.itertuples():
+    with st.expander(f"{fila.base} · {fila.max_ms:.0f} ms · {fila.sentencia[:100]}"):
+        st.code(fila.sentencia, language="sql")
+        st.code(fila.plan or "(sin plan)", language="text")
+
+# =========================
+# ÚLTIMAS SENTENCIAS
+# =========================
+with st.expander("Últimas sentencias"):
+    st.dataframe(
+        pd.DataFrame(entradas[-200:][::-1]).assign(
+            momento=lambda d: d["momento"].map(lambda t: time.strftime("%H:%M:%S", time.localtime(t))),
+        )[["momento", "base", "pagina", "ms", "filas", "parametros", "sql"]].rename(columns={
+            "momento": "Hora", "base": "Base", "pagina": "Página", "ms": "ms",
+            "filas": "Filas", "parametros": "Parámetros", "sql": "Sentencia",
+        }).round(2),
+        use_container_width=True,
+        hide_index=True,
+    )
@@ -1,9 +1,15 @@
 import streamlit as st
 import pandas as pd
-import sqlite3
-from io import BytesIO
-import base64
 import os
+import time
+from base_datos import firma_dataframe, sincronizar_tabla
+from contactos_bd import (
+    COLUMNAS_BD, COLUMNAS_UI, MAPEO_UI_BD, TAMANO_PAGINA,
+    buscar_difuso, conectar, contar, facetas, filas_todas,
+    importar_contactos, leer_lotes, pagina, version,
+)
+from exportacion import boton_exportar
+from recursos import ALTO_LOGO, imagen_data_uri
 
 # =========================
 # CONFIGURACIÓN
@@ -21,25 +27,11 @@ COLOR_BOTONES_HOVER = "#DDEFFB"
 COLOR_BOTONES_SECUNDARIO = "#6c757d"
 COLOR_BOTONES_SECUNDARIO_HOVER = "#5a6268"
 
-# =========================
-# COLUMNAS Y MAPEO
-# =========================
-COLUMNAS_UI = [
-    'Nombre', 'Cargo', 'Dpto./Región',
-    'Teléfono Directo/Anexo', 'Celular Institucional',
-    'Celular Particular', 'Correo'
-]
+# Segundos sin cambios en la tabla antes de guardar automáticamente
+AUTOGUARDADO_SEGUNDOS = 2
 
-MAPEO_UI_BD = {
-    'Nombre': 'Nombre',
-    'Cargo': 'Cargo',
-    'Dpto./Región': 'Dpto_Region',
-    'Teléfono Directo/Anexo': 'Telefono',
-    'Celular Institucional': 'CelularInst',
-    'Celular Particular': 'CelularPart',
-    'Correo': 'Correo'
-}
-MAPEO_BD_UI = {v: k for k, v in MAPEO_UI_BD.items()}
+# Opción de las facetas que no filtra
+TODOS = "(Todos)"
 
 # =========================
 # LISTAS DE OPCIONES
@@ -66,123 +58,152 @@ OPCIONES_DEPTO = [
 ]
 
 # =========================
-# FUNCIONES AUXILIARES
+# BASE DE DATOS (SQLite, ver contactos_bd.py)
 # =========================
-def image_to_base64(path):
-    try:
-        with open(path, "rb") as img_file:
-            return base64.b64encode(img_file.read()).decode()
-    except:
-        return ""
-
-def limpiar_datos(df):
-    df_limpio = df.copy()
-    for columna in df_limpio.columns:
-        df_limpio[columna] = df_limpio[columna].astype(str).replace('nan','').replace('None','')
-    return df_limpio
-
-def _normaliza_numero_texto(s: str) -> str:
-    if s is None:
-        return ""
-    s = str(s).strip()
-    if s.lower() in ("nan", "none"):
-        return ""
-    if s.endswith(".0") and s[:-2].isdigit():
-        return s[:-2]
-    return s
+# st.session_state.contactos tiene solo la página visible. El autoguardado
+# compara esa página con la versión cargada, así que solo escribe lo editado en ella.
+def filtros_actuales():
+    cargo = st.session_state.get("contactos_cargo", TODOS)
+    depto = st.session_state.get("contactos_depto", TODOS)
+    return (
+        st.session_state.get("contactos_busqueda", ""),
+        None if cargo == TODOS else cargo,
+        None if depto == TODOS else depto,
+    )
+
+def cargar_pagina():
+    # Consulta la página actual (filtros + inicio de página) y la deja en la sesión.
+    # Con texto de búsqueda se muestran las coincidencias más parecidas, en orden.
+    filtros = filtros_actuales()
+    busqueda, cargo, depto = filtros
+    despues_de = st.session_state.contactos_pila[-1]
+    if busqueda.strip():
+        df, total = buscar_difuso(busqueda, cargo, depto)
+        df, hay_mas = df.drop(columns=["puntaje"]), False
+        st.session_state.contactos_total = total
+    else:
+        df, hay_mas = pagina(cargo, depto, despues_de=despues_de)
+        if despues_de is None:
+            st.session_state.contactos_total = contar(cargo, depto)
+    if df.empty:
+        # el id se mantiene (oculto) para guardar solo los cambios
+        df = pd.DataFrame(columns=COLUMNAS_UI + ["id"])
+    st.session_state.contactos = df
+    st.session_state.contactos_guardado = contactos_a_bd(df)
+    st.session_state.contactos_firma_guardada = firma_contactos(df)
+    st.session_state.contactos_hay_mas = hay_mas
+    st.session_state.contactos_ultimo = (
+        (df["Nombre"].iloc[-1], int(df["id"].iloc[-1])) if not df.empty else None
+    )
+    st.session_state.contactos_consulta = (filtros, despues_de)
+    st.session_state.registro_modificar = None
 
-# =========================
-# BASE DE DATOS (SQLite)
-# =========================
-DB_FILE = "contactos.db"
+def reiniciar_paginacion():
+    st.session_state.contactos_pila = [None]
 
-def init_db():
-    conn = sqlite3.connect(DB_FILE, timeout=10, check_same_thread=False)
-    try:
-        cursor = conn.cursor()
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS contactos (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                Nombre TEXT,
-                Cargo TEXT,
-                Dpto_Region TEXT,
-                Telefono TEXT,
-                CelularInst TEXT,
-                CelularPart TEXT,
-                Correo TEXT
-            )
-        """)
-        conn.commit()
-    finally:
-        conn.close()
-
-def cargar_desde_bd():
-    conn = sqlite3.connect(DB_FILE, timeout=10, check_same_thread=False)
-    try:
-        df = pd.read_sql_query("SELECT * FROM contactos", conn)
-    finally:
-        conn.close()
-    if not df.empty:
-        # eliminar columna id y renombrar a UI
-        if "id" in df.columns:
-            df = df.drop(columns=["id"])
-        df = df.rename(columns=MAPEO_BD_UI)
-    else:
-        df = pd.DataFrame(columns=COLUMNAS_UI)
-    return df
+def pagina_siguiente():
+    st.session_state.contactos_pila.append(st.session_state.contactos_ultimo)
 
-def guardar_en_bd(df_ui):
-    # df_ui: DataFrame con nombres UI (COLUMNAS_UI)
-    df_bd = df_ui.rename(columns=MAPEO_UI_BD)
-    conn = sqlite3.connect(DB_FILE, timeout=10, check_same_thread=False)
-    try:
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM contactos")
-        conn.commit()
-        # Insertar fila por fila (mantener orden y compatibilidad)
-        for _, row in df_bd.iterrows():
-            cursor.execute("""
-                INSERT INTO contactos (Nombre, Cargo, Dpto_Region,
-                                       Telefono, CelularInst,
-                                       CelularPart, Correo)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            """, tuple(row))
-        conn.commit()
-    finally:
-        conn.close()
+def pagina_anterior():
+    if len(st.session_state.contactos_pila) > 1:
+        st.session_state.contactos_pila.pop()
 
-# =========================
-# EXCEL
-# =========================
-def exportar_excel(df_ui):
-    buffer = BytesIO()
-    df_ui.to_excel(buffer, index=False, sheet_name="Contactos")
-    buffer.seek(0)
-    return buffer
+@st.cache_data(show_spinner=False, max_entries=16)
+def leer_facetas(columna, version_directorio):
+    # version_directorio solo forma parte de la clave de caché
+    return dict(facetas(columna))
 
-def importar_excel_automatico():
-    archivo_excel = "contactos.xlsx"
-    if os.path.exists(archivo_excel):
-        try:
-            df_importado = pd.read_excel(archivo_excel, dtype=str, keep_default_na=False)
+def contactos_a_bd(df_ui):
+    df_bd = df_ui.rename(columns=MAPEO_UI_BD)
+    if "id" not in df_bd.columns:
+        df_bd["id"] = None
+    return df_bd[["id"] + COLUMNAS_BD]
 
-            for columna in COLUMNAS_UI:
-                if columna not in df_importado.columns:
-                    df_importado[columna] = ""
+def firma_contactos(df_ui):
+    df_bd = contactos_a_bd(df_ui).copy()
+    df_bd["id"] = pd.to_numeric(df_bd["id"], errors="coerce").astype("Int64")
+    return firma_dataframe(df_bd)
 
-            df_importado = df_importado[COLUMNAS_UI]
+def registrar_escritura(resumen):
+    filas = sum(resumen.values())
+    st.session_state.contactos_ultima_escritura = dict(resumen, filas=filas)
+    st.session_state.contactos_filas_escritas = st.session_state.get("contactos_filas_escritas", 0) + filas
+    st.session_state.contactos_guardados = st.session_state.get("contactos_guardados", 0) + 1
 
-            for c in ['Teléfono Directo/Anexo', 'Celular Institucional', 'Celular Particular']:
-                df_importado[c] = df_importado[c].apply(_normaliza_numero_texto)
+def guardar_en_bd(df_ui):
+    # df_ui: DataFrame con nombres UI (COLUMNAS_UI) y columna id.
+    # Solo se escriben las filas nuevas, modificadas o eliminadas desde el último guardado.
+    with conectar() as conn:
+        guardado, resumen = sincronizar_tabla(
+            conn, "contactos", COLUMNAS_BD,
+            contactos_a_bd(df_ui), st.session_state.get("contactos_guardado")
+        )
+    st.session_state.contactos_guardado = guardado
+    df_ui = df_ui.copy()
+    df_ui["id"] = guardado["id"].to_numpy()
+    st.session_state.contactos_firma_guardada = firma_contactos(df_ui)
+    st.session_state.autoguardado_pendiente = None
+    if any(resumen.values()):
+        registrar_escritura(resumen)
+    return df_ui
 
-            df_importado = limpiar_datos(df_importado)
+# =========================
+# AUTOGUARDADO
+# =========================
+def marcar_cambios():
+    # Solo marca la tabla como pendiente si su contenido cambió; cada nuevo
+    # cambio reinicia la espera para juntar ediciones seguidas en un solo guardado.
+    firma = firma_contactos(st.session_state.contactos)
+    if firma == st.session_state.get("contactos_firma_guardada"):
+        st.session_state.autoguardado_pendiente = None
+    elif firma != st.session_state.get("contactos_firma_vista"):
+        st.session_state.autoguardado_pendiente = time.time()
+    st.session_state.contactos_firma_vista = firma
+
+@st.fragment(run_every=AUTOGUARDADO_SEGUNDOS)
+def autoguardado():
+    pendiente = st.session_state.get("autoguardado_pendiente")
+    if pendiente is not None and time.time() - pendiente >= AUTOGUARDADO_SEGUNDOS:
+        st.session_state.contactos = guardar_en_bd(st.session_state.contactos)
+
+    escritura = st.session_state.get("contactos_ultima_escritura")
+    if st.session_state.get("autoguardado_pendiente") is not None:
+        st.caption("✏️ Cambios pendientes de guardar…")
+    elif escritura:
+        st.caption(
+            f"💾 Último guardado: {escritura['filas']} filas escritas "
+            f"({escritura['insertados']} nuevas, {escritura['actualizados']} modificadas, "
+            f"{escritura['eliminados']} eliminadas) · "
+            f"{st.session_state.contactos_filas_escritas} filas en "
+            f"{st.session_state.contactos_guardados} guardados esta sesión"
+        )
 
-            guardar_en_bd(df_importado)
-            st.session_state.contactos = df_importado
-        except Exception as e:
-            st.error(f"❌ Error al importar el archivo: {e}")
+# =========================
+# EXCEL
+# =========================
+def hojas_contactos():
+    # El directorio completo, leído fila por fila desde la BD
+    return [("Contactos", COLUMNAS_UI, filas_todas())]
+
+def importar_excel_automatico(archivo_subido=None):
+    # Importa el archivo subido (Excel o CSV) o, si no hay, contactos.xlsx.
+    # Los contactos existentes se actualizan (por correo o celular) y los demás se agregan.
+    archivo_excel = "contactos.xlsx"
+    if archivo_subido is not None:
+        archivo, nombre = archivo_subido, archivo_subido.name
+    elif os.path.exists(archivo_excel):
+        archivo, nombre = archivo_excel, archivo_excel
     else:
         st.warning("⚠️ No se encontró el archivo 'contactos.xlsx'")
+        return
+    try:
+        resumen = importar_contactos(leer_lotes(archivo, nombre))
+    except Exception as e:
+        st.error(f"❌ Error al importar el archivo: {e}")
+        return
+    st.session_state.contactos_importacion = dict(resumen, archivo=nombre)
+    reiniciar_paginacion()
+    cargar_pagina()
 
 # =========================
 # INICIALIZACIÓN
@@ -190,7 +211,10 @@ def importar_excel_automatico():
 st.set_page_config(page_title="Directorio de Contactos", layout="wide", initial_sidebar_state="collapsed")
 
 # estilos y header
-img_src = f"data:image/png;base64,{image_to_base64(IMAGEN_LOCAL)}"
+try:
+    img_src = imagen_data_uri(IMAGEN_LOCAL, ALTO_LOGO)
+except OSError:
+    img_src = ""
 st.markdown(f"""
 <style>
 /* Eliminar scroll de la página principal */
@@ -313,12 +337,16 @@ div[data-testid="stVerticalBlock"] > div {{
 </div>
 """, unsafe_allow_html=True)
 
-# datos iniciales
-init_db()
-if "contactos" not in st.session_state:
-    st.session_state.contactos = cargar_desde_bd()
+# datos iniciales: solo la página visible
+if "contactos_pila" not in st.session_state:
+    reiniciar_paginacion()
 if "registro_modificar" not in st.session_state:
     st.session_state.registro_modificar = None
+if st.session_state.get("contactos_consulta") != (filtros_actuales(), st.session_state.contactos_pila[-1]):
+    # Antes de cambiar de página se guardan las ediciones pendientes de la actual
+    if "contactos" in st.session_state and st.session_state.get("autoguardado_pendiente") is not None:
+        guardar_en_bd(st.session_state.contactos)
+    cargar_pagina()
 
 # =========================
 # FORMULARIO (inputs)
@@ -385,7 +413,10 @@ with fila_btns[1]:
             }
             if st.session_state.registro_modificar is not None:
                 try:
-                    st.session_state.contactos.loc[st.session_state.registro_modificar] = nuevo
+                    # asignar solo las columnas UI para conservar el id del contacto
+                    st.session_state.contactos.loc[st.session_state.registro_modificar, COLUMNAS_UI] = [
+                        nuevo[c] for c in COLUMNAS_UI
+                    ]
                 except Exception:
                     # si falla por índice, concatenar como nuevo
                     st.session_state.contactos = pd.concat(
@@ -398,7 +429,7 @@ with fila_btns[1]:
                     [st.session_state.contactos, pd.DataFrame([nuevo])],
                     ignore_index=True
                 )
-            guardar_en_bd(st.session_state.contactos)
+            st.session_state.contactos = guardar_en_bd(st.session_state.contactos)
 
     with b2:
         if st.button("Modificar", use_container_width=True, key="btn_modificar"):
@@ -419,19 +450,16 @@ with fila_btns[1]:
                 except Exception:
                     st.warning("No se pudo eliminar el registro seleccionado.")
                 st.session_state.registro_modificar = None
-                guardar_en_bd(st.session_state.contactos)
+                st.session_state.contactos = guardar_en_bd(st.session_state.contactos)
 
     with b5:
-        if st.button("Exportar", use_container_width=True, key="btn_exportar"):
-            buffer = exportar_excel(st.session_state.contactos)
-            # Mostrar botón de descarga inmediatamente
-            st.download_button("Descargar archivo", data=buffer, file_name="contactos.xlsx",
-                               mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                               use_container_width=True)
+        # El archivo se genera al presionar Exportar y queda en caché mientras no cambien los contactos
+        boton_exportar("Exportar", "contactos", version(), hojas_contactos, "contactos.xlsx",
+                       use_container_width=True)
 
     with b6:
         if st.button("Importar", use_container_width=True, key="btn_importar"):
-            importar_excel_automatico()
+            importar_excel_automatico(st.session_state.get("contactos_archivo"))
 
 # columnas vacías para mantener proporciones y diseño
 with fila_btns[2]:
@@ -441,6 +469,21 @@ with fila_btns[3]:
 with fila_btns[4]:
     pass
 
+# Archivo para "Importar" (si no se sube uno, se usa contactos.xlsx)
+with st.expander("Importar desde archivo (Excel o CSV)"):
+    st.file_uploader("Archivo de contactos", type=["xlsx", "csv"], key="contactos_archivo",
+                     label_visibility="collapsed")
+    st.caption("Columnas: " + ", ".join(COLUMNAS_UI) + ". Los contactos se reconocen por correo o celular.")
+
+importacion = st.session_state.pop("contactos_importacion", None)
+if importacion:
+    st.success(
+        f"📥 {importacion['archivo']}: {importacion['insertados']} nuevos, "
+        f"{importacion['actualizados']} actualizados, {importacion['sin_cambios']} sin cambios, "
+        f"{importacion['duplicados'] + importacion['invalidos']} omitidos "
+        f"({importacion['duplicados']} repetidos en el archivo, {importacion['invalidos']} sin datos)"
+    )
+
 # =========================
 # LÍNEA DIVISORIA GRIS
 # =========================
@@ -450,6 +493,38 @@ st.markdown('<div class="divider"></div>', unsafe_allow_html=True)
 # TABLA
 # =========================
 st.subheader("Contactos Registrados")
+
+# Búsqueda y facetas: cada cambio vuelve a la primera página
+version_directorio = version()
+cargos = leer_facetas("Cargo", version_directorio)
+deptos = leer_facetas("Dpto_Region", version_directorio)
+filtro1, filtro2, filtro3 = st.columns([2, 1.5, 1.5])
+with filtro1:
+    st.text_input("Buscar", key="contactos_busqueda", on_change=reiniciar_paginacion,
+                  placeholder="Nombre, correo, cargo o región (acepta errores de tipeo)")
+with filtro2:
+    st.selectbox("Cargo", [TODOS] + list(cargos), key="contactos_cargo", on_change=reiniciar_paginacion,
+                 format_func=lambda v: v if v == TODOS else f"{v} ({cargos[v]})")
+with filtro3:
+    st.selectbox("Dpto./Región", [TODOS] + list(deptos), key="contactos_depto", on_change=reiniciar_paginacion,
+                 format_func=lambda v: v if v == TODOS else f"{v} ({deptos[v]})")
+
+numero_pagina = len(st.session_state.contactos_pila)
+total = st.session_state.contactos_total
+paginas = max(1, -(-total // TAMANO_PAGINA))
+nav1, nav2, nav3 = st.columns([1, 4, 1])
+with nav1:
+    st.button("◀ Anterior", key="btn_pagina_anterior", on_click=pagina_anterior,
+              disabled=numero_pagina == 1, use_container_width=True)
+with nav2:
+    if st.session_state.get("contactos_busqueda", "").strip():
+        st.caption(f"{total} coincidencias · se muestran las {len(st.session_state.contactos)} más parecidas")
+    else:
+        st.caption(f"Página {numero_pagina} de {paginas} · {total} contactos")
+with nav3:
+    st.button("Siguiente ▶", key="btn_pagina_siguiente", on_click=pagina_siguiente,
+              disabled=not st.session_state.contactos_hay_mas, use_container_width=True)
+
 tabla = st.session_state.contactos.copy()
 if tabla.empty:
     tabla = pd.DataFrame(columns=COLUMNAS_UI)
@@ -462,7 +537,8 @@ edited = st.data_editor(
     hide_index=True,
     use_container_width=True,
     column_config={
-        "Seleccionar": st.column_config.CheckboxColumn("Seleccionar", help="Selecciona un contacto", default=False)
+        "Seleccionar": st.column_config.CheckboxColumn("Seleccionar", help="Selecciona un contacto", default=False),
+        "id": None
     }
 )
 
@@ -476,8 +552,8 @@ else:
     st.session_state.registro_modificar = None
 
 st.session_state.contactos = edited.drop(columns=["Seleccionar"])
+# Solo se escribe en la BD cuando el contenido cambió (no al marcar "Seleccionar")
 if not st.session_state.contactos.empty:
-    guardar_en_bd(st.session_state.contactos)
-if not st.session_state.contactos.empty:
-    guardar_en_bd(st.session_state.contactos)
+    marcar_cambios()
+autoguardado()
 
@@ -0,0 +1,493 @@
+# contactos_bd.py
+import re
+import unicodedata
+from itertools import islice
+
+import pandas as pd
+
+from base_datos import conexion
+
+# =========================
+# BASE DE DATOS DE CONTACTOS
+# =========================
+# La página no carga el directorio completo: cada consulta devuelve solo la
+# página visible, filtrada y ordenada por índices.
+# - Búsqueda: difusa por trigramas sobre Nombre, Correo, Cargo y Dpto_Region
+#   (ver BÚSQUEDA DIFUSA más abajo).
+# - Facetas: Cargo y Dpto./Región (índices (Cargo, Nombre) y (Dpto_Region, Nombre)).
+# - Paginación por clave (keyset): la página siguiente empieza después del
+#   último (Nombre, id) visto, así el costo no crece con el número de página.
+# contactos_version es un contador que mantienen los triggers; sirve como
+# versión del directorio (p. ej. para la caché de la exportación).
+DB_FILE = "contactos.db"
+TAMANO_PAGINA = 50
+
+COLUMNAS_UI = [
+    'Nombre', 'Cargo', 'Dpto./Región',
+    'Teléfono Directo/Anexo', 'Celular Institucional',
+    'Celular Particular', 'Correo'
+]
+
+MAPEO_UI_BD = {
+    'Nombre': 'Nombre',
+    'Cargo': 'Cargo',
+    'Dpto./Región': 'Dpto_Region',
+    'Teléfono Directo/Anexo': 'Telefono',
+    'Celular Institucional': 'CelularInst',
+    'Celular Particular': 'CelularPart',
+    'Correo': 'Correo'
+}
+MAPEO_BD_UI = {v: k for k, v in MAPEO_UI_BD.items()}
+COLUMNAS_BD = [MAPEO_UI_BD[c] for c in COLUMNAS_UI]
+
+ESQUEMA = """
+    CREATE TABLE IF NOT EXISTS contactos (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        Nombre TEXT,
+        Cargo TEXT,
+        Dpto_Region TEXT,
+        Telefono TEXT,
+        CelularInst TEXT,
+        CelularPart TEXT,
+        Correo TEXT
+    );
+    CREATE INDEX IF NOT EXISTS idx_contactos_nombre ON contactos (Nombre COLLATE NOCASE);
+    CREATE INDEX IF NOT EXISTS idx_contactos_cargo ON contactos (Cargo, Nombre COLLATE NOCASE);
+    CREATE INDEX IF NOT EXISTS idx_contactos_dpto ON contactos (Dpto_Region, Nombre COLLATE NOCASE);
+
+    CREATE TABLE IF NOT EXISTS contactos_version (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        version INTEGER NOT NULL
+    );
+    INSERT OR IGNORE INTO contactos_version (id, version) VALUES (1, 0);
+    CREATE TRIGGER IF NOT EXISTS trg_contactos_insert AFTER INSERT ON contactos
+    BEGIN UPDATE contactos_version SET version = version + 1 WHERE id = 1; END;
+    CREATE TRIGGER IF NOT EXISTS trg_contactos_update AFTER UPDATE ON contactos
+    BEGIN UPDATE contactos_version SET version = version + 1 WHERE id = 1; END;
+    CREATE TRIGGER IF NOT EXISTS trg_contactos_delete AFTER DELETE ON contactos
+    BEGIN UPDATE contactos_version SET version = version + 1 WHERE id = 1; END;
+
+    CREATE TABLE IF NOT EXISTS contactos_palabras (
+        palabra TEXT NOT NULL,
+        campo INTEGER NOT NULL,
+        id INTEGER NOT NULL,
+        PRIMARY KEY (palabra, campo, id)
+    ) WITHOUT ROWID;
+    CREATE INDEX IF NOT EXISTS idx_palabras_id ON contactos_palabras (id);
+    CREATE TABLE IF NOT EXISTS palabras_trigramas (
+        trigrama TEXT NOT NULL,
+        palabra TEXT NOT NULL,
+        PRIMARY KEY (trigrama, palabra)
+    ) WITHOUT ROWID;
+    CREATE TABLE IF NOT EXISTS contactos_trigramas_pendientes (
+        id INTEGER PRIMARY KEY
+    );
+    DROP TRIGGER IF EXISTS trg_trigramas_insert;
+    DROP TRIGGER IF EXISTS trg_trigramas_update;
+    DROP TRIGGER IF EXISTS trg_trigramas_delete;
+    CREATE TRIGGER trg_trigramas_insert AFTER INSERT ON contactos
+    BEGIN INSERT INTO contactos_trigramas_pendientes (id) SELECT NEW.id
+          WHERE NOT EXISTS (SELECT 1 FROM contactos_trigramas_pendientes WHERE id = NEW.id); END;
+    CREATE TRIGGER trg_trigramas_update AFTER UPDATE ON contactos
+    BEGIN INSERT INTO contactos_trigramas_pendientes (id) SELECT NEW.id
+          WHERE NOT EXISTS (SELECT 1 FROM contactos_trigramas_pendientes WHERE id = NEW.id); END;
+    CREATE TRIGGER trg_trigramas_delete AFTER DELETE ON contactos
+    BEGIN INSERT INTO contactos_trigramas_pendientes (id) SELECT OLD.id
+          WHERE NOT EXISTS (SELECT 1 FROM contactos_trigramas_pendientes WHERE id = OLD.id); END;
+    -- Bases con contactos anteriores al índice: se indexan todos una vez
+    INSERT OR IGNORE INTO contactos_trigramas_pendientes (id)
+    SELECT id FROM contactos
+    WHERE NOT EXISTS (SELECT 1 FROM contactos_palabras);
+"""
+
+def conectar():
+    # Conexión del pool compartido; el esquema se crea una sola vez por proceso
+    return conexion(DB_FILE, ESQUEMA)
+
+# =========================
+# CONSULTAS PAGINADAS
+# =========================
+def _condiciones(cargo=None, depto=None):
+    condiciones, params = [], []
+    if cargo:
+        condiciones.append("Cargo = ?")
+        params.append(cargo)
+    if depto:
+        condiciones.append("Dpto_Region = ?")
+        params.append(depto)
+    return condiciones, params
+
+def contar(cargo=None, depto=None):
+    condiciones, params = _condiciones(cargo, depto)
+    where = f"WHERE {' AND '.join(condiciones)}" if condiciones else ""
+    with conectar() as conn:
+        return conn.execute(f"SELECT COUNT(*) FROM contactos {where}", params).fetchone()[0]
+
+def pagina(cargo=None, depto=None, despues_de=None, tamano=TAMANO_PAGINA):
+    # despues_de: (Nombre, id) del último contacto de la página anterior, o None.
+    # Devuelve (DataFrame con nombres UI y columna id, hay_mas).
+    condiciones, params = _condiciones(cargo, depto)
+    if despues_de is not None:
+        nombre, id_ = despues_de
+        if nombre is None:
+            # Los nombres vacíos (NULL) van primero en el orden
+            condiciones.append("(Nombre IS NOT NULL OR id > ?)")
+            params.append(id_)
+        else:
+            # El primer término permite al índice empezar directo en el nombre
+            condiciones.append("Nombre COLLATE NOCASE >= ? AND (Nombre COLLATE NOCASE, id) > (?, ?)")
+            params.extend([nombre, nombre, id_])
+    where = f"WHERE {' AND '.join(condiciones)}" if condiciones else ""
+    with conectar() as conn:
+        df = pd.read_sql_query(
+            f"""SELECT {', '.join(COLUMNAS_BD)}, id FROM contactos {where}
+                ORDER BY Nombre COLLATE NOCASE, id LIMIT ?""",
+            conn,
+            params=params + [tamano + 1],
+        )
+    hay_mas = len(df) > tamano
+    return df.head(tamano).rename(columns=MAPEO_BD_UI), hay_mas
+
+def facetas(columna):
+    # Valores distintos de Cargo o Dpto_Region con su cantidad (recorre solo el índice)
+    if columna not in ("Cargo", "Dpto_Region"):
+        raise ValueError(f"Faceta desconocida: {columna}")
+    with conectar() as conn:
+        return conn.execute(
+            f"""SELECT {columna}, COUNT(*) FROM contactos
+                WHERE COALESCE({columna}, '') <> ''
+                GROUP BY {columna} ORDER BY {columna}"""
+        ).fetchall()
+
+def version():
+    with conectar() as conn:
+        return conn.execute("SELECT version FROM contactos_version WHERE id = 1").fetchone()[0]
+
+def filas_todas():
+    # Todo el directorio, fila por fila (para exportar sin armar un DataFrame)
+    with conectar() as conn:
+        yield from conn.execute(
+            f"SELECT {', '.join(COLUMNAS_BD)} FROM contactos ORDER BY Nombre COLLATE NOCASE, id"
+        )
+
+# =========================
+# BÚSQUEDA DIFUSA (índice de trigramas)
+# =========================
+# Cada campo buscable se normaliza (minúsculas, sin tildes ni ñ, solo letras y
+# números) y se separa en palabras.
+# - contactos_palabras: (palabra, campo, id), qué contactos tienen cada palabra.
+# - palabras_trigramas: trigramas de cada palabra distinta del directorio
+#   ("zuniga" -> "  z", " zu", "zun", "uni", "nig", "iga", "ga ").
+# Para cada palabra buscada se buscan por trigramas las palabras parecidas del
+# diccionario (similitud = trigramas en común / trigramas de la palabra
+# buscada), y luego los contactos que las tienen. El puntaje de un contacto es
+# el promedio, entre las palabras buscadas, de su mejor coincidencia ponderada
+# por campo. Así "Zuniga" encuentra "Zuñiga" y "Biobio" encuentra "BIOBIO".
+# El diccionario es mucho más chico que el directorio (los apellidos, cargos y
+# regiones se repiten), por eso la búsqueda no recorre a todos los contactos.
+# Los triggers anotan en contactos_trigramas_pendientes los contactos
+# insertados, modificados o eliminados (la normalización se hace en Python);
+# antes de cada búsqueda se reindexan solo esos contactos. Los triggers no usan
+# INSERT OR IGNORE: dentro de un trigger SQLite aplica la política de conflicto
+# de la sentencia que lo dispara (p. ej. el upsert de sincronizar_tabla).
+# El esquema los recrea al abrir el pool, así las bases existentes también
+# quedan con esta versión.
+PESOS_CAMPOS = {"Nombre": 1.0, "Correo": 0.9, "Cargo": 0.7, "Dpto_Region": 0.7}
+CAMPOS_BUSQUEDA = list(PESOS_CAMPOS)
+UMBRAL_SIMILITUD = 0.5
+
+def normalizar_texto(texto):
+    if texto is None:
+        return ""
+    texto = unicodedata.normalize("NFKD", str(texto))
+    texto = "".join(c for c in texto if not unicodedata.combining(c)).lower()
+    return re.sub(r"[^a-z0-9]+", " ", texto).strip()
+
+def palabras(texto):
+    # Letras y dígitos van en palabras separadas ("jperez2" -> "jperez", "2")
+    return set(re.findall(r"[a-z]+|[0-9]+", normalizar_texto(texto)))
+
+def trigramas(palabra):
+    palabra = f"  {palabra} "
+    return {palabra[i:i + 3] for i in range(len(palabra) - 2)}
+
+def _reindexar_pendientes(conn):
+    # Devuelve la cantidad de contactos reindexados
+    if conn.execute("SELECT 1 FROM contactos_trigramas_pendientes LIMIT 1").fetchone() is None:
+        return 0
+    cursor = conn.cursor()
+    cursor.execute("BEGIN IMMEDIATE")
+    try:
+        # Se leen dentro de la transacción: otra sesión pudo procesarlos mientras tanto
+        ids = [fila[0] for fila in cursor.execute("SELECT id FROM contactos_trigramas_pendientes")]
+        anteriores, filas = set(), []
+        for inicio in range(0, len(ids), 500):
+            lote = ids[inicio:inicio + 500]
+            marcadores = ", ".join("?" for _ in lote)
+            anteriores.update(fila[0] for fila in cursor.execute(
+                f"SELECT DISTINCT palabra FROM contactos_palabras WHERE id IN ({marcadores})", lote
+            ))
+            cursor.execute(f"DELETE FROM contactos_palabras WHERE id IN ({marcadores})", lote)
+            for id_, *valores in cursor.execute(
+                f"SELECT id, {', '.join(CAMPOS_BUSQUEDA)} FROM contactos WHERE id IN ({marcadores})", lote
+            ).fetchall():
+                for campo, valor in enumerate(valores):
+                    filas.extend((palabra, campo, id_) for palabra in palabras(valor))
+        cursor.executemany(
+            "INSERT OR IGNORE INTO contactos_palabras (palabra, campo, id) VALUES (?, ?, ?)", sorted(filas)
+        )
+
+        # Diccionario: agregar palabras nuevas y quitar las que ya nadie usa
+        nuevas = {f[0] for f in filas}
+        cursor.executemany(
+            "INSERT OR IGNORE INTO palabras_trigramas (trigrama, palabra) VALUES (?, ?)",
+            sorted((t, p) for p in nuevas for t in trigramas(p)),
+        )
+        huerfanas = [
+            p for p in anteriores - nuevas
+            if cursor.execute("SELECT 1 FROM contactos_palabras WHERE palabra = ? LIMIT 1", (p,)).fetchone() is None
+        ]
+        cursor.executemany(
+            "DELETE FROM palabras_trigramas WHERE trigrama = ? AND palabra = ?",
+            [(t, p) for p in huerfanas for t in trigramas(p)],
+        )
+        cursor.execute("DELETE FROM contactos_trigramas_pendientes")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return len(ids)
+
+def buscar_difuso(texto, cargo=None, depto=None, limite=TAMANO_PAGINA):
+    # Contactos ordenados por similitud (los más parecidos primero), con los
+    # filtros de facetas aplicados. Devuelve (DataFrame con nombres UI, id y
+    # puntaje, total de coincidencias).
+    buscadas = sorted(palabras(texto))
+    if not buscadas:
+        return pd.DataFrame(columns=COLUMNAS_UI + ["id", "puntaje"]), 0
+    consulta = [
+        (i, t, len(trigramas(p)))
+        for i, p in enumerate(buscadas) for t in trigramas(p)
+    ]
+    valores = ", ".join("(?, ?, ?)" for _ in consulta)
+    condiciones, params_filtros = _condiciones(cargo, depto)
+    # Sin facetas no hace falta leer los contactos hasta tener los mejores puntajes
+    filtro = (
+        f"JOIN contactos c ON c.id = p.id WHERE {' AND '.join(f'c.{c}' for c in condiciones)}"
+        if condiciones else ""
+    )
+    # Con una sola palabra buscada el puntaje es directamente su mejor coincidencia
+    puntajes = (
+        "SELECT id, mejor AS puntaje FROM por_palabra" if len(buscadas) == 1
+        else f"SELECT id, SUM(mejor) / {float(len(buscadas))} AS puntaje FROM por_palabra GROUP BY id"
+    )
+    pesos = " ".join(f"WHEN {i} THEN {PESOS_CAMPOS[c]}" for i, c in enumerate(CAMPOS_BUSQUEDA))
+    sql = f"""
+        WITH consulta (buscada, trigrama, n) AS (VALUES {valores}),
+        similares AS (
+            SELECT q.buscada, t.palabra, COUNT(*) * 1.0 / q.n AS similitud
+            FROM consulta q JOIN palabras_trigramas t ON t.trigrama = q.trigrama
+            GROUP BY q.buscada, t.palabra
+            HAVING similitud >= ?
+        ),
+        por_palabra AS (
+            SELECT cp.id, s.buscada, MAX(s.similitud * (CASE cp.campo {pesos} END)) AS mejor
+            FROM similares s JOIN contactos_palabras cp ON cp.palabra = s.palabra
+            GROUP BY cp.id, s.buscada
+        ),
+        puntajes AS (
+            {puntajes}
+        ),
+        filtrados AS (
+            SELECT p.id, p.puntaje FROM puntajes p {filtro}
+        ),
+        mejores AS (
+            SELECT id, puntaje FROM filtrados ORDER BY puntaje DESC, id LIMIT ?
+        )
+        SELECT {', '.join(f'c.{c}' for c in COLUMNAS_BD)}, c.id, m.puntaje,
+               (SELECT COUNT(*) FROM filtrados) AS total
+        FROM mejores m JOIN contactos c ON c.id = m.id
+        ORDER BY m.puntaje DESC, c.Nombre COLLATE NOCASE, c.id
+    """
+    params = (
+        [v for fila in consulta for v in fila] + [UMBRAL_SIMILITUD] + params_filtros + [limite]
+    )
+    with conectar() as conn:
+        _reindexar_pendientes(conn)
+        df = pd.read_sql_query(sql, conn, params=params)
+    total = int(df["total"].iloc[0]) if not df.empty else 0
+    return df.drop(columns=["total"]).rename(columns=MAPEO_BD_UI), total
+
+# =========================
+# IMPORTACIÓN MASIVA
+# =========================
+# - El archivo (Excel o CSV) se lee por lotes, sin cargarlo completo: cada lote
+#   se depura, se asocia y se escribe antes de leer el siguiente. Entre lotes
+#   solo se guardan las claves ya vistas y los ids ya asociados.
+# - Teléfonos y correos se normalizan por columna (vectorizado).
+# - Cada fila se asocia a un contacto existente por correo normalizado o,
+#   si no tiene correo, por celular/teléfono (últimos 9 dígitos). Las claves de
+#   los contactos guardados se leen una vez, antes del primer lote.
+# - Repetidos: filas con la misma clave que una anterior del archivo, o que se
+#   asocian al mismo contacto que una anterior; queda la primera aparición.
+# - Todo se escribe en una transacción: se insertan los nuevos, se actualizan
+#   los que cambiaron y los demás contactos no se tocan. Las celdas vacías del
+#   archivo no borran datos ya guardados.
+TAMANO_LOTE_IMPORTACION = 5000
+COLUMNAS_TELEFONO = ["CelularInst", "CelularPart", "Telefono"]
+PATRON_CORREO = r"^[^@\s]+@[^@\s]+\.[^@\s]+$"
+DIGITOS_MINIMOS_TELEFONO = 8
+
+def leer_lotes(archivo, nombre_archivo):
+    # DataFrames de texto de hasta TAMANO_LOTE_IMPORTACION filas
+    if nombre_archivo.lower().endswith(".csv"):
+        # sep=None detecta "," o ";" (Excel en español exporta con ";")
+        yield from pd.read_csv(
+            archivo, sep=None, engine="python", dtype=str, keep_default_na=False,
+            chunksize=TAMANO_LOTE_IMPORTACION, encoding="utf-8-sig",
+        )
+        return
+    # openpyxl solo se carga cuando se importa un .xlsx
+    from openpyxl import load_workbook
+
+    libro = load_workbook(archivo, read_only=True, data_only=True)
+    try:
+        filas = libro.active.iter_rows(values_only=True)
+        encabezados = [str(c).strip() if c is not None else "" for c in next(filas, ())]
+        while True:
+            lote = list(islice(filas, TAMANO_LOTE_IMPORTACION))
+            if not lote:
+                break
+            df = pd.DataFrame(lote).iloc[:, :len(encabezados)]
+            df.columns = encabezados[:df.shape[1]]
+            yield df
+    finally:
+        libro.close()
+
+def normalizar_lote(df):
+    # Columnas de la BD como texto limpio, más las claves _correo y _telefono
+    df = df.rename(columns=lambda c: MAPEO_UI_BD.get(str(c).strip(), str(c).strip()))
+    df = df.loc[:, ~df.columns.duplicated()].reindex(columns=COLUMNAS_BD)
+    df = df.astype(object).where(df.notna(), "").astype(str)
+    for columna in COLUMNAS_BD:
+        df[columna] = df[columna].str.strip().replace({"nan": "", "None": ""})
+    for columna in COLUMNAS_TELEFONO:
+        # Excel entrega los números como 912345678.0
+        df[columna] = df[columna].str.replace(r"^(\d+)\.0$", r"\1", regex=True)
+    df["Correo"] = df["Correo"].str.lower()
+    return df.assign(_correo=clave_correo(df["Correo"]), _telefono=clave_telefono(df))
+
+def clave_correo(correos):
+    correos = correos.fillna("").astype(str).str.strip().str.lower()
+    return correos.where(correos.str.match(PATRON_CORREO), "")
+
+def clave_telefono(df):
+    # Primer número con suficientes dígitos; se comparan los últimos 9
+    # (912345678 y +56 9 1234 5678 son el mismo celular)
+    clave = pd.Series("", index=df.index)
+    for columna in reversed(COLUMNAS_TELEFONO):
+        digitos = df[columna].fillna("").astype(str).str.replace(r"\D", "", regex=True)
+        clave = digitos.str[-9:].where(digitos.str.len() >= DIGITOS_MINIMOS_TELEFONO, clave)
+    return clave
+
+def importar_contactos(lotes):
+    # lotes: iterable de DataFrames (ver leer_lotes). Devuelve un resumen; la
+    # suma de sus cantidades es el total de filas leídas.
+    resumen = {"insertados": 0, "actualizados": 0, "sin_cambios": 0, "duplicados": 0, "invalidos": 0}
+    claves_vistas, ids_vistos = set(), set()
+    with conectar() as conn:
+        cursor = conn.cursor()
+        cursor.execute("BEGIN IMMEDIATE")
+        try:
+            por_correo, por_telefono = _claves_guardadas(conn)
+            for lote in lotes:
+                _importar_lote(cursor, normalizar_lote(lote), por_correo, por_telefono,
+                               claves_vistas, ids_vistos, resumen)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    return resumen
+
+def _importar_lote(cursor, datos, por_correo, por_telefono, claves_vistas, ids_vistos, resumen):
+    # Filas sin nombre ni dato de contacto no se pueden importar
+    validas = (datos["Nombre"] != "") | (datos["_correo"] != "") | (datos["_telefono"] != "")
+    resumen["invalidos"] += int((~validas).sum())
+    datos = datos[validas]
+
+    # Duplicados dentro del archivo (en este lote o en uno anterior)
+    clave = datos["_correo"].where(datos["_correo"] != "", "t:" + datos["_telefono"])
+    clave = clave.where(clave != "t:", "n:" + datos["Nombre"].str.lower())
+    repetidas = clave.duplicated() | _en(clave, claves_vistas)
+    claves_vistas.update(clave[~repetidas].tolist())
+    resumen["duplicados"] += int(repetidas.sum())
+    datos = datos[~repetidas]
+
+    # El teléfono solo asocia filas sin correo: un número compartido (p. ej. el
+    # de la oficina) no debe llevar el correo de una persona a la fila de otra
+    ids = datos["_correo"].map(por_correo)
+    ids = ids.where(datos["_correo"] != "", datos["_telefono"].map(por_telefono))
+
+    nuevos = datos[ids.isna()]
+    cursor.executemany(
+        f"INSERT INTO contactos ({', '.join(COLUMNAS_BD)}) VALUES ({', '.join('?' for _ in COLUMNAS_BD)})",
+        nuevos[COLUMNAS_BD].itertuples(index=False, name=None),
+    )
+    resumen["insertados"] += len(nuevos)
+
+    # Filas distintas del archivo asociadas al mismo contacto: queda la primera
+    coincidentes = datos[ids.notna()].assign(id=ids[ids.notna()].astype(int))
+    repetidas = coincidentes["id"].duplicated() | _en(coincidentes["id"], ids_vistos)
+    resumen["duplicados"] += int(repetidas.sum())
+    coincidentes = coincidentes[~repetidas]
+    ids_vistos.update(coincidentes["id"].tolist())
+
+    # Coincidencias: las celdas vacías del archivo conservan lo guardado
+    guardados = _leer_por_id(cursor, coincidentes["id"].tolist())
+    propuestos = coincidentes.set_index("id")[COLUMNAS_BD]
+    propuestos = propuestos.where(propuestos != "", guardados)
+    cambiados = (propuestos != guardados).any(axis=1)
+    actualizar = propuestos[cambiados]
+    asignaciones = ", ".join(f"{c} = ?" for c in COLUMNAS_BD)
+    cursor.executemany(
+        f"UPDATE contactos SET {asignaciones} WHERE id = ?",
+        [fila[1:] + (int(fila[0]),) for fila in actualizar.itertuples(name=None)],
+    )
+    resumen["actualizados"] += len(actualizar)
+    resumen["sin_cambios"] += int((~cambiados).sum())
+
+def _en(serie, conjunto):
+    # serie.isin(conjunto) sin convertir el conjunto completo en cada lote
+    return pd.Series([valor in conjunto for valor in serie.tolist()], index=serie.index, dtype=bool)
+
+def _claves_guardadas(conn):
+    # ({correo: id}, {teléfono: id}) de los contactos guardados, leídos por
+    # lotes y solo con las columnas de las claves
+    por_correo, por_telefono = {}, {}
+    for guardados in pd.read_sql_query(
+        f"SELECT id, Correo, {', '.join(COLUMNAS_TELEFONO)} FROM contactos ORDER BY id",
+        conn, chunksize=TAMANO_LOTE_IMPORTACION,
+    ):
+        # Los lotes vienen ordenados por id: la primera clave vista es la más antigua
+        for clave, id_ in _primer_id(guardados["id"], clave_correo(guardados["Correo"])).items():
+            por_correo.setdefault(clave, id_)
+        for clave, id_ in _primer_id(guardados["id"], clave_telefono(guardados)).items():
+            por_telefono.setdefault(clave, id_)
+    return por_correo, por_telefono
+
+def _leer_por_id(cursor, ids):
+    # Contactos guardados como texto ('' en vez de NULL), indexados por id y en el orden de ids
+    filas = []
+    for inicio in range(0, len(ids), 500):
+        lote = ids[inicio:inicio + 500]
+        filas.extend(cursor.execute(
+            f"SELECT id, {', '.join(COLUMNAS_BD)} FROM contactos WHERE id IN ({', '.join('?' for _ in lote)})", lote
+        ).fetchall())
+    guardados = pd.DataFrame(filas, columns=["id"] + COLUMNAS_BD).set_index("id")
+    return guardados.fillna("").astype(str).reindex(ids)
+
+def _primer_id(ids, claves):
+    # {clave: id} con el contacto más antiguo para cada clave no vacía
+    pares = pd.DataFrame({"id": ids, "clave": claves})
+    pares = pares[pares["clave"] != ""].sort_values("id").drop_duplicates(subset="clave")
+    return dict(zip(pares["clave"], pares["id"]))
@@ -0,0 +1,330 @@
+# emergencias_bd.py
+from datetime import datetime
+
+import pandas as pd
+
+import streamlit as st
+
+from base_datos import celdas_distintas, conexion, tipar_columnas, tipos_tabla, upsert_filas_fijas
+
+# =========================
+# BASE DE DATOS DE EMERGENCIAS
+# =========================
+# emergencias: una fila por región (lo que se edita en la tabla).
+# emergencias_eventos: registro de solo inserción con cada cambio de campo
+#   (región, columna, valor anterior, valor nuevo, ts).
+# emergencias_estado: vista materializada del estado actual por región y
+#   columna, con la hora desde la que rige cada valor. La mantiene un trigger
+#   sobre emergencias_eventos, así que consultar el estado no recorre el registro.
+#
+# Edición concurrente: cada fila de emergencias lleva una columna version con
+# el número del guardado que la escribió por última vez (un contador global).
+# - Al guardar, el cliente envía la tabla tal como la cargó (base) y sus
+#   versiones. Si la versión de una fila no cambió, nadie más la tocó; si
+#   cambió, se fusiona campo por campo: se aplican los campos que este usuario
+#   modificó y se conservan los que modificaron otros. Si ambos modificaron el
+#   mismo campo con valores distintos, queda el valor guardado primero y se
+#   informa el conflicto.
+# - Como la versión es global, "filas con version > v" es el registro de
+#   cambios: cada cliente consulta solo las filas que cambiaron desde su versión.
+DB_FILE = "emergencias.db"
+
+MAPEO_UI_BD = {
+    'Región': 'Region',
+    'Selecc': 'Selecc',
+    'Agua': 'Agua',
+    'Electricidad': 'Electricidad',
+    'Internet': 'Internet',
+    'Acceso a Sistemas (Si/No)': 'AccesoSistemas',
+    'Reporte de TI (Si/No)': 'InfoTI',
+    'Sistemas NO operativos (Cuáles?))': 'SistemasNoOperativos',
+    'Sucursales NO operativas': 'SucursalesNoOperativas',
+    'Cuenta con VPN': 'VPN',
+    'Atención recibida (Si/No)': 'Atenciones',
+    'Funcionarios afectados': 'FuncionariosAfectados',
+    'Instrucciones SEREMI (Si/No)': 'InstruccionesSEREMI',
+    'Instrucciones SEREMI(Cuáles?)': 'CualInstruccionSEREMI',
+    'Observ/Propuesta DR': 'Observaciones',
+}
+MAPEO_BD_UI = {bd: ui for ui, bd in MAPEO_UI_BD.items()}
+COLUMNAS_BD = list(MAPEO_UI_BD.values())
+# Selecc es solo una marca de la interfaz: no genera eventos
+COLUMNAS_EVENTO = [c for c in COLUMNAS_BD if c not in ('Region', 'Selecc')]
+
+def _sql_semilla():
+    # Punto de partida del registro: el estado que ya estaba guardado
+    selects = "\n    UNION ALL ".join(
+        f"SELECT Region, '{c}' AS columna, {c} AS valor FROM emergencias WHERE COALESCE({c}, '') <> ''"
+        for c in COLUMNAS_EVENTO
+    )
+    return f"""
+INSERT INTO emergencias_eventos (ts, Region, columna, anterior, nuevo)
+SELECT strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime'), Region, columna, NULL, valor
+FROM (
+    {selects}
+)
+WHERE NOT EXISTS (SELECT 1 FROM emergencias_eventos);
+"""
+
+# El esquema se crea una sola vez por proceso, al crear el pool de conexiones
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS emergencias (
+    Region TEXT PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 0,
+    Selecc INTEGER,
+    Agua TEXT,
+    Electricidad TEXT,
+    Internet TEXT,
+    AccesoSistemas TEXT,
+    InfoTI TEXT,
+    SistemasNoOperativos TEXT,
+    SucursalesNoOperativas TEXT,
+    VPN TEXT,
+    Atenciones TEXT,
+    FuncionariosAfectados TEXT,
+    InstruccionesSEREMI TEXT,
+    CualInstruccionSEREMI TEXT,
+    Observaciones TEXT
+);
+CREATE TABLE IF NOT EXISTS emergencias_eventos (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ts TEXT NOT NULL,
+    Region TEXT NOT NULL,
+    columna TEXT NOT NULL,
+    anterior TEXT,
+    nuevo TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_eventos_region_ts ON emergencias_eventos (Region, ts);
+CREATE INDEX IF NOT EXISTS idx_eventos_ts ON emergencias_eventos (ts);
+CREATE TABLE IF NOT EXISTS emergencias_estado (
+    Region TEXT NOT NULL,
+    columna TEXT NOT NULL,
+    valor TEXT,
+    desde TEXT NOT NULL,
+    evento_id INTEGER,
+    PRIMARY KEY (Region, columna)
+);
+CREATE TRIGGER IF NOT EXISTS trg_emergencias_estado AFTER INSERT ON emergencias_eventos
+BEGIN
+    INSERT INTO emergencias_estado (Region, columna, valor, desde, evento_id)
+    VALUES (NEW.Region, NEW.columna, NEW.nuevo, NEW.ts, NEW.id)
+    ON CONFLICT (Region, columna) DO UPDATE SET
+        valor = excluded.valor, desde = excluded.desde, evento_id = excluded.evento_id
+    WHERE excluded.desde >= emergencias_estado.desde;
+END;
+""" + _sql_semilla()
+
+@st.cache_resource(show_spinner=False)
+def _migrar():
+    # Bases creadas antes de la columna version
+    with conexion(DB_FILE, ESQUEMA) as conn:
+        columnas = [fila[1] for fila in conn.execute("PRAGMA table_info(emergencias)")]
+        if "version" not in columnas:
+            conn.execute("ALTER TABLE emergencias ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_emergencias_version ON emergencias (version)")
+        conn.commit()
+    return True
+
+def conectar():
+    _migrar()
+    return conexion(DB_FILE, ESQUEMA)
+
+def marca_tiempo(momento=None):
+    return (momento or datetime.now()).isoformat(sep=" ", timespec="milliseconds")
+
+# =========================
+# CARGA Y GUARDADO
+# =========================
+def _leer(conn, desde_version=None):
+    # (DataFrame con nombres de la interfaz, versiones por región)
+    sql = f"SELECT version, {', '.join(COLUMNAS_BD)} FROM emergencias"
+    params = ()
+    if desde_version is not None:
+        sql += " WHERE version > ?"
+        params = (desde_version,)
+    df_db = pd.read_sql_query(sql, conn, params=params)
+    versiones = dict(zip(df_db["Region"], df_db["version"].astype(int)))
+    return df_db.drop(columns=["version"]).rename(columns=MAPEO_BD_UI), versiones
+
+def cargar_emergencias():
+    # (DataFrame con los nombres de columnas de la interfaz, versiones por región);
+    # el DataFrame queda vacío si no hay datos
+    with conectar() as conn:
+        return _leer(conn)
+
+def version_actual():
+    # Consulta barata (índice sobre version) para saber si hubo guardados nuevos
+    with conectar() as conn:
+        return conn.execute("SELECT COALESCE(MAX(version), 0) FROM emergencias").fetchone()[0]
+
+def cambios_desde(version):
+    # Solo las filas escritas después de la versión indicada
+    with conectar() as conn:
+        return _leer(conn, version)
+
+def _texto(valor):
+    return None if valor is None or pd.isna(valor) else str(valor)
+
+def _fusionar(cursor, nuevo, base, versiones):
+    # Fusión campo por campo contra lo guardado actualmente.
+    # Devuelve (filas a escribir, conflictos).
+    tipos = tipos_tabla(cursor, "emergencias")
+    tipos = {c: tipos.get(c, "") for c in COLUMNAS_BD}
+    nuevo = tipar_columnas(nuevo, tipos).drop_duplicates(subset="Region", keep="last").set_index("Region")
+    base = tipar_columnas(base, tipos).drop_duplicates(subset="Region", keep="last").set_index("Region")
+    base = base.reindex(nuevo.index)
+
+    cursor.execute(f"SELECT version, {', '.join(COLUMNAS_BD)} FROM emergencias")
+    guardadas = pd.DataFrame(cursor.fetchall(), columns=["version"] + COLUMNAS_BD).set_index("Region")
+    actual = tipar_columnas(guardadas.reset_index(), tipos).set_index("Region").reindex(nuevo.index)
+    existentes = nuevo.index.isin(guardadas.index)
+
+    # CAS por fila: si la versión guardada es la que cargó el cliente, nadie más la tocó
+    version_guardada = guardadas["version"].reindex(nuevo.index)
+    version_cliente = pd.Series(versiones, dtype=object).reindex(nuevo.index)
+    tocadas = existentes & (version_guardada != version_cliente).to_numpy()
+
+    mios = celdas_distintas(nuevo, base)
+    ajenos = celdas_distintas(actual, base)
+    ajenos.loc[~tocadas] = False
+    conflictos = mios & ajenos & celdas_distintas(nuevo, actual)
+    aplicar = mios & ~conflictos
+
+    filas = actual.where(~aplicar, nuevo)
+    filas.loc[~existentes] = nuevo.loc[~existentes]
+
+    pares = conflictos.stack()
+    detalle = pd.DataFrame(
+        [
+            (region, MAPEO_BD_UI.get(columna, columna), _texto(nuevo.at[region, columna]), _texto(actual.at[region, columna]))
+            for region, columna in pares[pares].index
+        ],
+        columns=["Región", "Campo", "Su valor", "Valor vigente"],
+    )
+    return filas.reset_index(), detalle
+
+def guardar_emergencias(df_ui, df_base=None, versiones=None):
+    # df_base / versiones: la tabla y las versiones tal como las cargó el
+    # cliente. Con ellas se fusionan los cambios campo por campo; sin ellas, la
+    # tabla se guarda tal cual (último en guardar gana).
+    # Escribe las regiones que cambiaron y un evento por cada campo modificado,
+    # todo en una transacción. Devuelve un resumen con las regiones escritas,
+    # los eventos registrados, los conflictos y la nueva versión.
+    ts = marca_tiempo()
+    nuevo = df_ui.rename(columns=MAPEO_UI_BD)
+    with conectar() as conn:
+        cursor = conn.cursor()
+        cursor.execute("BEGIN IMMEDIATE")
+        try:
+            conflictos = pd.DataFrame(columns=["Región", "Campo", "Su valor", "Valor vigente"])
+            if df_base is not None:
+                nuevo, conflictos = _fusionar(cursor, nuevo, df_base.rename(columns=MAPEO_UI_BD), versiones or {})
+            escritas, anteriores = upsert_filas_fijas(cursor, "emergencias", "Region", COLUMNAS_BD, nuevo)
+            version = cursor.execute("SELECT COALESCE(MAX(version), 0) FROM emergencias").fetchone()[0]
+            if len(escritas):
+                version += 1
+                cursor.executemany(
+                    "UPDATE emergencias SET version = ? WHERE Region = ?",
+                    [(version, region) for region in escritas.index],
+                )
+            # Un evento por celda distinta (Selecc no genera eventos)
+            distintas = celdas_distintas(escritas[COLUMNAS_EVENTO], anteriores[COLUMNAS_EVENTO]).stack()
+            eventos = [
+                (ts, region, columna, _texto(anteriores.at[region, columna]), _texto(escritas.at[region, columna]))
+                for region, columna in distintas[distintas].index
+            ]
+            if eventos:
+                cursor.executemany(
+                    """INSERT INTO emergencias_eventos (ts, Region, columna, anterior, nuevo)
+                       VALUES (?, ?, ?, ?, ?)""",
+                    eventos,
+                )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    return {
+        "regiones": len(escritas),
+        "eventos": len(eventos),
+        "conflictos": conflictos,
+        "version": version,
+    }
+
+# =========================
+# CONSULTAS DEL REGISTRO
+# =========================
+def estado_actual():
+    # Estado vigente por región y columna, con la hora desde la que rige
+    with conectar() as conn:
+        estado = pd.read_sql_query(
+            "SELECT Region, columna, valor, desde FROM emergencias_estado ORDER BY Region, columna",
+            conn,
+        )
+    estado["columna"] = estado["columna"].map(MAPEO_BD_UI).fillna(estado["columna"])
+    return estado
+
+def compactar_estado():
+    # Reconstruye la vista de estado desde el registro (última versión de cada campo)
+    with conectar() as conn:
+        cursor = conn.cursor()
+        cursor.execute("BEGIN IMMEDIATE")
+        try:
+            cursor.execute("DELETE FROM emergencias_estado")
+            cursor.execute("""
+                INSERT INTO emergencias_estado (Region, columna, valor, desde, evento_id)
+                SELECT Region, columna, nuevo, ts, id FROM (
+                    SELECT *, ROW_NUMBER() OVER (
+                        PARTITION BY Region, columna ORDER BY ts DESC, id DESC
+                    ) AS orden
+                    FROM emergencias_eventos
+                )
+                WHERE orden = 1
+            """)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+def eventos(desde, hasta, regiones=None, columnas=None, limite=5000):
+    # Cambios en la ventana [desde, hasta], usando el índice (Region, ts) cuando
+    # se filtran regiones o el índice (ts) si no.
+    sql = "SELECT ts, Region, columna, anterior, nuevo FROM emergencias_eventos WHERE ts BETWEEN ? AND ?"
+    params = [marca_tiempo(desde), marca_tiempo(hasta)]
+    if regiones:
+        sql += f" AND Region IN ({', '.join('?' for _ in regiones)})"
+        params += list(regiones)
+    if columnas:
+        sql += f" AND columna IN ({', '.join('?' for _ in columnas)})"
+        params += [MAPEO_UI_BD.get(c, c) for c in columnas]
+    sql += " ORDER BY ts DESC, id DESC LIMIT ?"
+    params.append(limite)
+    with conectar() as conn:
+        datos = pd.read_sql_query(sql, conn, params=params)
+    datos["columna"] = datos["columna"].map(MAPEO_BD_UI).fillna(datos["columna"])
+    return datos
+
+def periodos(region, columna, desde, hasta):
+    # Intervalos en que el campo tuvo cada valor dentro de la ventana
+    # (p. ej. desde cuándo y hasta cuándo una región estuvo sin agua).
+    inicio, fin = marca_tiempo(desde), marca_tiempo(hasta)
+    columna = MAPEO_UI_BD.get(columna, columna)
+    with conectar() as conn:
+        datos = pd.read_sql_query(
+            """SELECT * FROM (
+                   SELECT ? AS desde, nuevo AS valor FROM emergencias_eventos
+                   WHERE Region = ? AND columna = ? AND ts <= ?
+                   ORDER BY ts DESC, id DESC LIMIT 1)
+               UNION ALL
+               SELECT * FROM (
+                   SELECT ts AS desde, nuevo AS valor FROM emergencias_eventos
+                   WHERE Region = ? AND columna = ? AND ts > ? AND ts <= ?
+                   ORDER BY ts, id)""",
+            conn,
+            params=(inicio, region, columna, inicio, region, columna, inicio, fin),
+        )
+    if datos.empty:
+        return pd.DataFrame(columns=["valor", "desde", "hasta", "duracion"])
+    datos["hasta"] = datos["desde"].shift(-1).fillna(fin)
+    inicio_periodo = pd.to_datetime(datos["desde"])
+    datos["duracion"] = pd.to_datetime(datos["hasta"]) - inicio_periodo
+    return datos[["valor", "desde", "hasta", "duracion"]]
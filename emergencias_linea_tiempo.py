@@ -0,0 +1,134 @@
+import streamlit as st
+from datetime import datetime, timedelta
+from emergencias_bd import COLUMNAS_EVENTO, MAPEO_BD_UI, estado_actual, eventos, periodos
+from recursos import ALTO_LOGO, imagen_data_uri
+
+st.set_page_config(page_title="Línea de Tiempo Emergencias", layout="wide", page_icon="🕒")
+
+# =========================
+# CONFIGURACIÓN DEL ENCABEZADO
+# =========================
+COLOR_FONDO = "#0F69B4"
+IMAGEN_LOCAL = "LOGO-PROPIO-ISL-2023-CMYK-01.png"
+TITULO = "CONTROL CONTINUIDAD OPERACIONAL - LÍNEA DE TIEMPO DE EMERGENCIAS"
+SUBTITULO = "Sección de Coordinación Territorial"
+
+# Servicios cuyo estado se resume arriba
+SERVICIOS = ["Agua", "Electricidad", "Internet"]
+COLUMNAS_UI = [MAPEO_BD_UI[c] for c in COLUMNAS_EVENTO]
+
+img_src = imagen_data_uri(IMAGEN_LOCAL, ALTO_LOGO)
+
+st.markdown(f"""
+<style>
+.header-container {{
+    display: flex;
+    align-items: center;
+    justify-content: center;
+    background-color: {COLOR_FONDO};
+    height: 85px;
+    width: 100%;
+    color: white;
+    position: relative;
+}}
+.header-logo {{
+    position: absolute;
+    left: 20px;
+    top: 5px;
+}}
+.header-logo img {{
+    height: 60px;
+}}
+.header-subtitle {{
+    position: absolute;
+    bottom: 5px;
+    left: 20px;
+    font-size: 10px;
+}}
+.header-title {{
+    font-size: 20px;
+    font-weight: bold;
+}}
+.subtitulo-tabla {{
+    margin-top: 20px;
+    font-size: 16px;
+    color: #000000;
+}}
+</style>
+
+<div class="header-container">
+    <div class="header-logo">
+        <img src="{img_src}" alt="Logo">
+    </div>
+    <div class="header-subtitle">{SUBTITULO}</div>
+    <div class="header-title">{TITULO}</div>
+</div>
+""", unsafe_allow_html=True)
+
+# =========================
+# ESTADO ACTUAL (vista materializada)
+# =========================
+st.markdown('<div class="subtitulo-tabla">Estado actual de los servicios</div>', unsafe_allow_html=True)
+estado = estado_actual()
+servicios = estado[estado["columna"].isin(SERVICIOS)]
+if servicios.empty:
+    st.info("Aún no hay cambios registrados.")
+else:
+    resumen = servicios.assign(
+        celda=servicios["valor"].fillna("") + " (desde " + servicios["desde"].str[5:16] + ")"
+    ).pivot(index="Region", columns="columna", values="celda")
+    resumen.index.name = "Región"
+    st.dataframe(resumen.reindex(columns=[s for s in SERVICIOS if s in resumen.columns]),
+                 use_container_width=True)
+
+# =========================
+# FILTROS
+# =========================
+st.markdown('<div class="subtitulo-tabla">Cambios registrados</div>', unsafe_allow_html=True)
+ahora = datetime.now()
+f1, f2, f3, f4 = st.columns([2, 2, 1, 1])
+with f1:
+    regiones_filtro = st.multiselect("Región", sorted(estado["Region"].unique()), key="lt_regiones")
+with f2:
+    columnas_filtro = st.multiselect("Campo", COLUMNAS_UI, key="lt_columnas")
+with f3:
+    fecha_desde = st.date_input("Desde", value=(ahora - timedelta(days=7)).date(), key="lt_desde")
+with f4:
+    fecha_hasta = st.date_input("Hasta", value=ahora.date(), key="lt_hasta")
+
+desde = datetime.combine(fecha_desde, datetime.min.time())
+hasta = datetime.combine(fecha_hasta, datetime.max.time())
+
+# =========================
+# REGISTRO DE CAMBIOS (consulta por índice y ventana de tiempo)
+# =========================
+cambios = eventos(desde, hasta, regiones_filtro, columnas_filtro)
+st.caption(f"{len(cambios)} cambios en la ventana seleccionada")
+st.dataframe(
+    cambios.rename(columns={
+        "ts": "Fecha/Hora", "Region": "Región", "columna": "Campo",
+        "anterior": "Valor anterior", "nuevo": "Valor nuevo",
+    }),
+    use_container_width=True,
+    hide_index=True,
+)
+
+# =========================
+# PERÍODOS POR CAMPO
+# =========================
+if len(regiones_filtro) == 1:
+    region = regiones_filtro[0]
+    st.markdown(f'<div class="subtitulo-tabla">Períodos en {region}</div>', unsafe_allow_html=True)
+    for columna in columnas_filtro or SERVICIOS:
+        tramos = periodos(region, columna, desde, min(hasta, ahora))
+        if tramos.empty:
+            continue
+        st.markdown(f"**{columna}**")
+        st.dataframe(
+            tramos.assign(duracion=tramos["duracion"].astype(str).str.replace("days", "días"))
+            .rename(columns={"valor": "Valor", "desde": "Desde", "hasta": "Hasta", "duracion": "Duración"}),
+            use_container_width=True,
+            hide_index=True,
+        )
+else:
+    st.caption("Seleccione una sola región para ver los períodos de cada servicio.")
@@ -0,0 +1,125 @@
+# estado_enlaces.py
+import asyncio
+import json
+import os
+import ssl
+import time
+from urllib.parse import urljoin, urlsplit
+
+import streamlit as st
+
+# =========================
+# ENLACES EXTERNOS DEL MENÚ
+# =========================
+# La lista de enlaces vive en enlaces.json (clave, titulo, url). La variable de
+# entorno SCT_ENLACES permite apuntar a otro archivo, p. ej. uno con servidores
+# HTTP locales para probar el sondeo sin salir a internet.
+ARCHIVO_ENLACES = os.environ.get("SCT_ENLACES", "enlaces.json")
+
+# Cada enlace tiene TIMEOUT_SONDEO segundos para responder; todos se consultan a
+# la vez, así que el sondeo completo nunca tarda mucho más que eso.
+TIMEOUT_SONDEO = 3.0
+TTL_SONDEO = 120
+MAX_REDIRECCIONES = 3
+
+ARRIBA = "arriba"
+CAIDO = "caído"
+SIN_RESPUESTA = "sin respuesta"
+
+@st.cache_data(show_spinner=False)
+def _leer_enlaces(archivo, mtime):
+    with open(archivo, encoding="utf-8") as f:
+        return {enlace["clave"]: enlace for enlace in json.load(f)}
+
+def cargar_enlaces(archivo=ARCHIVO_ENLACES):
+    # {clave: {"clave", "titulo", "url"}}; se relee solo si cambia el archivo
+    return _leer_enlaces(archivo, os.path.getmtime(archivo))
+
+# =========================
+# SONDEO (asyncio)
+# =========================
+async def _pedir(url, contexto_ssl):
+    # Devuelve (código HTTP, Location); solo se lee la línea de estado y los encabezados
+    partes = urlsplit(url)
+    seguro = partes.scheme == "https"
+    puerto = partes.port or (443 if seguro else 80)
+    lector, escritor = await asyncio.open_connection(
+        partes.hostname, puerto,
+        ssl=contexto_ssl if seguro else None,
+        server_hostname=partes.hostname if seguro else None,
+    )
+    try:
+        ruta = partes.path or "/"
+        if partes.query:
+            ruta += "?" + partes.query
+        escritor.write(
+            f"GET {ruta} HTTP/1.1\r\nHost: {partes.netloc}\r\n"
+            f"User-Agent: SCT-estado-enlaces\r\nConnection: close\r\n\r\n".encode()
+        )
+        await escritor.drain()
+        codigo = int((await lector.readline()).split()[1])
+        ubicacion = None
+        while True:
+            linea = (await lector.readline()).decode("latin-1").strip()
+            if not linea:
+                break
+            nombre, _, valor = linea.partition(":")
+            if nombre.lower() == "location":
+                ubicacion = valor.strip()
+        return codigo, ubicacion
+    finally:
+        escritor.close()
+
+async def _seguir(url, contexto_ssl):
+    # Sigue redirecciones: un enlace que redirige a una página que responde está arriba
+    for _ in range(MAX_REDIRECCIONES + 1):
+        codigo, ubicacion = await _pedir(url, contexto_ssl)
+        if not (300 <= codigo < 400 and ubicacion):
+            break
+        url = urljoin(url, ubicacion)
+    return codigo
+
+async def sondear(url, timeout=TIMEOUT_SONDEO, contexto_ssl=None):
+    # {"estado", "codigo", "latencia_ms", "detalle"} de un enlace
+    contexto_ssl = contexto_ssl or ssl.create_default_context()
+    inicio = time.perf_counter()
+    try:
+        codigo = await asyncio.wait_for(_seguir(url, contexto_ssl), timeout)
+    except asyncio.TimeoutError:
+        return {"estado": SIN_RESPUESTA, "codigo": None, "latencia_ms": None,
+                "detalle": f"más de {timeout:g} s"}
+    except (OSError, ValueError, IndexError) as e:
+        return {"estado": CAIDO, "codigo": None, "latencia_ms": None, "detalle": str(e) or type(e).__name__}
+    latencia = round((time.perf_counter() - inicio) * 1000)
+    return {
+        "estado": ARRIBA if codigo < 400 else CAIDO,
+        "codigo": codigo,
+        "latencia_ms": latencia,
+        "detalle": f"HTTP {codigo}",
+    }
+
+async def sondear_todos(urls, timeout=TIMEOUT_SONDEO):
+    contexto_ssl = ssl.create_default_context()
+    resultados = await asyncio.gather(*(sondear(url, timeout, contexto_ssl) for url in urls))
+    return dict(zip(urls, resultados))
+
+@st.cache_data(ttl=TTL_SONDEO, show_spinner=False)
+def estado_enlaces(urls, timeout=TIMEOUT_SONDEO):
+    # {url: resultado}; mientras no venza el TTL, todas las sesiones reutilizan el sondeo
+    resultados = asyncio.run(sondear_todos(list(urls), timeout))
+    momento = time.time()
+    for resultado in resultados.values():
+        resultado["momento"] = momento
+    return resultados
+
+def insignia(resultado):
+    # Texto corto para mostrar bajo cada mosaico
+    if resultado is None:
+        return ""
+    if resultado["estado"] == ARRIBA:
+        return f"🟢 {resultado['latencia_ms']} ms"
+    if resultado["estado"] == SIN_RESPUESTA:
+        return "🟠 sin respuesta"
+    if resultado["codigo"] is None:
+        return "🔴 sin conexión"
+    return f"🔴 HTTP {resultado['codigo']}"
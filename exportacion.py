@@ -0,0 +1,79 @@
+# exportacion.py
+from datetime import date, datetime
+from io import BytesIO
+
+import streamlit as st
+
+from arranque import diferido
+
+# numpy, pandas y openpyxl solo se cargan al exportar (ver arranque.py)
+np = diferido("numpy")
+pd = diferido("pandas")
+
+# =========================
+# EXPORTACIÓN A EXCEL
+# =========================
+# - El archivo solo se genera cuando el usuario pide exportar.
+# - Se escribe con un libro write_only de openpyxl, fila por fila.
+# - Los bytes quedan en caché por (clave, versión de los datos): volver a
+#   descargar datos que no cambiaron no genera el archivo de nuevo.
+MIME_XLSX = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+def _celda(valor):
+    # Convierte tipos de pandas/numpy a valores que openpyxl puede escribir
+    if valor is None or valor is pd.NaT or valor is pd.NA:
+        return None
+    if isinstance(valor, float) and np.isnan(valor):
+        return None
+    if isinstance(valor, pd.Timestamp):
+        return valor.to_pydatetime()
+    if isinstance(valor, np.datetime64):
+        return _celda(pd.Timestamp(valor))
+    if isinstance(valor, np.generic):
+        return _celda(valor.item())
+    if isinstance(valor, (str, int, float, bool, date, datetime)):
+        return valor
+    return str(valor)
+
+def hoja_desde_dataframe(nombre, df):
+    # (nombre, encabezados, filas) a partir de un DataFrame, sin copiarlo
+    return nombre, [str(c) for c in df.columns], df.itertuples(index=False, name=None)
+
+def escribir_libro(hojas):
+    # hojas: lista de (nombre, encabezados, filas); filas puede ser un generador
+    from openpyxl import Workbook
+
+    libro = Workbook(write_only=True)
+    for nombre, encabezados, filas in hojas:
+        hoja = libro.create_sheet(title=nombre)
+        hoja.append(list(encabezados))
+        for fila in filas:
+            hoja.append([_celda(v) for v in fila])
+    salida = BytesIO()
+    libro.save(salida)
+    return salida.getvalue()
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _bytes_excel(clave, version, _generar_hojas):
+    # _generar_hojas no forma parte de la clave de caché: la versión identifica los datos
+    return escribir_libro(_generar_hojas())
+
+def boton_exportar(etiqueta, clave, version, generar_hojas, file_name, **kwargs):
+    # Muestra "etiqueta" como botón; al presionarlo genera el archivo y muestra
+    # la descarga. Mientras la versión de los datos no cambie, la descarga
+    # queda disponible directamente desde la caché.
+    estado = f"exportacion_{clave}"
+    if st.session_state.get(estado) != version:
+        if not st.button(etiqueta, key=f"btn_{estado}", **kwargs):
+            return
+        st.session_state[estado] = version
+
+    datos = _bytes_excel(clave, version, generar_hojas)
+    st.download_button(
+        "📥 Descargar",
+        data=datos,
+        file_name=file_name,
+        mime=MIME_XLSX,
+        key=f"descarga_{estado}",
+        **kwargs,
+    )
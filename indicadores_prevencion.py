@@ -0,0 +1,174 @@
+import streamlit as st
+from calculo_indicadores import asegurar_indicadores, leer_indicadores
+from ingesta import LIBROS
+from recursos import ALTO_LOGO, imagen_data_uri
+
+st.set_page_config(page_title="Indicadores Prevención", layout="wide", page_icon="📊")
+
+# =========================
+# CONFIGURACIÓN DEL ENCABEZADO
+# =========================
+COLOR_FONDO = "#0F69B4"
+IMAGEN_LOCAL = "LOGO-PROPIO-ISL-2023-CMYK-01.png"
+TITULO = "CONTROL DE INDICADORES DE PREVENCIÓN"
+SUBTITULO = "Sección de Coordinación Territorial"
+
+img_src = imagen_data_uri(IMAGEN_LOCAL, ALTO_LOGO)
+
+st.markdown(f"""
+<style>
+.header-container {{
+    display: flex;
+    align-items: center;
+    justify-content: center;
+    background-color: {COLOR_FONDO};
+    height: 85px;
+    width: 100%;
+    color: white;
+    position: relative;
+}}
+.header-logo {{
+    position: absolute;
+    left: 20px;
+    top: 5px;
+}}
+.header-logo img {{
+    height: 60px;
+}}
+.header-subtitle {{
+    position: absolute;
+    bottom: 5px;
+    left: 20px;
+    font-size: 10px;
+}}
+.header-title {{
+    font-size: 20px;
+    font-weight: bold;
+}}
+.subtitulo-tabla {{
+    margin-top: 20px;
+    font-size: 16px;
+    color: #000000;
+}}
+</style>
+
+<div class="header-container">
+    <div class="header-logo">
+        <img src="{img_src}" alt="Logo">
+    </div>
+    <div class="header-subtitle">{SUBTITULO}</div>
+    <div class="header-title">{TITULO}</div>
+</div>
+""", unsafe_allow_html=True)
+
+# =========================
+# DATOS (calculados por hoja y guardados en cache_libros.db)
+# =========================
+try:
+    version = asegurar_indicadores()
+except FileNotFoundError:
+    st.error(f"❌ No se encontró el archivo '{LIBROS['indicadores']}'")
+    st.stop()
+
+hojas = leer_indicadores(version, "ind_hojas")
+procesos = leer_indicadores(version, "ind_procesos")
+regiones = leer_indicadores(version, "ind_regiones")
+mensual = leer_indicadores(version, "ind_mensual")
+
+fechas = hojas["actualizacion"].dropna()
+if not fechas.empty:
+    st.caption(f"Actualización: {fechas.max()}")
+
+# =========================
+# AVANCE NACIONAL POR PROCESO
+# =========================
+st.markdown('<div class="subtitulo-tabla">Avance nacional por proceso</div>', unsafe_allow_html=True)
+if procesos.empty:
+    st.info("No hay datos de procesos en el libro.")
+else:
+    totales = procesos[["meta", "iniciados", "finalizados"]].sum()
+    m1, m2, m3, m4 = st.columns(4)
+    m1.metric("Meta", f"{totales['meta']:,.0f}".replace(",", "."))
+    m2.metric("Procesos iniciados", f"{totales['iniciados']:,.0f}".replace(",", "."))
+    m3.metric("Procesos finalizados", f"{totales['finalizados']:,.0f}".replace(",", "."))
+    m4.metric(
+        "% Finalizados",
+        f"{totales['finalizados'] / totales['iniciados']:.1%}" if totales["iniciados"] else "—",
+    )
+
+    st.dataframe(
+        procesos.drop(columns=["hoja"]),
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            "proceso": "Proceso",
+            "meta": st.column_config.NumberColumn("Meta", format="%d"),
+            "iniciados": st.column_config.NumberColumn("Proc. Iniciados", format="%d"),
+            "finalizados": st.column_config.NumberColumn("Proc. Finalizados", format="%d"),
+            "pct_finalizados": st.column_config.ProgressColumn(
+                "% Finalizados", min_value=0, max_value=1, format="percent",
+            ),
+        },
+    )
+
+# =========================
+# AVANCE POR DIRECCIÓN REGIONAL
+# =========================
+if not regiones.empty:
+    st.markdown('<div class="subtitulo-tabla">Avance por Dirección Regional</div>', unsafe_allow_html=True)
+    proceso_regional = st.selectbox("Proceso", list(dict.fromkeys(regiones["proceso"])), key="proceso_regional")
+    st.dataframe(
+        regiones[regiones["proceso"] == proceso_regional].drop(columns=["hoja", "proceso"]),
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            "region": "Dirección Regional",
+            "iniciados": st.column_config.NumberColumn("Proc. Iniciados", format="%d"),
+            "finalizados": st.column_config.NumberColumn("Proc. Finalizados", format="%d"),
+            "meta": st.column_config.NumberColumn("Meta", format="%d"),
+            "avance": st.column_config.NumberColumn("Avance", format="%d"),
+            "diferencia": st.column_config.NumberColumn("Dif.", format="%d"),
+        },
+    )
+
+# =========================
+# EVOLUCIÓN MENSUAL
+# =========================
+if not mensual.empty:
+    st.markdown('<div class="subtitulo-tabla">Evolución mensual</div>', unsafe_allow_html=True)
+    c1, c2 = st.columns(2)
+    with c1:
+        region = st.selectbox("Dirección Regional", list(dict.fromkeys(mensual["region"])), key="region_mensual")
+    with c2:
+        proceso = st.selectbox(
+            "Proceso", list(dict.fromkeys(mensual.loc[mensual["region"] == region, "proceso"])),
+            key="proceso_mensual",
+        )
+    serie = mensual[(mensual["region"] == region) & (mensual["proceso"] == proceso)].sort_values("num_mes")
+
+    # El eje usa el número de mes para que el gráfico respete el orden del año
+    st.line_chart(
+        serie.set_index("num_mes")[["acum_iniciados", "acum_finalizados", "meta_acumulada"]]
+        .rename_axis("Mes")
+        .rename(columns={
+            "acum_iniciados": "Acum. iniciados",
+            "acum_finalizados": "Acum. finalizados",
+            "meta_acumulada": "Meta acumulada",
+        }),
+    )
+    st.dataframe(
+        serie.drop(columns=["hoja", "region", "proceso", "num_mes"]),
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            "mes": "Mes",
+            "acum_iniciados": st.column_config.NumberColumn("Acum. Iniciados", format="%d"),
+            "acum_finalizados": st.column_config.NumberColumn("Acum. Finalizados", format="%d"),
+            "meta_acumulada": st.column_config.NumberColumn("Meta Acum.", format="%d"),
+            "iniciados_mes": st.column_config.NumberColumn("Iniciados del mes", format="%d"),
+            "finalizados_mes": st.column_config.NumberColumn("Finalizados del mes", format="%d"),
+            "cumplimiento": st.column_config.ProgressColumn(
+                "Cumplimiento", min_value=0, max_value=1, format="percent",
+            ),
+        },
+    )
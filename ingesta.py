@@ -0,0 +1,392 @@
+# ingesta.py
+import hashlib
+import itertools
+import os
+import re
+import time
+import warnings
+import zipfile
+from datetime import datetime
+from xml.etree.ElementTree import iterparse
+
+import pandas as pd
+import streamlit as st
+
+from base_datos import conexion
+
+# =========================
+# CACHÉ DE LIBROS EXCEL (SQLite)
+# =========================
+# Los libros .xlsm se leen una sola vez (openpyxl en modo read_only y los
+# registros de las tablas dinámicas directo desde el .zip) y se guardan en
+# tablas indexadas. La caché se invalida por el SHA-256 del archivo, así que
+# las páginas consultan SQLite en milisegundos en vez de abrir el libro.
+DB_CACHE = "cache_libros.db"
+
+LIBROS = {
+    "accidentes": "ACCIDENTES 2025.xlsm",
+    "indicadores": "CONTROL INDICADORES PREVENCIÓN 2025.xlsm",
+}
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS libros (
+    libro TEXT PRIMARY KEY,
+    archivo TEXT,
+    sha256 TEXT,
+    ingestado TEXT
+);
+CREATE TABLE IF NOT EXISTS celdas (
+    libro TEXT,
+    hoja TEXT,
+    fila INTEGER,
+    columna INTEGER,
+    valor
+);
+CREATE INDEX IF NOT EXISTS idx_celdas ON celdas (libro, hoja, fila, columna);
+CREATE TABLE IF NOT EXISTS hojas (
+    libro TEXT,
+    hoja TEXT,
+    huella TEXT,
+    PRIMARY KEY (libro, hoja)
+);
+CREATE TABLE IF NOT EXISTS tablas_registros (
+    libro TEXT,
+    cache INTEGER,
+    tabla TEXT,
+    filas INTEGER,
+    PRIMARY KEY (libro, cache)
+);
+"""
+
+def conectar():
+    return conexion(DB_CACHE, ESQUEMA)
+
+# Subir este número cuando cambien las tablas derivadas: fuerza una nueva ingesta
+VERSION_CACHE = 3
+
+NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+BLOQUE_LECTURA = 1024 * 1024
+
+# =========================
+# HUELLA DEL ARCHIVO
+# =========================
+@st.cache_resource(show_spinner=False)
+def _sha256(path, mtime, tamano):
+    # Se recalcula solo si cambia la fecha o el tamaño del archivo
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for bloque in iter(lambda: f.read(BLOQUE_LECTURA), b""):
+            h.update(bloque)
+    return h.hexdigest()
+
+def sha256_archivo(path):
+    estado = os.stat(path)
+    return _sha256(path, estado.st_mtime, estado.st_size)
+
+# =========================
+# LECTURA DEL LIBRO
+# =========================
+def _valor_sqlite(valor):
+    if isinstance(valor, datetime):
+        return valor.isoformat(sep=" ")
+    if isinstance(valor, bool):
+        return int(valor)
+    if isinstance(valor, (int, float, str)) or valor is None:
+        return valor
+    return str(valor)
+
+def leer_celdas_libro(path):
+    # Genera (hoja, fila, columna, valor) de todas las celdas con contenido
+    with warnings.catch_warnings():
+        # Segmentaciones y extensiones de Excel que openpyxl no soporta
+        warnings.simplefilter("ignore", UserWarning)
+        # openpyxl solo se carga cuando hay que (re)ingestar un libro
+        import openpyxl
+
+        wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+        try:
+            for ws in wb.worksheets:
+                for fila, valores in enumerate(ws.iter_rows(values_only=True), start=1):
+                    for columna, valor in enumerate(valores, start=1):
+                        if valor is not None and valor != "":
+                            yield ws.title, fila, columna, _valor_sqlite(valor)
+        finally:
+            wb.close()
+
+def huella_celdas(celdas):
+    # Huella del contenido de una hoja; no cambia si la hoja no se modificó
+    h = hashlib.sha256()
+    for _, fila, columna, valor in celdas:
+        h.update(f"{fila}\x1f{columna}\x1f{type(valor).__name__}\x1f{valor}\x1e".encode())
+    return h.hexdigest()
+
+def _valor_item(elemento):
+    # Elementos de un pivotCache: n=número, s=texto, d=fecha, b=booleano, m=vacío, e=error
+    tipo = elemento.tag[len(NS):]
+    valor = elemento.get("v")
+    if tipo == "n":
+        return float(valor)
+    if tipo == "b":
+        return int(valor in ("1", "true"))
+    if tipo == "d":
+        return valor.replace("T", " ")
+    if tipo == "m":
+        return None
+    return valor
+
+def limpiar_nombre_columna(nombre):
+    # '_x000a_' es un salto de línea escapado dentro del encabezado de Excel
+    nombre = nombre.replace("_x000a_", " ")
+    return re.sub(r"\s+", " ", nombre).strip()
+
+def _definicion_cache(z, nombre):
+    # Nombres de campos y elementos compartidos de un pivotCacheDefinition
+    campos, compartidos = [], []
+    with z.open(nombre) as f:
+        for _, elemento in iterparse(f):
+            if elemento.tag == NS + "cacheField":
+                campos.append(limpiar_nombre_columna(elemento.get("name", "")))
+                items = elemento.find(NS + "sharedItems")
+                compartidos.append([_valor_item(i) for i in items] if items is not None else [])
+                elemento.clear()
+    return campos, compartidos
+
+def leer_registros_pivot(path):
+    # Genera (numero_cache, columnas, filas) por cada tabla dinámica que guarda
+    # sus registros dentro del libro (saveData). Se lee el XML en streaming.
+    with zipfile.ZipFile(path) as z:
+        nombres = set(z.namelist())
+        for nombre in sorted(nombres):
+            m = re.fullmatch(r"xl/pivotCache/pivotCacheRecords(\d+)\.xml", nombre)
+            if not m:
+                continue
+            numero = int(m.group(1))
+            campos, compartidos = _definicion_cache(z, f"xl/pivotCache/pivotCacheDefinition{numero}.xml")
+
+            filas = []
+            with z.open(nombre) as f:
+                for _, elemento in iterparse(f):
+                    if elemento.tag != NS + "r":
+                        continue
+                    fila = []
+                    for i, item in enumerate(elemento):
+                        if item.tag == NS + "x":
+                            fila.append(compartidos[i][int(item.get("v"))])
+                        else:
+                            fila.append(_valor_item(item))
+                    # Campos faltantes al final del registro quedan vacíos
+                    fila.extend([None] * (len(campos) - len(fila)))
+                    filas.append(fila)
+                    elemento.clear()
+            yield numero, campos, filas
+
+def _columnas_unicas(campos):
+    vistas = {}
+    columnas = []
+    for campo in campos:
+        nombre = campo or "Campo"
+        if nombre in vistas:
+            vistas[nombre] += 1
+            nombre = f"{nombre} ({vistas[nombre]})"
+        else:
+            vistas[nombre] = 1
+        columnas.append(nombre)
+    return columnas
+
+# =========================
+# TABLAS DERIVADAS
+# =========================
+# Se construyen dentro de la misma transacción de la ingesta, a partir de los
+# registros de las tablas dinámicas. Las fechas vienen como número de serie de Excel.
+# El número de cada caché de tabla dinámica depende del orden en que Excel las
+# guardó y cambia al volver a guardar el libro, así que la tabla de registros
+# ({registros} en las sentencias) se elige por sus campos al ingestar.
+SQL_FECHA_EXCEL = "CASE WHEN typeof({c}) IN ('integer', 'real') THEN date('1899-12-30', printf('%+d days', {c})) ELSE {c} END"
+
+DERIVADOS = {
+    "accidentes": {
+        "campos": [
+            "N°", "CUN", "MES", "Dirección Regional", "SPM - Tipo de calificación de Accidente",
+            "Criterio Gravedad", "Fecha Accidente", "Comuna Accidente", "Razón Social",
+            "Categoría Ocupacional", "SPM - Sexo", "Estado", "Descripción Accidente",
+        ],
+        "sentencias": [
+            "DROP TABLE IF EXISTS accidentes",
+            f"""CREATE TABLE accidentes AS
+               SELECT CAST("N°" AS INTEGER) AS numero,
+                      CAST(CUN AS INTEGER) AS cun,
+                      CAST(MES AS INTEGER) AS mes,
+                      TRIM("Dirección Regional") AS region,
+                      COALESCE(NULLIF(TRIM("SPM - Tipo de calificación de Accidente"), ''), 'Sin calificación') AS tipo,
+                      COALESCE(NULLIF(TRIM("Criterio Gravedad"), ''), 'Sin criterio') AS criterio,
+                      {SQL_FECHA_EXCEL.format(c='"Fecha Accidente"')} AS fecha,
+                      TRIM("Comuna Accidente") AS comuna,
+                      TRIM("Razón Social") AS empresa,
+                      "Categoría Ocupacional" AS categoria,
+                      "SPM - Sexo" AS sexo,
+                      TRIM(Estado) AS estado,
+                      "Descripción Accidente" AS descripcion
+               FROM {{registros}}""",
+            "CREATE INDEX idx_accidentes ON accidentes (region, mes, tipo)",
+            # Cubo: conteo por región, mes, tipo y criterio de gravedad
+            "DROP TABLE IF EXISTS cubo_accidentes",
+            """CREATE TABLE cubo_accidentes AS
+               SELECT region, mes, tipo, criterio, COUNT(*) AS accidentes
+               FROM accidentes
+               GROUP BY region, mes, tipo, criterio""",
+        ],
+    },
+}
+
+def citar(identificador):
+    return '"' + identificador.replace('"', '""') + '"'
+
+def tabla_registros(libro, cache):
+    return f"registros_{libro}_{cache}"
+
+def tabla_con_campos(libro, tablas, campos):
+    # tablas: {tabla de registros: sus columnas}. Devuelve la primera que tiene
+    # todos los campos; ValueError si ninguna los tiene.
+    for tabla, columnas in tablas.items():
+        if set(campos) <= set(columnas):
+            return tabla
+    raise ValueError(
+        f"'{LIBROS[libro]}': ninguna tabla dinámica guarda los campos "
+        f"{', '.join(campos)}. Revise que el libro conserve la tabla dinámica "
+        "con sus registros (opción 'Guardar datos de origen con el archivo')."
+    )
+
+# =========================
+# INGESTA
+# =========================
+def _ingestar(conn, libro, path, sha):
+    cursor = conn.cursor()
+    cursor.execute("BEGIN IMMEDIATE")
+    try:
+        # Otro proceso pudo ingestar el mismo archivo mientras esperábamos el bloqueo
+        fila = cursor.execute("SELECT sha256 FROM libros WHERE libro = ?", (libro,)).fetchone()
+        if fila is not None and fila[0] == sha:
+            conn.commit()
+            return
+
+        # Solo se reescriben las hojas cuyo contenido cambió (p. ej. un mes nuevo)
+        anteriores = dict(cursor.execute(
+            "SELECT hoja, huella FROM hojas WHERE libro = ?", (libro,)
+        ).fetchall())
+        presentes = set()
+        for hoja, celdas in itertools.groupby(leer_celdas_libro(path), key=lambda c: c[0]):
+            celdas = list(celdas)
+            huella = huella_celdas(celdas)
+            presentes.add(hoja)
+            if anteriores.get(hoja) == huella:
+                continue
+            cursor.execute("DELETE FROM celdas WHERE libro = ? AND hoja = ?", (libro, hoja))
+            cursor.executemany(
+                "INSERT INTO celdas (libro, hoja, fila, columna, valor) VALUES (?, ?, ?, ?, ?)",
+                ((libro,) + celda for celda in celdas),
+            )
+            cursor.execute(
+                "INSERT OR REPLACE INTO hojas (libro, hoja, huella) VALUES (?, ?, ?)",
+                (libro, hoja, huella),
+            )
+        for hoja in set(anteriores) - presentes:
+            cursor.execute("DELETE FROM celdas WHERE libro = ? AND hoja = ?", (libro, hoja))
+            cursor.execute("DELETE FROM hojas WHERE libro = ? AND hoja = ?", (libro, hoja))
+
+        for (tabla,) in cursor.execute(
+            "SELECT tabla FROM tablas_registros WHERE libro = ?", (libro,)
+        ).fetchall():
+            cursor.execute(f"DROP TABLE IF EXISTS {citar(tabla)}")
+        cursor.execute("DELETE FROM tablas_registros WHERE libro = ?", (libro,))
+
+        tablas = {}
+        for numero, campos, filas in leer_registros_pivot(path):
+            tabla = tabla_registros(libro, numero)
+            columnas = _columnas_unicas(campos)
+            tablas[tabla] = columnas
+            cursor.execute(f"CREATE TABLE {citar(tabla)} ({', '.join(citar(c) for c in columnas)})")
+            marcadores = ", ".join("?" for _ in columnas)
+            cursor.executemany(f"INSERT INTO {citar(tabla)} VALUES ({marcadores})", filas)
+            cursor.execute(
+                "INSERT INTO tablas_registros (libro, cache, tabla, filas) VALUES (?, ?, ?, ?)",
+                (libro, numero, tabla, len(filas)),
+            )
+
+        if libro in DERIVADOS:
+            derivado = DERIVADOS[libro]
+            registros = citar(tabla_con_campos(libro, tablas, derivado["campos"]))
+            for sql in derivado["sentencias"]:
+                cursor.execute(sql.format(registros=registros))
+
+        cursor.execute(
+            "INSERT OR REPLACE INTO libros (libro, archivo, sha256, ingestado) VALUES (?, ?, ?, ?)",
+            (libro, path, sha, datetime.now().isoformat(sep=" ", timespec="seconds")),
+        )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+@st.cache_resource(show_spinner=False)
+def _asegurar(libro, path, sha):
+    # Una vez por proceso y versión del archivo
+    with conectar() as conn:
+        if conn.execute("PRAGMA user_version").fetchone()[0] != VERSION_CACHE:
+            conn.execute("DELETE FROM libros")
+            conn.execute("DELETE FROM hojas")
+            conn.execute(f"PRAGMA user_version = {VERSION_CACHE}")
+            conn.commit()
+        fila = conn.execute("SELECT sha256 FROM libros WHERE libro = ?", (libro,)).fetchone()
+        if fila is None or fila[0] != sha:
+            _ingestar(conn, libro, path, sha)
+    return sha
+
+def asegurar_libro(libro):
+    # Devuelve el SHA-256 vigente (sirve como clave de caché para las páginas).
+    # Lanza FileNotFoundError si el libro no está.
+    path = LIBROS[libro]
+    return _asegurar(libro, path, sha256_archivo(path))
+
+# =========================
+# CONSULTAS
+# =========================
+def consultar(sql, params=()):
+    with conectar() as conn:
+        return pd.read_sql_query(sql, conn, params=params)
+
+def leer_hoja(libro, hoja, filas=None, columnas=None):
+    # Devuelve la hoja (o un rango) como grilla, con los números de fila y
+    # columna de Excel como índice y encabezados.
+    # filas / columnas: tuplas (desde, hasta) inclusivas, base 1.
+    asegurar_libro(libro)
+    sql = "SELECT fila, columna, valor FROM celdas WHERE libro = ? AND hoja = ?"
+    params = [libro, hoja]
+    if filas is not None:
+        sql += " AND fila BETWEEN ? AND ?"
+        params += list(filas)
+    if columnas is not None:
+        sql += " AND columna BETWEEN ? AND ?"
+        params += list(columnas)
+    celdas = consultar(sql, params)
+    if celdas.empty:
+        return pd.DataFrame()
+    return celdas.pivot(index="fila", columns="columna", values="valor")
+
+def leer_registros(libro, cache):
+    asegurar_libro(libro)
+    return consultar(f"SELECT * FROM {citar(tabla_registros(libro, cache))}")
+
+# =========================
+# PRECARGA (python ingesta.py)
+# =========================
+def ingestar_todo():
+    for libro, path in LIBROS.items():
+        if not os.path.exists(path):
+            print(f"{path}: no encontrado")
+            continue
+        inicio = time.perf_counter()
+        sha = asegurar_libro(libro)
+        print(f"{path}: {sha[:12]} ({time.perf_counter() - inicio:.2f} s)")
+
+if __name__ == "__main__":
+    ingestar_todo()
@@ -0,0 +1,285 @@
+import time
+
+import streamlit as st 
+from estado_enlaces import ARRIBA, TIMEOUT_SONDEO, cargar_enlaces, estado_enlaces, insignia
+from recursos import ALTO_LOGO, TAMANO_ICONO, imagen_base64
+
+# =========================
+# CONFIGURACIÓN DEL ENCABEZADO
+# =========================
+COLOR_FONDO = "#0F69B4"  # Azul
+IMAGEN_LOCAL = "LOGO-PROPIO-ISL-2023-CMYK-01.png"
+TITULO = "SECCIÓN DE COORDINACIÓN TERRITORIAL"
+SUBTITULO = "Sección de Coordinación Territorial"
+
+# Cargar imagen del encabezado (codificada una vez por proceso, ver recursos.py)
+try:
+    img_base64 = imagen_base64(IMAGEN_LOCAL, ALTO_LOGO)
+    img_src = f"data:image/png;base64,{img_base64}"
+except:
+    img_src = ""
+
+# =========================
+# CSS + HTML DEL ENCABEZADO Y NUEVO CONTENEDOR
+# =========================
+@st.cache_resource(show_spinner=False)
+def encabezado_html(img_src):
+    # HTML estático: se arma una vez por proceso (y por versión del logo)
+    return f"""
+    <style>
+        .header-container {{
+            display: flex;
+            align-items: center;
+            justify-content: center;
+            background-color: {COLOR_FONDO};
+            height: 85px;
+            width: 100%;
+            color: white;
+            position: relative;
+            margin: -1rem -1rem 1.2rem -1rem;
+        }}
+        .header-logo {{
+            position: absolute;
+            left: 20px;
+            top: 5px;
+        }}
+        .header-logo img {{
+            height: 60px;
+        }}
+        .header-subtitle {{
+            position: absolute;
+            bottom: 5px;
+            left: 20px;
+            font-size: 10px;
+        }}
+        .header-title {{
+            font-size: 20px;
+            font-weight: bold;
+        }}
+        .quienes-somos {{
+            background-color: #ffffff;
+            width: 100%;
+            height: 100px;
+            display: flex;
+            align-items: center;
+            justify-content: center;
+            font-size: 18px;
+            color: #333;
+            margin-bottom: 30px;
+        }}
+        .separador {{
+            width: 100%;
+            border: 0;
+            height: 2px;
+            background-color: #ccc;
+            margin-bottom: 30px;
+        }}
+    </style>
+    <div class="header-container">
+        <div class="header-logo">
+            <img src="{img_src}" alt="Logo">
+        </div>
+        <div class="header-subtitle">{SUBTITULO}</div>
+        <div class="header-title">{TITULO}</div>
+    </div>
+    <div class="quienes-somos">
+        <div style="margin-top:8px; font-size:18px; font-weight:500; color:#333;">La Sección de Coordinación Territorial (SCT) tiene como función la supervisión funcional de las Direcciones Regionales del ISL,
+        coordinando acciones con diferentes áreas a nivel central y regional para el cumplimiento de objetivos y metas del Servicio.
+    </div></div>
+    <hr class="separador">
+"""
+st.set_page_config(page_title="Menú principal", layout="wide", initial_sidebar_state="collapsed")
+st.markdown(
+    """
+    <style>
+    .css-1d391kg {display: none}
+    section[data-testid="stSidebar"] {display: none !important;}
+    button[data-testid="baseButton-header"] {display: none;}
+    div[data-testid="stPageLink"] {display: flex; justify-content: center;}
+    div[data-testid="stPageLink"] p {font-size: 14px; font-weight: 700; color: #333;}
+    </style>
+    """,
+    unsafe_allow_html=True
+)
+st.markdown(encabezado_html(img_src), unsafe_allow_html=True)
+
+# Enlaces externos y el lugar de su insignia de estado en cada mosaico
+ENLACES = cargar_enlaces()
+INSIGNIAS = {}
+
+# =========================
+# FUNCIÓN PARA IMÁGENES DE BOTONES
+# =========================
+def img_to_bytes(img_path):
+    # Versión de 100px en caché por proceso; no se relee ni recodifica en cada visita
+    return imagen_base64(img_path, TAMANO_ICONO)
+
+def mosaico_enlace(icono, clave, margen_inferior=True):
+    # Sitios externos (enlaces.json): se abren en otra pestaña. Bajo el título
+    # queda un espacio para la insignia de estado, que se llena al final del menú.
+    enlace = ENLACES[clave]
+    img_bytes = img_to_bytes(icono)
+    st.markdown(f'<div style="text-align: center;"><a href="{enlace["url"]}" target="_blank"><img src="data:image/png;base64,{img_bytes}" style="width:100px; height:100px;border-radius:8px; box-shadow:2px 2px 6px rgba(0,0,0,0.3);"></a><div style="margin-top:8px; font-size:14px; font-weight:700; color:#333;">{enlace["titulo"]}</div></div>', unsafe_allow_html=True)
+    INSIGNIAS[clave] = st.empty()
+    if margen_inferior:
+        st.markdown('<div style="margin-bottom: 15px;"></div>', unsafe_allow_html=True)
+
+def mosaico_pagina(icono, pagina, etiqueta, margen_inferior=True):
+    # Herramientas de esta misma aplicación (ver sct.py): se abren como página,
+    # sin recargar el navegador ni despertar otra aplicación
+    img_bytes = img_to_bytes(icono)
+    st.markdown(f'<div style="text-align: center;"><img src="data:image/png;base64,{img_bytes}" style="width:100px; height:100px;border-radius:8px; box-shadow:2px 2px 6px rgba(0,0,0,0.3);"></div>', unsafe_allow_html=True)
+    st.page_link(pagina, label=etiqueta)
+    if margen_inferior:
+        st.markdown('<div style="margin-bottom: 15px;"></div>', unsafe_allow_html=True)
+
+def enlace_pagina(pagina, etiqueta, icono):
+    # Páginas sin mosaico propio; igual que mosaico_pagina, solo existen bajo sct.py
+    try:
+        st.page_link(pagina, label=etiqueta, icon=icono)
+    except:
+        st.error(f"No se pudo cargar el enlace {etiqueta}")
+
+# =========================
+# BOTONES/IMÁGENES PRINCIPALES
+# =========================
+col1, col2, col3, col4, col5 = st.columns(5)
+
+# --- Columna 1
+with col1:
+    st.markdown("""<div style='text-align: center; font-size:18px; font-weight:bold; color:#0F69B4; margin-bottom:12px'>
+                Coordinación Territorial
+                </div>""", 
+                unsafe_allow_html=True
+                )
+    try:
+        mosaico_enlace("Gestión_Archivos.png", "compromisos_oct")
+    except:
+        st.error("No se pudo cargar la imagen Gestión_Archivos.png")
+
+    try:
+        mosaico_enlace("Gestión_regional.png", "seguimiento_regional", margen_inferior=False)
+    except:
+        st.error("No se pudo cargar la imagen Gestión_regional.png")
+
+# --- Columna 2
+with col2:
+    st.markdown("""<div style='text-align: center; font-size:18px; font-weight:bold; color:#0F69B4; margin-bottom: 12px;'>Portales ISL</div>""", unsafe_allow_html=True)
+    try:
+        mosaico_enlace("PortalGestiona.png", "portal_gestiona")
+    except:
+        st.error("No se pudo cargar la imagen PortalGestiona.png")
+
+    try:
+        mosaico_enlace("controlygestionat.png", "control_gestion_at", margen_inferior=False)
+    except:
+        st.error("No se pudo cargar la imagen controlygestionat.png")
+
+# --- Columna 3
+with col3:
+    st.markdown("""<div style='text-align: center; font-size:18px; font-weight:bold; color:#0F69B4; margin-bottom: 12px;'>Control de Indicadores</div>""", unsafe_allow_html=True)
+    
+    # Botón 1: Indicadores Prevención
+    try:
+        mosaico_pagina("IndicadoresPrevencion.png", "indicadores_prevencion.py", "Indicadores Prevención")
+    except Exception as e:
+        st.error(f"No se pudo cargar el botón Indicadores Prevención: {e}")
+
+    # Botón 2: Accidentes
+    try:
+        mosaico_pagina("EstadisticasAccidentes.png", "accidentes.py", "Estadísticas de Accidentes",
+                       margen_inferior=False)
+    except Exception as e:
+        st.error(f"No se pudo cargar el botón Accidentes: {e}")
+
+# --- Columna 4
+with col4:
+    st.markdown("""<div style='text-align: center; font-size:18px; font-weight:bold; color:#0F69B4; margin-bottom: 12px;'>Continuidad Operacional</div>""", unsafe_allow_html=True)
+    try:
+        mosaico_pagina("Vacaciones_feriados.png", "vacaciones_feriados.py", "Vacaciones/Feriados")
+    except:
+        st.error("No se pudo cargar la imagen vacaciones_feriados.png")
+    try:
+        mosaico_pagina("Control-Paro.png", "Tabla_Paro.py", "Control/Movilización")
+    except:
+        st.error("No se pudo cargar la imagen Control-Paro.png")
+    try:
+        mosaico_pagina("Control-Emergencias.png", "Tabla_emergencias.py", "Control/Emergencias", margen_inferior=False)
+    except:
+        st.error("No se pudo cargar la imagen Control-Emergencias.png")
+    enlace_pagina("emergencias_linea_tiempo.py", "Línea de Tiempo Emergencias", "🕒")
+
+# --- Columna 5
+with col5:
+    st.markdown("""<div style='text-align: center; font-size:18px; font-weight:bold; color:#0F69B4; margin-bottom: 12px;'>Otros</div>""", unsafe_allow_html=True)
+    try:
+        mosaico_pagina("Contactos.png", "contactos_app.py", "Contactos")
+    except:
+        st.error("No se pudo cargar la imagen Contactos.png")
+    try:
+        mosaico_pagina("preguntas.png", "preguntas.py", "Preguntas Frecuentes", margen_inferior=False)
+    except:
+        st.error("No se pudo cargar la imagen preguntas.png")
+
+# Espaciado adicional
+st.markdown("<br><br>", unsafe_allow_html=True)
+
+# El menú oculta la barra lateral: las páginas de administración (ver sct.py)
+# se alcanzan desde aquí
+with st.expander("Administración"):
+    enlace_pagina("tiempos_arranque.py", "Tiempos de arranque", "⏱️")
+    enlace_pagina("consultas_sql.py", "Consultas SQL", "🗄️")
+
+# =========================
+# ESTADO DE LOS ENLACES EXTERNOS
+# =========================
+# Se consulta después de dibujar los mosaicos: el menú aparece de inmediato y las
+# insignias se completan cuando responde el sondeo (a lo más TIMEOUT_SONDEO s,
+# porque todos los enlaces se consultan a la vez). El resultado queda en caché TTL_SONDEO s.
+estados = estado_enlaces(tuple(enlace["url"] for enlace in ENLACES.values()))
+for clave, lugar in INSIGNIAS.items():
+    lugar.markdown(f"<div style='text-align: center; font-size:12px; color:#555;'>"
+                   f"{insignia(estados.get(ENLACES[clave]['url']))}</div>", unsafe_allow_html=True)
+
+with st.expander("Estado de los enlaces externos"):
+    filas = ["| Enlace | Estado | Latencia | Detalle |", "|---|---|---|---|"]
+    for enlace in ENLACES.values():
+        resultado = estados[enlace["url"]]
+        latencia = f"{resultado['latencia_ms']} ms" if resultado["estado"] == ARRIBA else "-"
+        filas.append(f"| {enlace['titulo']} | {resultado['estado']} | {latencia} | {resultado['detalle']} |")
+    st.markdown("\n".join(filas))
+    momento = min(r["momento"] for r in estados.values())
+    st.caption(f"Comprobado a las {time.strftime('%H:%M:%S', time.localtime(momento))}; "
+               f"cada enlace tiene {TIMEOUT_SONDEO:g} s para responder.")
+    if st.button("Volver a comprobar", key="enlaces_comprobar"):
+        estado_enlaces.clear()
+        st.rerun()
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
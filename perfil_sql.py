@@ -0,0 +1,227 @@
+# perfil_sql.py
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+
+from arranque import pagina_actual
+
+# =========================
+# REGISTRO DE SENTENCIAS SQL
+# =========================
+# Todas las conexiones del pool (base_datos.py) son ConexionMedida. Mientras el
+# registro está activo, cada sentencia queda en un buffer circular de las
+# últimas TAMANO_REGISTRO, con su texto, la cantidad de parámetros, las filas
+# afectadas (o leídas, en un SELECT), el tiempo y la página que la ejecutó.
+# El tiempo de un SELECT incluye la lectura de sus filas (fetch*), porque
+# SQLite avanza la consulta a medida que se piden filas.
+# Las sentencias que superan UMBRAL_LENTA_MS guardan su EXPLAIN QUERY PLAN.
+#
+# Se activa con la variable de entorno SCT_PERFIL_SQL=1 o desde la página
+# "Consultas SQL" (consultas_sql.py). Inactivo, cada sentencia solo paga una
+# comprobación antes de ir al método original de sqlite3.
+TAMANO_REGISTRO = 5000
+UMBRAL_LENTA_MS = float(os.environ.get("SCT_PERFIL_SQL_UMBRAL_MS", 100))
+EXPLICABLES = ("select", "insert", "update", "delete", "replace", "with")
+
+_lock = threading.Lock()
+_registro = deque(maxlen=TAMANO_REGISTRO)
+_planes = {}
+_estado = {"activo": os.environ.get("SCT_PERFIL_SQL", "") not in ("", "0")}
+
+def activo():
+    return _estado["activo"]
+
+def activar(valor=True):
+    _estado["activo"] = bool(valor)
+
+def vaciar():
+    with _lock:
+        _registro.clear()
+        _planes.clear()
+
+def normalizar_sql(sql):
+    # Una línea, sin espacios repetidos y con las listas "IN (?, ?, ?...)" de
+    # largo variable reducidas a una sola, para agrupar la misma sentencia
+    texto = re.sub(r"\s+", " ", sql).strip()
+    return re.sub(r"\bIN \(\?(?:\s*,\s*\?)+\)", "IN (?, …)", texto, flags=re.IGNORECASE)
+
+def _explicar(conexion, sql, parametros):
+    # Plan de la sentencia (una vez por texto); None si no se puede explicar
+    clave = normalizar_sql(sql)
+    if clave in _planes:
+        return _planes[clave]
+    plan = None
+    if sql.lstrip().lower().startswith(EXPLICABLES):
+        try:
+            filas = sqlite3.Cursor(conexion).execute(f"EXPLAIN QUERY PLAN {sql}", parametros).fetchall()
+            plan = "\n".join(f"{'  ' * min(fila[1], 8)}{fila[3]}" for fila in filas)
+        except sqlite3.Error as e:
+            plan = f"(sin plan: {e})"
+    _planes[clave] = plan
+    return plan
+
+# =========================
+# CONEXIÓN Y CURSOR MEDIDOS
+# =========================
+class CursorMedido(sqlite3.Cursor):
+    _actual = None  # entrada del registro de la última sentencia de este cursor
+
+    def _registrar(self, sql, parametros, n_parametros, conjuntos, inicio):
+        entrada = {
+            "momento": time.time(),
+            "base": self.connection.base,
+            "pagina": pagina_actual(),
+            "sql": sql,
+            "parametros": n_parametros,
+            "conjuntos": conjuntos,
+            "filas": self.rowcount if self.rowcount >= 0 else 0,
+            "ms": (time.perf_counter() - inicio) * 1000,
+            "plan": None,
+        }
+        self._actual = (entrada, parametros)
+        self._revisar_lenta()
+        with _lock:
+            _registro.append(entrada)
+
+    def _revisar_lenta(self):
+        entrada, parametros = self._actual
+        if entrada["plan"] is None and entrada["ms"] >= UMBRAL_LENTA_MS:
+            entrada["plan"] = _explicar(self.connection, entrada["sql"], parametros) or ""
+
+    def _sumar_lectura(self, inicio, filas):
+        if self._actual is not None:
+            self._actual[0]["ms"] += (time.perf_counter() - inicio) * 1000
+            self._actual[0]["filas"] += filas
+            self._revisar_lenta()
+
+    def execute(self, sql, parametros=()):
+        if not _estado["activo"]:
+            self._actual = None
+            return super().execute(sql, parametros)
+        inicio = time.perf_counter()
+        super().execute(sql, parametros)
+        self._registrar(sql, parametros, len(parametros), 1, inicio)
+        return self
+
+    def executemany(self, sql, conjuntos):
+        if not _estado["activo"]:
+            self._actual = None
+            return super().executemany(sql, conjuntos)
+        conjuntos = list(conjuntos)
+        inicio = time.perf_counter()
+        super().executemany(sql, conjuntos)
+        primero = conjuntos[0] if conjuntos else ()
+        self._registrar(sql, primero, len(primero) * len(conjuntos), len(conjuntos), inicio)
+        return self
+
+    def executescript(self, script):
+        if not _estado["activo"]:
+            self._actual = None
+            return super().executescript(script)
+        inicio = time.perf_counter()
+        super().executescript(script)
+        self._registrar(script, (), 0, 1, inicio)
+        self._actual = None
+        return self
+
+    def fetchone(self):
+        if self._actual is None:
+            return super().fetchone()
+        inicio = time.perf_counter()
+        fila = super().fetchone()
+        self._sumar_lectura(inicio, fila is not None)
+        return fila
+
+    def fetchmany(self, size=None):
+        if self._actual is None:
+            return super().fetchmany(self.arraysize if size is None else size)
+        inicio = time.perf_counter()
+        filas = super().fetchmany(self.arraysize if size is None else size)
+        self._sumar_lectura(inicio, len(filas))
+        return filas
+
+    def fetchall(self):
+        if self._actual is None:
+            return super().fetchall()
+        inicio = time.perf_counter()
+        filas = super().fetchall()
+        self._sumar_lectura(inicio, len(filas))
+        return filas
+
+    def __next__(self):
+        if self._actual is None:
+            return super().__next__()
+        inicio = time.perf_counter()
+        try:
+            fila = super().__next__()
+        except StopIteration:
+            self._sumar_lectura(inicio, 0)
+            raise
+        self._sumar_lectura(inicio, 1)
+        return fila
+
+class ConexionMedida(sqlite3.Connection):
+    # sqlite3.connect(..., factory=ConexionMedida). Los atajos execute* de la
+    # conexión crean su cursor en C, así que se redirigen a cursor() para medirlos.
+    def __init__(self, database, *args, **kwargs):
+        super().__init__(database, *args, **kwargs)
+        self.base = os.path.basename(str(database))
+
+    def cursor(self, factory=CursorMedido):
+        return super().cursor(factory)
+
+    def execute(self, sql, parametros=()):
+        return self.cursor().execute(sql, parametros)
+
+    def executemany(self, sql, conjuntos):
+        return self.cursor().executemany(sql, conjuntos)
+
+    def executescript(self, script):
+        return self.cursor().executescript(script)
+
+# =========================
+# RESUMEN
+# =========================
+def registro():
+    # Copia de las entradas del buffer, de la más antigua a la más reciente
+    with _lock:
+        return [dict(e) for e in _registro]
+
+def resumen_sentencias():
+    # Una fila por sentencia (texto normalizado y base), lista para un DataFrame
+    grupos = {}
+    for entrada in registro():
+        clave = (entrada["base"], normalizar_sql(entrada["sql"]))
+        grupo = grupos.get(clave)
+        if grupo is None:
+            grupo = grupos[clave] = {
+                "base": entrada["base"],
+                "sentencia": clave[1],
+                "llamadas": 0,
+                "total_ms": 0.0,
+                "max_ms": 0.0,
+                "filas": 0,
+                "parametros": 0,
+                "lentas": 0,
+                "paginas": set(),
+                "plan": None,
+            }
+        grupo["llamadas"] += 1
+        grupo["total_ms"] += entrada["ms"]
+        grupo["max_ms"] = max(grupo["max_ms"], entrada["ms"])
+        grupo["filas"] += entrada["filas"]
+        grupo["parametros"] += entrada["parametros"]
+        if entrada["plan"] is not None:
+            grupo["lentas"] += 1
+            grupo["plan"] = entrada["plan"]
+        if entrada["pagina"]:
+            grupo["paginas"].add(entrada["pagina"])
+    filas = []
+    for grupo in grupos.values():
+        grupo["media_ms"] = grupo["total_ms"] / grupo["llamadas"]
+        grupo["paginas"] = ", ".join(sorted(grupo["paginas"]))
+        filas.append(grupo)
+    return sorted(filas, key=lambda g: g["total_ms"], reverse=True)
@@ -1,6 +1,6 @@
 import streamlit as st 
-import pandas as pd
-import base64
+from buscador_preguntas import MARCA_FIN, MARCA_INICIO, asegurar_indice, buscar
+from recursos import ALTO_LOGO, imagen_data_uri
 
 # =========================
 # CONFIGURACIÓN DE PÁGINA
@@ -15,13 +15,8 @@ IMAGEN_LOCAL = "LOGO-PROPIO-ISL-2023-CMYK-01.png"
 TITULO = "Preguntas Frecuentes"
 SUBTITULO = "Sección de Coordinación Territorial"
 
-def image_to_base64(path):
-    with open(path, "rb") as img_file:
-        return base64.b64encode(img_file.read()).decode()
-
 try:
-    img_base64 = image_to_base64(IMAGEN_LOCAL)
-    img_src = f"data:image/png;base64,{img_base64}"
+    img_src = imagen_data_uri(IMAGEN_LOCAL, ALTO_LOGO)
 except FileNotFoundError:
     st.error("❌ No se encontró el logo. Asegúrate de tener el archivo 'LOGO-PROPIO-ISL-2023-CMYK-01.png' en la misma carpeta.")
     img_src = ""
@@ -86,6 +81,16 @@ h1 {
     font-size: 14px;
     margin: 4px 0 12px 12px;
 }
+.respuesta mark, .fragmento mark {
+    background-color: #DDEFFB;
+    color: inherit;
+    padding: 0 1px;
+}
+.fragmento {
+    color: #555555;
+    font-size: 13px;
+    margin: -8px 0 14px 12px;
+}
 .custom-warning {
     color: #0F69B4;
     background-color: #E8F4FB;
@@ -99,26 +104,18 @@ h1 {
 """, unsafe_allow_html=True)
 
 # =========================
-# CARGAR ARCHIVO EXCEL AUTOMÁTICAMENTE
+# CARGAR ARCHIVO EXCEL (ÍNDICE FTS5, solo se reconstruye si cambia el archivo)
 # =========================
 try:
-    df = pd.read_excel("preguntas.xlsx")
-
     # Validar columnas
-    if "Pregunta" not in df.columns or "Respuesta" not in df.columns:
+    if not asegurar_indice("preguntas.xlsx"):
         st.error("⚠️ El archivo debe tener dos columnas llamadas 'Pregunta' y 'Respuesta'")
     else:
         # =========================
         # BUSCADOR
         # =========================
         busqueda = st.text_input("🔎 Buscar en las preguntas", "")
-        if busqueda:
-            df_filtrado = df[
-                df["Pregunta"].str.contains(busqueda, case=False, na=False) |
-                df["Respuesta"].str.contains(busqueda, case=False, na=False)
-            ]
-        else:
-            df_filtrado = df
+        resultados = buscar(busqueda)
 
         # =========================
         # MOSTRAR RESULTADOS
@@ -126,12 +123,18 @@ try:
         placeholder = st.container()  # Contenedor dinámico
 
         with placeholder:
-            if df_filtrado.empty:
+            if not resultados:
                 st.markdown("<div class='custom-warning'>⚠️ No se encontraron resultados para la búsqueda.</div>", unsafe_allow_html=True)
             else:
-                for i, row in df_filtrado.iterrows():
-                    with st.expander(f"❓ {row['Pregunta']}", expanded=False):
-                        st.markdown(f"<div class='respuesta'>{row['Respuesta']}</div>", unsafe_allow_html=True)
+                for row in resultados:
+                    # Las etiquetas del expander no aceptan HTML: el resaltado va en negrita
+                    pregunta = row.PreguntaResaltada.replace(MARCA_INICIO, "**").replace(MARCA_FIN, "**")
+                    with st.expander(f"❓ {pregunta}", expanded=False):
+                        st.markdown(f"<div class='respuesta'>{row.RespuestaResaltada}</div>", unsafe_allow_html=True)
+                    # Vista previa con la expansión cerrada: el fragmento de la respuesta donde
+                    # aparecen los términos buscados (vacío cuando no hay búsqueda)
+                    if row.Fragmento:
+                        st.markdown(f"<div class='fragmento'>{row.Fragmento}</div>", unsafe_allow_html=True)
 
 except FileNotFoundError:
     st.error("❌ No se encontró el archivo 'preguntas.xlsx' en la misma carpeta que la aplicación.")
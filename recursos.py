@@ -0,0 +1,71 @@
+# recursos.py
+import base64
+import os
+
+import streamlit as st
+
+# =========================
+# IMÁGENES COMPARTIDAS
+# =========================
+# Cada imagen se lee y codifica una sola vez por proceso; la clave incluye la
+# fecha de modificación, así que reemplazar un archivo invalida su versión en caché.
+LOGO = "LOGO-PROPIO-ISL-2023-CMYK-01.png"
+ICONOS_MENU = [
+    "Gestión_Archivos.png", "Gestión_regional.png",
+    "PortalGestiona.png", "controlygestionat.png",
+    "IndicadoresPrevencion.png", "EstadisticasAccidentes.png",
+    "Vacaciones_feriados.png", "Control-Paro.png", "Control-Emergencias.png",
+    "Contactos.png", "preguntas.png",
+]
+
+# Tamaños en los que realmente se muestran (px)
+TAMANO_ICONO = 100
+ALTO_LOGO = 60
+
+CARPETA_ICONOS = "iconos"
+
+def ruta_optimizada(path, tamano):
+    nombre = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(CARPETA_ICONOS, f"{nombre}_{tamano}.png")
+
+@st.cache_resource(show_spinner=False)
+def _codificar(path, mtime):
+    with open(path, "rb") as img_file:
+        return base64.b64encode(img_file.read()).decode()
+
+def imagen_base64(path, tamano=None):
+    # Si existe la versión reducida (ver generar_iconos) se usa esa.
+    # Lanza FileNotFoundError igual que open() si la imagen no existe.
+    if tamano is not None:
+        optimizada = ruta_optimizada(path, tamano)
+        if os.path.exists(optimizada):
+            path = optimizada
+    return _codificar(path, os.path.getmtime(path))
+
+def imagen_data_uri(path, tamano=None):
+    return f"data:image/png;base64,{imagen_base64(path, tamano)}"
+
+# =========================
+# GENERACIÓN DE ICONOS (python recursos.py)
+# =========================
+def _reducir(origen, destino, ancho, alto):
+    from PIL import Image
+
+    with Image.open(origen) as imagen:
+        imagen.thumbnail((ancho, alto), Image.LANCZOS)
+        imagen.save(destino, format="PNG", optimize=True)
+
+def generar_iconos():
+    os.makedirs(CARPETA_ICONOS, exist_ok=True)
+    for icono in ICONOS_MENU:
+        if os.path.exists(icono):
+            _reducir(icono, ruta_optimizada(icono, TAMANO_ICONO), TAMANO_ICONO, TAMANO_ICONO)
+    if os.path.exists(LOGO):
+        # El logo se muestra por alto; el ancho queda proporcional
+        _reducir(LOGO, ruta_optimizada(LOGO, ALTO_LOGO), ALTO_LOGO * 10, ALTO_LOGO)
+
+    for archivo in sorted(os.listdir(CARPETA_ICONOS)):
+        print(f"{archivo}: {os.path.getsize(os.path.join(CARPETA_ICONOS, archivo))} bytes")
+
+if __name__ == "__main__":
+    generar_iconos()
@@ -1,254 +1,45 @@
-import streamlit as st 
-from pathlib import Path
-import base64
-
-# =========================
-# CONFIGURACIÓN DEL ENCABEZADO
-# =========================
-COLOR_FONDO = "#0F69B4"  # Azul
-IMAGEN_LOCAL = "LOGO-PROPIO-ISL-2023-CMYK-01.png"
-TITULO = "SECCIÓN DE COORDINACIÓN TERRITORIAL"
-SUBTITULO = "Sección de Coordinación Territorial"
-
-# =========================
-# CONVERTIR IMAGEN LOCAL A BASE64
-# =========================
-def image_to_base64(path):
-    with open(path, "rb") as img_file:
-        return base64.b64encode(img_file.read()).decode()
-
-# Cargar imagen del encabezado
-try:
-    img_base64 = image_to_base64(IMAGEN_LOCAL)
-    img_src = f"data:image/png;base64,{img_base64}"
-except:
-    img_src = ""
-
-# =========================
-# CSS + HTML DEL ENCABEZADO Y NUEVO CONTENEDOR
-# =========================
-header_html = f"""
-    <style>
-        .header-container {{
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            background-color: {COLOR_FONDO};
-            height: 85px;
-            width: 100%;
-            color: white;
-            position: relative;
-            margin: -1rem -1rem 1.2rem -1rem;
-        }}
-        .header-logo {{
-            position: absolute;
-            left: 20px;
-            top: 5px;
-        }}
-        .header-logo img {{
-            height: 60px;
-        }}
-        .header-subtitle {{
-            position: absolute;
-            bottom: 5px;
-            left: 20px;
-            font-size: 10px;
-        }}
-        .header-title {{
-            font-size: 20px;
-            font-weight: bold;
-        }}
-        .quienes-somos {{
-            background-color: #ffffff;
-            width: 100%;
-            height: 100px;
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            font-size: 18px;
-            color: #333;
-            margin-bottom: 30px;
-        }}
-        .separador {{
-            width: 100%;
-            border: 0;
-            height: 2px;
-            background-color: #ccc;
-            margin-bottom: 30px;
-        }}
-    </style>
-    <div class="header-container">
-        <div class="header-logo">
-            <img src="{img_src}" alt="Logo">
-        </div>
-        <div class="header-subtitle">{SUBTITULO}</div>
-        <div class="header-title">{TITULO}</div>
-    </div>
-    <div class="quienes-somos">
-        <div style="margin-top:8px; font-size:18px; font-weight:500; color:#333;">La Sección de Coordinación Territorial (SCT) tiene como función la supervisión funcional de las Direcciones Regionales del ISL,
-        coordinando acciones con diferentes áreas a nivel central y regional para el cumplimiento de objetivos y metas del Servicio.
-    </div></div>
-    <hr class="separador">
-"""
-st.set_page_config(page_title="Menú principal", layout="wide", initial_sidebar_state="collapsed")
-st.markdown(
-    """
-    <style>
-    .css-1d391kg {display: none}
-    section[data-testid="stSidebar"] {display: none !important;}
-    button[data-testid="baseButton-header"] {display: none;}
-    </style>
-    """,
-    unsafe_allow_html=True
-)
-st.markdown(header_html, unsafe_allow_html=True)
-
-# =========================
-# FUNCIÓN PARA IMÁGENES DE BOTONES
-# =========================
-def img_to_bytes(img_path):
-    img_bytes = Path(img_path).read_bytes()
-    encoded = base64.b64encode(img_bytes).decode()
-    return encoded
-
-# =========================
-# BOTONES/IMÁGENES PRINCIPALES
-# =========================
-col1, col2, col3, col4, col5 = st.columns(5)
-
-# --- Columna 1
-with col1:
-    st.markdown("""<div style='text-align: center; font-size:18px; font-weight:bold; color:#0F69B4; margin-bottom:12px'>
-                Coordinación Territorial
-                </div>""", 
-                unsafe_allow_html=True
-                )
-    try:
-        img_bytes = img_to_bytes("Gestión_Archivos.png")
-        st.markdown(f'<div style="text-align: center; margin-bottom: 15px;">'
-                    f'<a href="https://gestor-tareas-isl-oct.streamlit.app" target="_blank">'
-                    f'<img src="data:image/png;base64,{img_bytes}" style="width:100px; height:100px; '
-                    f'border-radius:8px; box-shadow:2px 2px 6px rgba(0,0,0,0.3);">'
-                    f'</a>'
-                    f'<div style="margin-top:8px; font-size:14px; font-weight:700; color:#333;">Compromisos OCT</div>'
-                    f'</div>', 
-                    unsafe_allow_html=True
-                    )
-    except:
-        st.error("No se pudo cargar la imagen Gestión_Archivos.png")
-
-    try:
-        img_bytes = img_to_bytes("Gestión_regional.png")
-        st.markdown(f'<div style="text-align: center;"><a href="https://cuadernoreunionesregionales-oct.streamlit.app/" target="_blank"><img src="data:image/png;base64,{img_bytes}" style="width:100px; height:100px;border-radius:8px; box-shadow:2px 2px 6px rgba(0,0,0,0.3);"></a><div style="margin-top:8px; font-size:14px; font-weight:700; color:#333;">Seguimiento Regional</div></div>', unsafe_allow_html=True)
-    except:
-        st.error("No se pudo cargar la imagen Gestión_regional.png")
-
-# --- Columna 2
-with col2:
-    st.markdown("""<div style='text-align: center; font-size:18px; font-weight:bold; color:#0F69B4; margin-bottom: 12px;'>Portales ISL</div>""", unsafe_allow_html=True)
-    try:
-        img_bytes = img_to_bytes("PortalGestiona.png")
-        st.markdown(f'<div style="text-align: center; margin-bottom: 15px;"><a href="https://sites.google.com/isl.gob.cl/portalgestionadege/" target="_blank"><img src="data:image/png;base64,{img_bytes}" style="width:100px; height:100px;border-radius:8px; box-shadow:2px 2px 6px rgba(0,0,0,0.3);"></a><div style="margin-top:8px; font-size:14px; font-weight:700; color:#333;">Portal Gestiona (DEGE)</div></div>', unsafe_allow_html=True)
-    except:
-        st.error("No se pudo cargar la imagen PortalGestiona.png")
-
-    try:
-        img_bytes = img_to_bytes("controlygestionat.png")
-        st.markdown(f'<div style="text-align: center;"><a href="https://sites.google.com/isl.gob.cl/seguimiento-at/inicio" target="_blank"><img src="data:image/png;base64,{img_bytes}" style="width:100px; height:100px;border-radius:8px; box-shadow:2px 2px 6px rgba(0,0,0,0.3);"></a><div style="margin-top:8px; font-size:14px; font-weight:700; color:#333;">Control y Gestión AT</div></div>', unsafe_allow_html=True)
-    except:
-        st.error("No se pudo cargar la imagen controlygestionat.png")
-
-# --- Columna 3 (Excel en OneDrive)
-with col3:
-    st.markdown("""<div style='text-align: center; font-size:18px; font-weight:bold; color:#0F69B4; margin-bottom: 12px;'>Control de Indicadores</div>""", unsafe_allow_html=True)
-    
-    # Botón 1: Indicadores Prevención
-    try:
-        img_bytes = img_to_bytes("IndicadoresPrevencion.png")
-        enlace_excel1 = "https://app.powerbi.com/view?r=eyJrIjoiYjFkZWViYTQtZDNhYS00YTdmLWFhZTgtMjA3Y2I4ZDc1MjE0IiwidCI6ImI0Y2I2MzQ2LTI4N2MtNDFkMS1hNTRkLTg3YjQ1ZDUwNDYzYiJ9"
-        st.markdown(f"""<div style="text-align: center; margin-bottom: 15px;">
-                <a href="{enlace_excel1}" target="_blank">
-                    <img src="data:image/png;base64,{img_bytes}" style="width:100px; height:100px;border-radius:8px; box-shadow:2px 2px 6px rgba(0,0,0,0.3);">
-                </a>
-                <div style="margin-top:8px; font-size:14px; font-weight:700; color:#333;">Indicadores Prevención</div>
-            </div>""", unsafe_allow_html=True)
-    except Exception as e:
-        st.error(f"No se pudo cargar el botón Indicadores Prevención: {e}")
-
-    # Botón 2: Accidentes
-    try:
-        img_bytes = img_to_bytes("EstadisticasAccidentes.png")
-        enlace_excel2 = "https://app.powerbi.com/view?r=eyJrIjoiZTk2MmY0YjQtMWUyNS00Njk2LTg1YjktZDYwNGQ1Y2Q0Y2YxIiwidCI6ImI0Y2I2MzQ2LTI4N2MtNDFkMS1hNTRkLTg3YjQ1ZDUwNDYzYiJ9"
-        st.markdown(f"""<div style="text-align: center;">
-                <a href="{enlace_excel2}" target="_blank">
-                    <img src="data:image/png;base64,{img_bytes}" style="width:100px; height:100px;border-radius:8px; box-shadow:2px 2px 6px rgba(0,0,0,0.3);">
-                </a>
-                <div style="margin-top:8px; font-size:14px; font-weight:700; color:#333;">Accidentes</div>
-            </div>""", unsafe_allow_html=True)
-    except Exception as e:
-        st.error(f"No se pudo cargar el botón Accidentes: {e}")
-
-# --- Columna 4
-with col4:
-    st.markdown("""<div style='text-align: center; font-size:18px; font-weight:bold; color:#0F69B4; margin-bottom: 12px;'>Continuidad Operacional</div>""", unsafe_allow_html=True)
-    try:
-        img_bytes = img_to_bytes("Vacaciones_feriados.png")
-        st.markdown(f'<div style="text-align: center; margin-bottom: 15px;"><a href="https://sct-vacaciones-feriados.streamlit.app/" target="_blank"><img src="data:image/png;base64,{img_bytes}" style="width:100px; height:100px;border-radius:8px; box-shadow:2px 2px 6px rgba(0,0,0,0.3);"></a><div style="margin-top:8px; font-size:14px; font-weight:700; color:#333;">Vacaciones/Feriados</div></div>', unsafe_allow_html=True)
-    except:
-        st.error("No se pudo cargar la imagen vacaciones_feriados.png")
-    try:
-        img_bytes = img_to_bytes("Control-Paro.png")
-        st.markdown(f'<div style="text-align: center; margin-bottom: 15px;"><a href="https://sct-planilla2.streamlit.app/" target="_blank"><img src="data:image/png;base64,{img_bytes}" style="width:100px; height:100px;border-radius:8px; box-shadow:2px 2px 6px rgba(0,0,0,0.3);"></a><div style="margin-top:8px; font-size:14px; font-weight:700; color:#333;">Control/Movilización</div></div>', unsafe_allow_html=True)
-    except:
-        st.error("No se pudo cargar la imagen Control-Paro.png")
-    try:
-        img_bytes = img_to_bytes("Control-Emergencias.png")
-        st.markdown(f'<div style="text-align: center;"><a href="https://sct-planilla3.streamlit.app/" target="_blank"><img src="data:image/png;base64,{img_bytes}" style="width:100px; height:100px;border-radius:8px; box-shadow:2px 2px 6px rgba(0,0,0,0.3);"></a><div style="margin-top:8px; font-size:14px; font-weight:700; color:#333;">Control/Emergencias</div></div>', unsafe_allow_html=True)
-    except:
-        st.error("No se pudo cargar la imagen Control-Emergencias.png")
-
-# --- Columna 5
-with col5:
-    st.markdown("""<div style='text-align: center; font-size:18px; font-weight:bold; color:#0F69B4; margin-bottom: 12px;'>Otros</div>""", unsafe_allow_html=True)
-    try:
-        img_bytes = img_to_bytes("Contactos.png")
-        st.markdown(f'<div style="text-align: center; margin-bottom: 15px;"><a href="https://sct-contactos.streamlit.app/" target="_blank"><img src="data:image/png;base64,{img_bytes}" style="width:100px; height:100px;border-radius:8px; box-shadow:2px 2px 6px rgba(0,0,0,0.3);"></a><div style="margin-top:8px; font-size:14px; font-weight:700; color:#333;">Contactos</div></div>', unsafe_allow_html=True)
-    except:
-        st.error("No se pudo cargar la imagen Contactos.png")
-    try:
-        img_bytes = img_to_bytes("preguntas.png")
-        st.markdown(f'<div style="text-align: center;"><a href="https://sct-preguntas.streamlit.app/" target="_blank"><img src="data:image/png;base64,{img_bytes}" style="width:100px; height:100px;border-radius:8px; box-shadow:2px 2px 6px rgba(0,0,0,0.3);"></a><div style="margin-top:8px; font-size:14px; font-weight:700; color:#333;">Preguntas Frecuentes</div></div>', unsafe_allow_html=True)
-    except:
-        st.error("No se pudo cargar la imagen preguntas.png")
-
-# Espaciado adicional
-st.markdown("<br><br>", unsafe_allow_html=True)
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
+import streamlit as st
+
+from arranque import instalar_medidor, medir_pagina
+
+# Desde aquí cada import queda registrado con su tiempo (página "Tiempos de arranque")
+instalar_medidor()
+
+# =========================
+# APLICACIÓN MULTIPÁGINA
+# =========================
+# sct.py es el único punto de entrada (streamlit run sct.py). Cada herramienta
+# es una página del mismo proceso, así que todas comparten el pool de
+# conexiones (base_datos.py), las imágenes en caché (recursos.py) y las cachés
+# de datos de st.cache_data / st.cache_resource. En cada visita solo se ejecuta
+# el script de la página abierta: sus imports (pandas, openpyxl) se pagan la
+# primera vez que alguien la abre y después quedan cargados en el proceso.
+# Los scripts de cada página siguen funcionando por separado con streamlit run.
+PAGINAS = {
+    "": [
+        st.Page("menu_principal.py", title="Menú principal", icon="🏠", default=True),
+    ],
+    "Continuidad Operacional": [
+        st.Page("vacaciones_feriados.py", title="Vacaciones/Feriados", icon="📅", url_path="vacaciones"),
+        st.Page("Tabla_Paro.py", title="Control/Movilización", icon="📊", url_path="movilizacion"),
+        st.Page("Tabla_emergencias.py", title="Control/Emergencias", icon="📊", url_path="emergencias"),
+        st.Page("emergencias_linea_tiempo.py", title="Línea de Tiempo Emergencias", icon="🕒",
+                url_path="emergencias_linea_tiempo"),
+    ],
+    "Control de Indicadores": [
+        st.Page("indicadores_prevencion.py", title="Indicadores Prevención", icon="📊", url_path="indicadores"),
+        st.Page("accidentes.py", title="Estadísticas de Accidentes", icon="📊", url_path="accidentes"),
+    ],
+    "Otros": [
+        st.Page("contactos_app.py", title="Contactos", icon="📇", url_path="contactos"),
+        st.Page("preguntas.py", title="Preguntas Frecuentes", icon="❓", url_path="preguntas"),
+    ],
+    "Administración": [
+        st.Page("tiempos_arranque.py", title="Tiempos de arranque", icon="⏱️", url_path="tiempos_arranque"),
+        st.Page("consultas_sql.py", title="Consultas SQL", icon="🗄️", url_path="consultas_sql"),
+    ],
+}
+
+pagina = st.navigation(PAGINAS)
+with medir_pagina(pagina.title):
+    pagina.run()
@@ -0,0 +1,19 @@
+# tests/conftest.py
+import os
+import sys
+
+import pytest
+
+# Los módulos de la app están en la raíz del repositorio
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+@pytest.fixture
+def base_temporal(tmp_path, monkeypatch):
+    # Ruta absoluta de una base nueva: el pool (base_datos.obtener_pool) se
+    # guarda por archivo, así cada prueba tiene el suyo
+    def crear(modulo, nombre, atributo="DB_FILE"):
+        ruta = str(tmp_path / nombre)
+        monkeypatch.setattr(modulo, atributo, ruta)
+        return ruta
+    return crear
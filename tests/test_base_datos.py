@@ -0,0 +1,48 @@
+# tests/test_base_datos.py
+import sqlite3
+
+import pandas as pd
+
+from base_datos import upsert_filas_fijas
+
+COLUMNAS = ["Region", "Adhesion", "Observaciones"]
+
+def _tabla(filas):
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE regiones (Region TEXT PRIMARY KEY, Adhesion REAL, Observaciones TEXT)")
+    conn.executemany("INSERT INTO regiones VALUES (?, ?, ?)", filas)
+    return conn
+
+def _leer(conn):
+    return {fila[0]: fila[1:] for fila in conn.execute("SELECT * FROM regiones")}
+
+def test_con_base_solo_escribe_las_celdas_editadas():
+    cargada = pd.DataFrame([("Maule", 10.0, "a"), ("Ñuble", 20.0, "b")], columns=COLUMNAS)
+    # Otro cliente guardó después de la carga: Maule completo y la adhesión de Ñuble
+    conn = _tabla([("Maule", 15.0, "otro"), ("Ñuble", 25.0, "b")])
+    editada = cargada.copy()
+    editada.loc[1, "Observaciones"] = "mía"
+
+    escritas, anteriores = upsert_filas_fijas(conn.cursor(), "regiones", "Region", COLUMNAS, editada, cargada)
+
+    assert list(escritas.index) == ["Ñuble"]
+    assert anteriores.loc["Ñuble", "Observaciones"] == "b"
+    assert _leer(conn) == {"Maule": (15.0, "otro"), "Ñuble": (25.0, "mía")}
+
+def test_con_base_sin_ediciones_no_escribe():
+    cargada = pd.DataFrame([("Maule", 10.0, "a")], columns=COLUMNAS)
+    conn = _tabla([("Maule", 15.0, "otro")])
+
+    escritas, _ = upsert_filas_fijas(conn.cursor(), "regiones", "Region", COLUMNAS, cargada.copy(), cargada)
+
+    assert escritas.empty
+    assert _leer(conn) == {"Maule": (15.0, "otro")}
+
+def test_sin_base_gana_la_fila_completa():
+    conn = _tabla([("Maule", 15.0, "otro")])
+    df = pd.DataFrame([("Maule", 10.0, "a"), ("Ñuble", "", "nueva")], columns=COLUMNAS)
+
+    escritas, _ = upsert_filas_fijas(conn.cursor(), "regiones", "Region", COLUMNAS, df)
+
+    assert sorted(escritas.index) == ["Maule", "Ñuble"]
+    assert _leer(conn) == {"Maule": (10.0, "a"), "Ñuble": (None, "nueva")}
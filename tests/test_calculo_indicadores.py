@@ -0,0 +1,21 @@
+# tests/test_calculo_indicadores.py
+import calculo_indicadores
+import ingesta
+from calculo_indicadores import LIBRO, recalcular
+
+def test_cambio_de_version_del_calculo_recalcula_todas_las_hojas(base_temporal, monkeypatch):
+    base_temporal(ingesta, "cache_libros.db", "DB_CACHE")
+    with ingesta.conectar() as conn:
+        conn.execute("INSERT INTO hojas (libro, hoja, huella) VALUES (?, 'Enero', 'h1')", (LIBRO,))
+        conn.commit()
+        assert recalcular(conn) == ["Enero"]
+        assert recalcular(conn) == []
+
+        # Un resultado guardado por una versión anterior del cálculo
+        conn.execute("INSERT INTO ind_procesos (hoja, proceso, meta) VALUES ('Enero', 'viejo', -1)")
+        conn.commit()
+        monkeypatch.setattr(calculo_indicadores, "VERSION_CALCULO", calculo_indicadores.VERSION_CALCULO + 1)
+
+        assert recalcular(conn) == ["Enero"]
+        assert conn.execute("SELECT COUNT(*) FROM ind_procesos WHERE proceso = 'viejo'").fetchone()[0] == 0
+        assert recalcular(conn) == []
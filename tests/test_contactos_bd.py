@@ -0,0 +1,86 @@
+# tests/test_contactos_bd.py
+import pandas as pd
+
+import contactos_bd
+from base_datos import sincronizar_tabla
+from contactos_bd import COLUMNAS_BD, buscar_difuso, conectar, importar_contactos
+
+def _contacto(nombre, cargo, correo):
+    return {"id": None, "Nombre": nombre, "Cargo": cargo, "Dpto_Region": "MAULE",
+            "Telefono": "", "CelularInst": "", "CelularPart": "", "Correo": correo}
+
+def test_editar_contacto_pendiente_de_reindexar(base_temporal):
+    # El contacto queda en contactos_trigramas_pendientes al insertarse y se
+    # edita antes de cualquier búsqueda: el upsert dispara el trigger de nuevo
+    base_temporal(contactos_bd, "contactos.db")
+    with conectar() as conn:
+        guardado, _ = sincronizar_tabla(
+            conn, "contactos", COLUMNAS_BD,
+            pd.DataFrame([_contacto("Ana Zúñiga", "ANALISTA", "ana@isl.gob.cl")]), None,
+        )
+        editado = guardado.copy()
+        editado.loc[0, "Cargo"] = "PROFESIONAL"
+        _, resumen = sincronizar_tabla(conn, "contactos", COLUMNAS_BD, editado, guardado)
+        pendientes = conn.execute("SELECT COUNT(*) FROM contactos_trigramas_pendientes").fetchone()[0]
+
+    assert resumen["actualizados"] == 1
+    assert pendientes == 1
+    resultado, total = buscar_difuso("zuniga profesional")
+    assert total == 1
+    assert resultado.loc[0, "Cargo"] == "PROFESIONAL"
+
+def _lote(filas):
+    return pd.DataFrame(filas, columns=["Nombre", "Cargo", "Correo", "Celular Institucional"])
+
+def test_importar_por_lotes_cuenta_todas_las_filas(base_temporal):
+    base_temporal(contactos_bd, "contactos.db")
+    importar_contactos([_lote([
+        ("Ana Soto", "ANALISTA", "ana@isl.gob.cl", ""),
+        ("Luis Rojas", "PROFESIONAL", "", "+56 9 1234 5678"),
+    ])])
+
+    lotes = [
+        _lote([
+            ("Ana Soto", "JEFA/E DAU", "ANA@isl.gob.cl", ""),           # actualiza a Ana
+            ("Luis Rojas", "PROFESIONAL", "", "+56 9 1234 5678"),      # sin cambios
+            ("Eva Díaz", "TÉCNICO/A", "eva@isl.gob.cl", ""),            # nueva
+            ("", "", "", ""),                                          # inválida
+        ]),
+        _lote([
+            ("Eva Díaz", "ANALISTA", "eva@isl.gob.cl", ""),             # repetida (lote anterior)
+            ("Ana S.", "PROFESIONAL", "otra@isl.gob.cl", ""),           # nueva
+            ("Luis R.", "DIRECTOR/A", "luis@isl.gob.cl", "912345678"),  # nueva: el correo no está guardado
+            ("Ana", "", "", ""),                                       # nueva, solo nombre
+        ]),
+    ]
+    resumen = importar_contactos(iter(lotes))
+
+    assert resumen == {"insertados": 4, "actualizados": 1, "sin_cambios": 1, "duplicados": 1, "invalidos": 1}
+    assert sum(resumen.values()) == sum(len(lote) for lote in lotes)
+
+def test_importar_telefono_compartido_con_otro_correo_es_contacto_nuevo(base_temporal):
+    base_temporal(contactos_bd, "contactos.db")
+    importar_contactos([_lote([("Ana Soto", "ANALISTA", "ana@isl.gob.cl", "+56 2 2345 6789")])])
+
+    # Mismo número de oficina, pero otra persona con su propio correo
+    resumen = importar_contactos([_lote([("Luis Rojas", "PROFESIONAL", "luis@isl.gob.cl", "+56 2 2345 6789")])])
+
+    assert resumen == {"insertados": 1, "actualizados": 0, "sin_cambios": 0, "duplicados": 0, "invalidos": 0}
+    with conectar() as conn:
+        assert conn.execute("SELECT Nombre, Correo FROM contactos ORDER BY id").fetchall() == [
+            ("Ana Soto", "ana@isl.gob.cl"), ("Luis Rojas", "luis@isl.gob.cl"),
+        ]
+
+def test_importar_filas_asociadas_al_mismo_contacto_son_repetidas(base_temporal):
+    base_temporal(contactos_bd, "contactos.db")
+    importar_contactos([_lote([("Luis Rojas", "PROFESIONAL", "luis@isl.gob.cl", "912345678")])])
+
+    # Correo y teléfono distintos en el archivo, pero ambas filas son Luis
+    resumen = importar_contactos([
+        _lote([("Luis Rojas", "DIRECTOR/A", "luis@isl.gob.cl", "")]),
+        _lote([("Luis Rojas", "ANALISTA", "", "+56 9 1234 5678")]),
+    ])
+
+    assert resumen == {"insertados": 0, "actualizados": 1, "sin_cambios": 0, "duplicados": 1, "invalidos": 0}
+    with conectar() as conn:
+        assert conn.execute("SELECT Cargo FROM contactos").fetchall() == [("DIRECTOR/A",)]
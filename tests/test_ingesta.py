@@ -0,0 +1,18 @@
+# tests/test_ingesta.py
+import pytest
+
+from ingesta import DERIVADOS, tabla_con_campos
+
+CAMPOS = DERIVADOS["accidentes"]["campos"]
+
+def test_tabla_de_registros_se_elige_por_sus_campos():
+    # La numeración de los cachés no importa: gana la tabla que tiene los campos
+    tablas = {
+        "registros_accidentes_1": ["Región", "Meta"],
+        "registros_accidentes_7": CAMPOS + ["Campo extra"],
+    }
+    assert tabla_con_campos("accidentes", tablas, CAMPOS) == "registros_accidentes_7"
+
+def test_sin_tabla_con_los_campos_el_error_lo_dice():
+    with pytest.raises(ValueError, match="ninguna tabla dinámica"):
+        tabla_con_campos("accidentes", {"registros_accidentes_2": CAMPOS[:-1]}, CAMPOS)
@@ -0,0 +1,119 @@
+import time
+
+import pandas as pd
+import streamlit as st
+
+from arranque import INICIO_PROCESO, resumen
+from recursos import ALTO_LOGO, imagen_data_uri
+
+st.set_page_config(page_title="Tiempos de arranque", layout="wide", page_icon="⏱️")
+
+# =========================
+# CONFIGURACIÓN DEL ENCABEZADO
+# =========================
+COLOR_FONDO = "#0F69B4"
+IMAGEN_LOCAL = "LOGO-PROPIO-ISL-2023-CMYK-01.png"
+TITULO = "TIEMPOS DE ARRANQUE"
+SUBTITULO = "Sección de Coordinación Territorial"
+
+img_src = imagen_data_uri(IMAGEN_LOCAL, ALTO_LOGO)
+
+st.markdown(f"""
+<style>
+.header-container {{
+    display: flex;
+    align-items: center;
+    justify-content: center;
+    background-color: {COLOR_FONDO};
+    height: 85px;
+    width: 100%;
+    color: white;
+    position: relative;
+}}
+.header-logo {{
+    position: absolute;
+    left: 20px;
+    top: 5px;
+}}
+.header-logo img {{
+    height: 60px;
+}}
+.header-subtitle {{
+    position: absolute;
+    bottom: 5px;
+    left: 20px;
+    font-size: 10px;
+}}
+.header-title {{
+    font-size: 20px;
+    font-weight: bold;
+}}
+.subtitulo-tabla {{
+    margin-top: 20px;
+    font-size: 16px;
+    color: #000000;
+}}
+</style>
+
+<div class="header-container">
+    <div class="header-logo">
+        <img src="{img_src}" alt="Logo">
+    </div>
+    <div class="header-subtitle">{SUBTITULO}</div>
+    <div class="header-title">{TITULO}</div>
+</div>
+""", unsafe_allow_html=True)
+
+# =========================
+# RESUMEN DEL PROCESO
+# =========================
+# Los tiempos son del proceso actual: se reinician cuando el contenedor se reinicia.
+imports, paginas = resumen()
+
+c1, c2, c3 = st.columns(3)
+c1.metric("Proceso activo hace", f"{(time.time() - INICIO_PROCESO) / 60:.1f} min")
+c2.metric("Páginas cargadas", len(paginas))
+c3.metric("Módulos importados", len(imports))
+
+# =========================
+# CARGAS POR PÁGINA
+# =========================
+st.markdown('<div class="subtitulo-tabla">Cargas por página (la primera es en frío)</div>', unsafe_allow_html=True)
+if not paginas:
+    st.info("Aún no hay cargas registradas.")
+else:
+    st.dataframe(
+        pd.DataFrame(paginas).sort_values("primera_desde_inicio").rename(columns={
+            "pagina": "Página",
+            "primera": "Primera carga (s)",
+            "imports": "Imports (s)",
+            "inicializacion": "Inicialización (s)",
+            "primera_desde_inicio": "Desde el inicio del proceso (s)",
+            "ultima": "Última carga (s)",
+            "cargas": "Cargas",
+        }).round(3),
+        use_container_width=True,
+        hide_index=True,
+    )
+
+# =========================
+# IMPORTS
+# =========================
+st.markdown('<div class="subtitulo-tabla">Imports de primer nivel</div>', unsafe_allow_html=True)
+anidados = st.checkbox("Incluir los importados por otros módulos", key="tiempos_anidados")
+if imports:
+    df_imports = pd.DataFrame(imports)
+    if not anidados:
+        df_imports = df_imports[df_imports["nivel"] == 0]
+    df_imports = df_imports.assign(
+        propio=df_imports["propio"] * 1000,
+        acumulado=df_imports["acumulado"] * 1000,
+        pagina=df_imports["pagina"].fillna("(proceso)"),
+    ).sort_values("acumulado", ascending=False)
+    st.dataframe(
+        df_imports[["modulo", "propio", "acumulado", "pagina"]].rename(columns={
+            "modulo": "Módulo", "propio": "Propio (ms)", "acumulado": "Acumulado (ms)", "pagina": "Página",
+        }).round(1),
+        use_container_width=True,
+        hide_index=True,
+    )
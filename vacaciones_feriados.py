@@ -1,11 +1,16 @@
 # vacaciones_feriados.py 
 import streamlit as st
 import pandas as pd
-from datetime import datetime, date
-from io import BytesIO
-import base64
+from datetime import date
 import os
-import sqlite3
+import re
+import unicodedata
+from base_datos import conexion, firma_dataframe, sincronizar_tabla, valores_bd
+from calendario import (ETIQUETAS, buscar_fila, construir_intervalos, construir_matriz, dias_del_anio, firma_registros,
+                        matriz_a_dataframe, mover_meses, ventana_meses)
+from cobertura import ausentes_en, construir_indice, regiones_sin_cobertura, vacios_region
+from exportacion import boton_exportar, hoja_desde_dataframe
+from recursos import ALTO_LOGO, imagen_data_uri
 
 # =========================
 # CONFIGURACIÓN ENCABEZADO
@@ -15,16 +20,12 @@ IMAGEN_LOCAL = "LOGO-PROPIO-ISL-2023-CMYK-01.png"
 TITULO = "VACACIONES Y PERMISOS"
 SUBTITULO = "Sección de Coordinación Territorial"
 DB_FILE = "vacaciones_permisos.db"
+COLUMNAS_BD = ["jefatura_regional", "tipo", "fecha_inicio", "fecha_termino", "persona_id"]
 
-def image_to_base64(path):
-    try:
-        with open(path, "rb") as img_file:
-            return base64.b64encode(img_file.read()).decode()
-    except:
-        return ""
-
-img_base64 = image_to_base64(IMAGEN_LOCAL)
-img_src = f"data:image/png;base64,{img_base64}"
+try:
+    img_src = imagen_data_uri(IMAGEN_LOCAL, ALTO_LOGO)
+except OSError:
+    img_src = ""
 
 # =========================
 # ESTILOS GLOBALES COMPACTOS
@@ -137,39 +138,120 @@ st.markdown(f"""
 # =========================
 # BASE DE DATOS (SQLite)
 # =========================
-def init_db():
-    conn = sqlite3.connect(DB_FILE)
-    cur = conn.cursor()
-    
-    cur.execute("""
-        CREATE TABLE IF NOT EXISTS vacaciones (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            jefatura_regional TEXT,
-            tipo TEXT,
-            fecha_inicio TEXT,
-            fecha_termino TEXT
+# personas: una fila por jefatura con su región y rol; "orden" es la fila del
+# calendario. Cada registro de vacaciones apunta a su persona por persona_id.
+ESQUEMA = """
+    CREATE TABLE IF NOT EXISTS personas (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        nombre TEXT NOT NULL UNIQUE,
+        region TEXT NOT NULL,
+        rol TEXT NOT NULL,
+        orden INTEGER NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS vacaciones (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        jefatura_regional TEXT,
+        tipo TEXT,
+        fecha_inicio TEXT,
+        fecha_termino TEXT,
+        persona_id INTEGER REFERENCES personas (id)
+    );
+"""
+
+def filas_personas():
+    # (nombre, region, rol, orden) a partir de PERSONAS_REGIONALES
+    filas = []
+    for region, nombres in PERSONAS_REGIONALES.items():
+        for i, nombre in enumerate(nombres):
+            filas.append((nombre, region, TIPOS[0] if i == 0 else TIPOS[1], len(filas)))
+    return filas
+
+@st.cache_resource(show_spinner=False)
+def _migrar():
+    # Bases creadas antes de la tabla personas
+    with conexion(DB_FILE, ESQUEMA) as conn:
+        columnas = [fila[1] for fila in conn.execute("PRAGMA table_info(vacaciones)")]
+        if "persona_id" not in columnas:
+            conn.execute("ALTER TABLE vacaciones ADD COLUMN persona_id INTEGER REFERENCES personas (id)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_vacaciones_persona ON vacaciones (persona_id)")
+        # PERSONAS_REGIONALES manda: una región o un rol corregidos ahí llegan
+        # también a las bases existentes
+        conn.executemany(
+            """INSERT INTO personas (nombre, region, rol, orden) VALUES (?, ?, ?, ?)
+               ON CONFLICT (nombre) DO UPDATE SET
+                   region = excluded.region, rol = excluded.rol, orden = excluded.orden""",
+            filas_personas(),
         )
-    """)
-    
-    conn.commit()
-    conn.close()
+        # Los registros anteriores se enlazan por nombre una sola vez
+        pendientes = conn.execute(
+            "SELECT id, jefatura_regional FROM vacaciones WHERE persona_id IS NULL"
+        ).fetchall()
+        if pendientes:
+            personas = pd.read_sql_query("SELECT id, nombre FROM personas", conn)
+            ids = resolver_personas([j for _, j in pendientes], personas)
+            conn.executemany(
+                "UPDATE vacaciones SET persona_id = ? WHERE id = ?",
+                [(int(p), i) for (i, _), p in zip(pendientes, ids) if p is not None],
+            )
+        conn.commit()
+    return True
+
+def conectar():
+    # Conexión del pool compartido; el esquema se crea una sola vez por proceso
+    _migrar()
+    return conexion(DB_FILE, ESQUEMA)
+
+@st.cache_data(show_spinner=False)
+def cargar_personas():
+    with conectar() as conn:
+        return pd.read_sql_query("SELECT id, nombre, region, rol FROM personas ORDER BY orden", conn)
+
+def clave_nombre(nombre):
+    # Sin tildes, mayúsculas ni espacios repetidos: "Andrés Vera " == "ANDRES VERA"
+    if not isinstance(nombre, str):
+        return ""
+    texto = unicodedata.normalize("NFKD", nombre)
+    texto = "".join(c for c in texto if not unicodedata.combining(c)).casefold()
+    return re.sub(r"\s+", " ", texto).strip()
+
+def resolver_personas(nombres, personas):
+    # Nombre escrito -> id de persona. Primero por igualdad de la clave; los nombres
+    # que no calzan (registros antiguos o importados) usan la regla de contención
+    # del calendario anterior. Cada nombre distinto se resuelve una sola vez.
+    claves = [clave_nombre(n) for n in personas["nombre"]]
+    por_clave = dict(zip(claves, personas["id"]))
+
+    def resolver(nombre):
+        clave = clave_nombre(nombre)
+        if not clave:
+            return None
+        if clave in por_clave:
+            return por_clave[clave]
+        fila = buscar_fila(clave, claves)
+        return None if fila < 0 else personas["id"].iloc[fila]
+
+    resueltos = {}
+    for nombre in nombres:
+        if nombre not in resueltos:
+            resueltos[nombre] = resolver(nombre)
+    return [resueltos[n] for n in nombres]
 
 def cargar_desde_db():
-    conn = sqlite3.connect(DB_FILE)
     try:
-        df = pd.read_sql_query("SELECT * FROM vacaciones", conn)
+        with conectar() as conn:
+            df = pd.read_sql_query("SELECT * FROM vacaciones", conn)
     except Exception as e:
         st.error(f"Error al cargar desde la base de datos: {e}")
         df = pd.DataFrame()
-    finally:
-        conn.close()
 
     if df.empty:
         return pd.DataFrame(columns=[
-            'Seleccionar', 'Jefatura Regional', 'Director Regional/Subrogante', 'Fecha Inicio', 'Fecha Término'
+            'Seleccionar', 'Jefatura Regional', 'Director Regional/Subrogante', 'Fecha Inicio', 'Fecha Término',
+            'persona_id', 'id'
         ])
 
-    df = df.drop(columns=["id"], errors="ignore")
+    # El id se conserva (oculto en la tabla) para guardar solo las filas que cambian
+    df = df[COLUMNAS_BD + ["id"]].copy()
     df.rename(columns={
         "jefatura_regional": "Jefatura Regional",
         "tipo": "Director Regional/Subrogante",
@@ -187,59 +269,67 @@ def cargar_desde_db():
     
     return df
 
+def registros_a_bd(df):
+    # Convierte los registros de la interfaz a los nombres y formatos de la tabla
+    df_bd = pd.DataFrame({
+        "id": df["id"] if "id" in df.columns else None,
+        "jefatura_regional": df.get("Jefatura Regional"),
+        "tipo": df.get("Director Regional/Subrogante"),
+        "fecha_inicio": df.get("Fecha Inicio"),
+        "fecha_termino": df.get("Fecha Término"),
+        "persona_id": df["persona_id"] if "persona_id" in df.columns else None,
+    }, index=df.index)
+    for col in ["fecha_inicio", "fecha_termino"]:
+        df_bd[col] = df_bd[col].apply(lambda x: str(x) if pd.notna(x) else None)
+    return valores_bd(df_bd, ["id"] + COLUMNAS_BD)
+
 def guardar_en_db(df):
-    init_db()
-    
-    conn = sqlite3.connect(DB_FILE)
-    cur = conn.cursor()
-    
-    cur.execute("DELETE FROM vacaciones")
-    
-    for _, row in df.iterrows():
-        cur.execute("""
-            INSERT INTO vacaciones 
-            (jefatura_regional, tipo, fecha_inicio, fecha_termino)
-            VALUES (?, ?, ?, ?)
-        """, (
-            row.get("Jefatura Regional", None),
-            row.get("Director Regional/Subrogante", None),
-            str(row.get("Fecha Inicio")) if pd.notna(row.get("Fecha Inicio")) else None,
-            str(row.get("Fecha Término")) if pd.notna(row.get("Fecha Término")) else None,
-        ))
-    conn.commit()
-    conn.close()
-
-# Inicializar DB
-init_db()
+    with conectar() as conn:
+        guardado, _ = sincronizar_tabla(
+            conn, "vacaciones", COLUMNAS_BD,
+            registros_a_bd(df), st.session_state.get("vacaciones_guardado")
+        )
+
+    # Los ids asignados a filas nuevas vuelven a los registros en pantalla
+    df["id"] = guardado["id"].to_numpy()
+    st.session_state.vacaciones_guardado = guardado
 
 # =========================
 # LISTAS INICIALES
 # =========================
-JEFATURAS_REGIONALES = [
-    "SERGIO MARTINEZ", "Larry Alegría", "Jenny Toledo", "José Rivera",
-    "MARCELA OSORIO", "Soledad Latorre", "Ruben Melo", "Paulina Villalobos",
-    "PAULINA URIZAR", "Paula Saavedra", "Patricio Caballero", "Pedro Espinoza",
-    "ANDRÉS VERA", "Marisol Villalobos", "Guillermo Hernandez", "Mauricio Vargas",
-    "MAYCOL GOMÉZ", "Alejandra Navarrete", "Claudia Galdames", "Claudio Irarrazaval",
-    "GUILLERMO ACUÑA", "Andres Zuñiga", "Fernanda León", "Simón Navias",
-    "CAMILO FARÍAS", "Sylvia Lagos", "Evelyn Cortes", "Felipe Jara",
-    "OSCAR MENARES", "Gisela Delgado", "Ximena Fierro", "Omar González",
-    "MINERVA CASTAÑEDA", "Sandra Moreno", "Jaime Zurita", "Claudia Barrientos",
-    "NESTOR VILLARROEL", "Claudia San Martin", "Ingrid Evens", "Erick Sánchez",
-    "JESSICA CORONADO", "Mery Fontecha", "Paola Almonacid", "Gonzalo Soto",
-    "MARILYN CÁRDENAS", "Alex Hernández", "Javier Mancilla", "Rubén Ojeda",
-    "ENRIQUE CARRASCO", "Karla Leyton", "Pablo Román", "Patricio Arenas",
-    "MILENA BARRIA", "Ema Jerez Poblete", "Verónica Cavieres", "Patricio Olivera",
-    "ROBERTO LAU", "Elsa Vega", "Maricela Chávez", "Sergio Tello",
-    "CARLOS QUEZADA", "Ingrid Reyes", "Diego Otto", "Ralf Burgos"
-]
+# Por región: Director Regional primero y luego sus subrogantes. Solo se usa
+# para poblar y actualizar la tabla personas (región, rol y orden, por nombre)
+# al abrir la base; la aplicación lee las personas desde la BD.
+PERSONAS_REGIONALES = {
+    "Tarapacá": ["SERGIO MARTINEZ", "Larry Alegría", "Jenny Toledo", "José Rivera"],
+    "Antofagasta": ["MARCELA OSORIO", "Soledad Latorre", "Ruben Melo", "Paulina Villalobos"],
+    "Atacama": ["PAULINA URIZAR", "Paula Saavedra", "Patricio Caballero", "Pedro Espinoza"],
+    "Coquimbo": ["ANDRÉS VERA", "Marisol Villalobos", "Guillermo Hernandez", "Mauricio Vargas"],
+    "Valparaíso": ["MAYCOL GOMÉZ", "Alejandra Navarrete", "Claudia Galdames", "Claudio Irarrazaval"],
+    "O'Higgins": ["GUILLERMO ACUÑA", "Andres Zuñiga", "Fernanda León", "Simón Navias"],
+    "Maule": ["CAMILO FARÍAS", "Sylvia Lagos", "Evelyn Cortes", "Felipe Jara"],
+    "Biobío": ["OSCAR MENARES", "Gisela Delgado", "Ximena Fierro", "Omar González"],
+    "La Araucanía": ["MINERVA CASTAÑEDA", "Sandra Moreno", "Jaime Zurita", "Claudia Barrientos"],
+    "Los Lagos": ["NESTOR VILLARROEL", "Claudia San Martin", "Ingrid Evens", "Erick Sánchez"],
+    "Aysén": ["JESSICA CORONADO", "Mery Fontecha", "Paola Almonacid", "Gonzalo Soto"],
+    "Magallanes": ["MARILYN CÁRDENAS", "Alex Hernández", "Javier Mancilla", "Rubén Ojeda"],
+    "Metropolitana": ["ENRIQUE CARRASCO", "Karla Leyton", "Pablo Román", "Patricio Arenas"],
+    "Los Ríos": ["MILENA BARRIA", "Ema Jerez Poblete", "Verónica Cavieres", "Patricio Olivera"],
+    "Arica y Parinacota": ["ROBERTO LAU", "Elsa Vega", "Maricela Chávez", "Sergio Tello"],
+    "Ñuble": ["CARLOS QUEZADA", "Ingrid Reyes", "Diego Otto", "Ralf Burgos"],
+}
 
 TIPOS = ["Director Regional", "Subrogante"]
 
-NOMBRES_CALENDARIO = JEFATURAS_REGIONALES.copy()
+# Filas del calendario en el orden de la tabla personas, agrupadas por región
+PERSONAS = cargar_personas()
+NOMBRES_CALENDARIO = PERSONAS["nombre"].tolist()
+REGIONES_CALENDARIO = PERSONAS["region"].tolist()
+FILA_POR_PERSONA = pd.Series(range(len(PERSONAS)), index=PERSONAS["id"])
+PERSONA_POR_NOMBRE = dict(zip(PERSONAS["nombre"], PERSONAS["id"]))
 
 if "jefaturas_lista" not in st.session_state:
-    st.session_state.jefaturas_lista = JEFATURAS_REGIONALES.copy()
+    st.session_state.jefaturas_lista = NOMBRES_CALENDARIO.copy()
 if "tipos_lista" not in st.session_state:
     st.session_state.tipos_lista = TIPOS.copy()
 
@@ -248,13 +338,7 @@ if "tipos_lista" not in st.session_state:
 # =========================
 if 'vacaciones_data' not in st.session_state:
     st.session_state.vacaciones_data = cargar_desde_db()
-
-if 'calendario_data' not in st.session_state:
-    year = datetime.now().year
-    all_days = pd.date_range(start=date(year, 1, 1), end=date(year, 12, 31), freq='D')
-    calendario_df = pd.DataFrame(index=NOMBRES_CALENDARIO, columns=all_days.strftime('%Y-%m-%d'))
-    calendario_df.index.name = 'Nombre'
-    st.session_state.calendario_data = calendario_df.fillna('')
+    st.session_state.vacaciones_guardado = registros_a_bd(st.session_state.vacaciones_data)
 
 # Estado para formulario de edición
 if 'editing_index' not in st.session_state:
@@ -269,6 +353,11 @@ if 'form_data' not in st.session_state:
 if 'widget_counter' not in st.session_state:
     st.session_state.widget_counter = 0
 
+# Ventana visible del calendario: primer mes mostrado y cantidad de meses
+if 'calendario_desde' not in st.session_state:
+    st.session_state.calendario_desde = date.today().replace(day=1)
+VISTAS_CALENDARIO = {"Mes": 1, "Trimestre": 3}
+
 # =========================
 # FUNCIONES AUXILIARES
 # =========================
@@ -333,7 +422,10 @@ def importar_desde_excel():
             for col in columnas_fecha:
                 if col in df_importado.columns:
                     df_importado[col] = pd.to_datetime(df_importado[col], errors="coerce").dt.date
-            st.session_state.vacaciones_data = df_importado[columnas_requeridas]
+            df_importado["persona_id"] = resolver_personas(df_importado["Jefatura Regional"], PERSONAS)
+            # El archivo reemplaza a los registros actuales: todas sus filas son nuevas
+            df_importado["id"] = None
+            st.session_state.vacaciones_data = df_importado[columnas_requeridas].copy()
             guardar_en_db(st.session_state.vacaciones_data)
         except Exception:
             pass
@@ -349,6 +441,7 @@ def guardar_registro():
     tipo_input = st.session_state.get(tipo_key, "")
     fecha_inicio = st.session_state.get(fecha_inicio_key, None)
     fecha_termino = st.session_state.get(fecha_termino_key, None)
+    cobertura_anterior = st.session_state.get('calendario_cobertura')
     
     if jefatura_input and tipo_input:
         if jefatura_input not in st.session_state.jefaturas_lista:
@@ -363,6 +456,7 @@ def guardar_registro():
             st.session_state.vacaciones_data.at[idx, 'Director Regional/Subrogante'] = tipo_input
             st.session_state.vacaciones_data.at[idx, 'Fecha Inicio'] = fecha_inicio
             st.session_state.vacaciones_data.at[idx, 'Fecha Término'] = fecha_termino
+            st.session_state.vacaciones_data.at[idx, 'persona_id'] = PERSONA_POR_NOMBRE.get(jefatura_input)
             st.session_state.vacaciones_data.at[idx, 'Seleccionar'] = False
         else:
             # Si no estamos editando, crear un nuevo registro
@@ -371,13 +465,16 @@ def guardar_registro():
                 'Jefatura Regional': jefatura_input,
                 'Director Regional/Subrogante': tipo_input,
                 'Fecha Inicio': fecha_inicio,
-                'Fecha Término': fecha_termino
+                'Fecha Término': fecha_termino,
+                'persona_id': PERSONA_POR_NOMBRE.get(jefatura_input)
             }
             st.session_state.vacaciones_data = pd.concat([
                 st.session_state.vacaciones_data, pd.DataFrame([nuevo_registro])
             ], ignore_index=True)
         
         guardar_en_db(st.session_state.vacaciones_data)
+        actualizar_calendario()
+        avisar_vacio_cobertura(jefatura_input, fecha_inicio, fecha_termino, cobertura_anterior)
         # Limpiar formulario
         st.session_state.form_data = {
             'jefatura': "",
@@ -427,44 +524,67 @@ def eliminar_registros_seleccionados():
         guardar_en_db(st.session_state.vacaciones_data)
 
 def actualizar_calendario():
-    year = datetime.now().year
-    all_days = pd.date_range(start=date(year, 1, 1), end=date(year, 12, 31), freq='D')
-    calendario_df = pd.DataFrame(index=NOMBRES_CALENDARIO, columns=all_days.strftime('%Y-%m-%d'))
-    calendario_df.index.name = 'Nombre'
-    for _, row in st.session_state.vacaciones_data.iterrows():
-        jefatura = row['Jefatura Regional']
-        tipo = row['Director Regional/Subrogante']
-        if pd.notna(row['Fecha Inicio']) and pd.notna(row['Fecha Término']):
-            try:
-                fecha_inicio = pd.to_datetime(row['Fecha Inicio'])
-                fecha_termino = pd.to_datetime(row['Fecha Término'])
-                nombre_en_calendario = None
-                for nombre_cal in calendario_df.index:
-                    if (jefatura.upper() in nombre_cal.upper() or nombre_cal.upper() in jefatura.upper()):
-                        nombre_en_calendario = nombre_cal
-                        break
-                if nombre_en_calendario:
-                    for dia in pd.date_range(start=fecha_inicio, end=fecha_termino):
-                        if dia.year == year:
-                            dia_str = dia.strftime('%Y-%m-%d')
-                            if dia_str in calendario_df.columns:
-                                if tipo == "Director Regional":
-                                    calendario_df.at[nombre_en_calendario, dia_str] = 'Vacaciones'
-                                elif tipo == "Subrogante":
-                                    calendario_df.at[nombre_en_calendario, dia_str] = 'Subrogante'
-            except:
-                continue
-    st.session_state.calendario_data = calendario_df.fillna('')
-
-def exportar_a_excel():
-    output = BytesIO()
-    with pd.ExcelWriter(output, engine='openpyxl') as writer:
-        st.session_state.vacaciones_data.to_excel(writer, sheet_name='Registros', index=False)
-        calendario_export = st.session_state.calendario_data.copy()
-        calendario_export.reset_index(inplace=True)
-        calendario_export.to_excel(writer, sheet_name='Calendario', index=False)
-    output.seek(0)
-    return output
+    # Intervalos e índice de cobertura: solo se recalculan cuando cambian los registros
+    firma = firma_registros(st.session_state.vacaciones_data)
+    if st.session_state.get('calendario_firma') == firma and 'calendario_intervalos' in st.session_state:
+        return
+    intervalos = construir_intervalos(st.session_state.vacaciones_data, FILA_POR_PERSONA)
+    st.session_state.calendario_intervalos = intervalos
+    st.session_state.calendario_cobertura = construir_indice(intervalos, NOMBRES_CALENDARIO, REGIONES_CALENDARIO)
+    st.session_state.calendario_firma = firma
+
+def calendario_ventana(desde, hasta):
+    # Grilla de la ventana visible; se arma de nuevo solo si cambian la ventana o los registros
+    clave = (st.session_state.calendario_firma, desde, hasta)
+    if st.session_state.get('calendario_ventana_clave') != clave:
+        matriz = construir_matriz(st.session_state.calendario_intervalos, len(NOMBRES_CALENDARIO), desde, hasta)
+        st.session_state.calendario_data = matriz_a_dataframe(
+            matriz, NOMBRES_CALENDARIO, desde, hasta, REGIONES_CALENDARIO
+        )
+        st.session_state.calendario_ventana_clave = clave
+    return st.session_state.calendario_data
+
+def mover_ventana(meses):
+    if meses:
+        st.session_state.calendario_desde = mover_meses(st.session_state.calendario_desde, meses)
+    else:
+        st.session_state.calendario_desde = date.today().replace(day=1)
+
+def avisar_vacio_cobertura(jefatura, fecha_inicio, fecha_termino, cobertura_anterior):
+    # Advierte si el registro deja a su región sin ninguna jefatura disponible
+    indice = st.session_state.calendario_cobertura
+    persona_id = PERSONA_POR_NOMBRE.get(jefatura)
+    if persona_id is None or fecha_inicio is None or fecha_termino is None or fecha_inicio > fecha_termino:
+        return
+    region = REGIONES_CALENDARIO[FILA_POR_PERSONA[persona_id]]
+    vacios = vacios_region(indice, region, fecha_inicio, fecha_termino)
+    if not vacios or (cobertura_anterior is not None
+                      and vacios_region(cobertura_anterior, region, fecha_inicio, fecha_termino) == vacios):
+        return
+    tramos = ", ".join(
+        f"{a:%d-%m-%Y}" if a == b else f"{a:%d-%m-%Y} al {b:%d-%m-%Y}" for a, b in vacios
+    )
+    st.warning(
+        f"Con este registro la región {region} queda sin Director Regional "
+        f"ni subrogante disponible: {tramos}"
+    )
+
+def hojas_exportacion(registros, intervalos, year):
+    # El calendario del año se escribe fila por fila desde la matriz, sin armar el DataFrame de texto
+    matriz = construir_matriz(intervalos, len(NOMBRES_CALENDARIO), date(year, 1, 1), date(year, 12, 31))
+    encabezados = ['Región', 'Nombre'] + list(dias_del_anio(year).strftime('%Y-%m-%d'))
+    filas_calendario = (
+        [region, nombre] + list(ETIQUETAS[fila])
+        for region, nombre, fila in zip(REGIONES_CALENDARIO, NOMBRES_CALENDARIO, matriz)
+    )
+    return [
+        hoja_desde_dataframe('Registros', registros.drop(columns=["id", "persona_id"], errors="ignore")),
+        ('Calendario', encabezados, filas_calendario),
+    ]
+
+def version_exportacion(year):
+    firma_calendario = st.session_state.calendario_firma
+    return f"{year}-{firma_calendario}-{firma_dataframe(st.session_state.vacaciones_data)}"
 
 # =========================
 # LIMPIEZA Y CALENDARIO
@@ -524,14 +644,14 @@ with col_form:
     col_btn4.button("Importar", on_click=importar_desde_excel, use_container_width=True)
     with col_btn5:
         if not st.session_state.vacaciones_data.empty:
-            excel_data = exportar_a_excel()
-            st.download_button(
-                "Exportar",
-                data=excel_data,
-                file_name="vacaciones_permisos.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                use_container_width=True
-            )
+            # Se genera al presionar Exportar y queda en caché mientras no cambien los datos
+            # El calendario exportado es el año completo del primer mes visible
+            registros = st.session_state.vacaciones_data
+            intervalos = st.session_state.calendario_intervalos
+            year = st.session_state.calendario_desde.year
+            boton_exportar("Exportar", "vacaciones", version_exportacion(year),
+                           lambda: hojas_exportacion(registros, intervalos, year),
+                           "vacaciones_permisos.xlsx", use_container_width=True)
         else:
             st.button("Exportar", disabled=True, use_container_width=True)
 
@@ -551,7 +671,8 @@ with col_tabla:
         use_container_width=True,
         height=550,
         key="vacaciones_data_editor",
-        disabled=["Jefatura Regional", "Director Regional/Subrogante", 'Fecha Inicio', 'Fecha Término']
+        disabled=["Jefatura Regional", "Director Regional/Subrogante", 'Fecha Inicio', 'Fecha Término'],
+        column_config={"id": None, "persona_id": None}
     )
     
     # Actualizar los checkboxes en el dataframe principal
@@ -560,8 +681,32 @@ with col_tabla:
 
 with col_calendario:
     st.markdown("### Calendario de Vacaciones")
-    calendario_con_estilo = st.session_state.calendario_data.style.map(estilo_calendario)
+    col_vista, col_ant, col_hoy, col_sig = st.columns([2, 1, 1, 1])
+    vista = col_vista.radio("Vista", list(VISTAS_CALENDARIO), horizontal=True,
+                            key="calendario_vista", label_visibility="collapsed")
+    meses = VISTAS_CALENDARIO[vista]
+    col_ant.button("◀", on_click=mover_ventana, args=(-meses,), use_container_width=True)
+    col_hoy.button("Hoy", on_click=mover_ventana, args=(0,), use_container_width=True)
+    col_sig.button("▶", on_click=mover_ventana, args=(meses,), use_container_width=True)
+
+    # Solo se arma y se colorea la ventana visible
+    desde, hasta = ventana_meses(st.session_state.calendario_desde, meses)
+    st.caption(f"{desde:%d-%m-%Y} al {hasta:%d-%m-%Y}")
+    calendario_con_estilo = calendario_ventana(desde, hasta).style.map(estilo_calendario)
     st.dataframe(calendario_con_estilo, use_container_width=True, height=550)
 
+    with st.expander("Cobertura regional"):
+        rango = st.date_input("Rango a revisar", value=(date.today(), date.today()), key="cobertura_rango")
+        if isinstance(rango, (tuple, list)) and len(rango) == 2:
+            desde, hasta = rango
+            indice = st.session_state.calendario_cobertura
+            ausentes = ausentes_en(indice, desde)
+            st.markdown(f"**Ausentes el {desde:%d-%m-%Y}:** " + (", ".join(ausentes) if ausentes else "ninguno"))
+            sin_cobertura = regiones_sin_cobertura(indice, desde, hasta)
+            if sin_cobertura.empty:
+                st.caption("Todas las regiones tienen cobertura en el rango.")
+            else:
+                st.dataframe(sin_cobertura, use_container_width=True, hide_index=True)
+
 st.markdown("---")
 st.caption("Sistema de Gestión de Vacaciones y Permisos - Directores Regionales y Subrogantes")